@@ -1,17 +1,120 @@
+import heapq
+import itertools
+import json
 import socket
-import struct
+from collections import OrderedDict, deque
+from functools import partial
 import threading
 import time
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, List, Callable, Dict
+
+from .osc_codec import (IMMEDIATELY, OSCDecodeError, decode_packet, encode_bundle, encode_bundles, encode_message,
+                        thread_encoder, timetag_delay)
+from .devices import (DEVICE_FIELDS, PARAMETER_FIELDS, device_page, device_parameters, find_parameter,
+                      parameter_page, parameter_value, parse_fields)
+from .live_state import LiveState
+from .notes import DEFAULT_CHUNK, MAX_CHUNK, NoteCache, NoteUploads, replace_notes
+from .meters import DEFAULT_HOLD, DEFAULT_RATE, MeterStream
+from .osc_listener import OSCListener, OSCStreamListener, StreamPeer
+from .remote_log import ERROR, WARNING, RemoteLog, level_name, parse_level
+from .ramps import RampTable
+from .protocol import (ERROR_ADDRESS, METERS_PATH, NOTIFY_PREFIX, RECEIVE_BUFFER_SIZE, chunk_packet,
+                       request_address, split_request)
+from .routing import Router, is_pattern, matches, validate_pattern
+from .session import SessionMatrix
+from .snapshot import decode_notes, encode_notes, encode_set_info, encode_tracks
+from .stats import ServerStats
+
+# Upper bounds on remembered replies regardless of dedupe_window
+_REPLY_CACHE_LIMIT = 4096
+_REPLY_CACHE_BYTES = 1 << 20
+# Larger replies are not kept, only the fact that their request ran, so a
+# retransmitted write is still never applied twice
+_MAX_CACHED_REPLY = 16384
+_REPLY_NOT_KEPT = (ERROR_ADDRESS, ["Request already ran; its reply was too large to send again"])
+
+# A batch step: applies one operation and returns its resulting value, plus
+# how to restore the previous value (None if the operation can't be undone)
+BatchStep = Tuple[Callable[[], Any], Optional[Callable[[], None]]]
+
+
+def _assignment(subject: Any, prop: str, value: Any) -> BatchStep:
+    previous = getattr(subject, prop)
+
+    def apply():
+        setattr(subject, prop, value)
+        return getattr(subject, prop)
+    return apply, lambda: setattr(subject, prop, previous)
+
 
 class OSCServer:
-    def __init__(self, parent, port=11000, host='127.0.0.1'):
+    def __init__(self, parent, port=11000, host='127.0.0.1', buffer_size=RECEIVE_BUFFER_SIZE, max_datagram_size=8192,
+                 tcp_port=None, peer_timeout=60.0, dedupe_window=10.0, tick_budget=0.01,
+                 subscription_lease=60.0, log_level="info"):
         self.parent = parent
+        # Only messages at log_level or above reach Live's Log.txt; the level
+        # can be changed at runtime with /live/log/level
+        self.log = RemoteLog(parent.log_message, parse_level(log_level))
         self.port = port
         self.host = host
+        # Optional TCP listener taking SLIP-framed OSC (OSC 1.1) for bulk transfers
+        self.tcp_port = tcp_port
+        # Size of the receive buffer, and of the largest datagram sent before
+        # a response is split into /chunk messages
+        self.buffer_size = buffer_size
+        self.max_datagram_size = max_datagram_size
+        self._transfer_ids = itertools.count(1)
+        # Replies go back to whoever sent the request; every sender seen within
+        # the last peer_timeout seconds counts as an active peer
+        self.peer_timeout = peer_timeout
+        self._peers: Dict[Any, float] = {}
+        self._peers_lock = threading.Lock()
+        self._peers_pruned = time.monotonic()
+        # Replies to requests with an ID, kept for dedupe_window seconds so a
+        # retransmitted request is answered again without being applied twice
+        self.dedupe_window = dedupe_window
+        # (sender, ID) -> (time, reply, size); size sums to _reply_bytes
+        self._replies: "OrderedDict[Tuple[Any, int], Tuple[float, Optional[Tuple[str, list]], int]]" = OrderedDict()
+        self._reply_bytes = 0
+        self._replies_lock = threading.Lock()
+        # The socket threads only parse and queue; process_messages() runs the
+        # commands on Live's main thread, spending at most tick_budget seconds
+        # per call. Bundles with a future timetag wait in a heap until due.
+        self.tick_budget = tick_budget
+        self._commands: deque = deque()
+        self._scheduled: List[Tuple[float, int, Callable[[], None]]] = []
+        self._scheduled_lock = threading.Lock()
+        self._schedule_order = itertools.count()
         self.socket: Optional[socket.socket] = None
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        self._listener: Optional[OSCListener] = None
+        self.tcp_socket: Optional[socket.socket] = None
+        self.tcp_thread: Optional[threading.Thread] = None
+        self._stream_listener: Optional[OSCStreamListener] = None
+        # Push subscriptions: patterns per peer until their lease runs out, plus
+        # the changed values and initial snapshots waiting for the end of the tick
+        self.subscription_lease = subscription_lease
+        self._subscriptions: Dict[Any, Tuple[float, List[str]]] = {}
+        self._changes: Dict[str, Any] = {}
+        self._snapshots: Dict[Any, Dict[str, Any]] = {}
+        # Meter streams of the peers subscribed to METERS_PATH
+        self._meters: Dict[Any, MeterStream] = {}
+        # Counters and per-endpoint stage latencies for /live/stats
+        self._stats = ServerStats()
+        # Parameter ramps advanced on every tick
+        self._ramps = RampTable()
+        # Sender of the command being run, for handlers that act per peer
+        self._sender: Any = None
+        # Session queries are answered from this model instead of the Live API
+        self._state = LiveState(self._song(), self._state_changed)
+        # Clip slot matrix, listening to every slot once it was first asked for
+        self._matrix: Optional[SessionMatrix] = None
+        # Notes of recently read MIDI clips, and note writes being received in chunks
+        self._notes = NoteCache()
+        self._note_uploads = NoteUploads()
+        self._router = Router()
+        self._register_routes()
         self._start_server()
 
     def _start_server(self):
@@ -19,245 +122,929 @@ class OSCServer:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.socket.bind((self.host, self.port))
-            self.socket.settimeout(0.1)
+            self._listener = OSCListener(
+                self.socket,
+                lambda data, size, addr: self._handle_message(data, addr, size),
+                buffer_size=self.buffer_size,
+                on_error=lambda e: self.log.sampled("udp-receive", WARNING, "OSC receive error: %s", e))
             self.running = True
-            self.thread = threading.Thread(target=self._receive_loop)
+            self.thread = threading.Thread(target=self._listener.run)
             self.thread.daemon = True
             self.thread.start()
-            self.parent.log_message(f"OSC Server started on {self.host}:{self.port}")
+            self.log.info("OSC Server started on %s:%s", self.host, self.port)
         except Exception as e:
-            self.parent.log_message(f"Failed to start OSC server: {e}")
+            self.log.error("Failed to start OSC server: %s", e)
             self.socket = None
+            return
 
-    def _receive_loop(self):
-        while self.running and self.socket:
-            try:
-                data, addr = self.socket.recvfrom(4096)
-                self._handle_message(data, addr)
-            except socket.timeout:
-                continue
-            except Exception as e:
-                if self.running:
-                    self.parent.log_message(f"OSC receive error: {e}")
+        if self.tcp_port is not None:
+            self._start_stream_server()
 
-    def _handle_message(self, data: bytes, addr: Tuple[str, int]):
+    def _start_stream_server(self):
+        try:
+            self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.tcp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.tcp_socket.bind((self.host, self.tcp_port))
+            self.tcp_socket.listen()
+            self._stream_listener = OSCStreamListener(
+                self.tcp_socket,
+                lambda packet, peer: self._handle_message(packet, peer),
+                buffer_size=self.buffer_size,
+                on_error=lambda e: self.log.sampled("tcp-receive", WARNING, "OSC TCP receive error: %s", e))
+            self.tcp_thread = threading.Thread(target=self._stream_listener.run)
+            self.tcp_thread.daemon = True
+            self.tcp_thread.start()
+            self.log.info("OSC TCP Server started on %s:%s", self.host, self.tcp_socket.getsockname()[1])
+        except Exception as e:
+            self.log.error("Failed to start OSC TCP server: %s", e)
+            self.tcp_socket = None
+
+    def _handle_message(self, data: bytes, addr: Any, size: Optional[int] = None):
+        """Handle one packet; ``addr`` is the UDP sender address or the StreamPeer it came from"""
         if not self.socket:
             return
+        self._touch_peer(addr)
+        stats = self._stats
+        stats.count("packets")
 
+        started = time.perf_counter()
         try:
-            address, args = self._parse_osc_message(data)
-            self.parent.log_message(f"OSC UPDATED CODE: {address} {args}")
-            self.parent.log_message(f"DEBUG: address repr = {repr(address)}")
-
-            if address == "/live/tracks":
-                self.parent.log_message("DEBUG: /live/tracks message parsed, entering handler")
-
-            # TEMP DEBUG: Always log for any message to test logging
-            self.parent.log_message(f"TEMP DEBUG: Processing address {address}")
-
-            song = self.parent._c_instance.song()
-
-            if address == "/live/play":
-                song.start_playing()
-                self._send_response(addr, "/live/play/response", ["success"])
-
-            elif address == "/live/stop":
-                song.stop_playing()
-                self._send_response(addr, "/live/stop/response", ["success"])
-
-            elif address == "/live/tempo" and args:
-                tempo = float(args[0])
-                song.tempo = max(20.0, min(999.0, tempo))
-                self._send_response(addr, "/live/tempo/response", ["success", song.tempo])
-
-            elif address == "/live/track/volume" and len(args) >= 2:
-                track_id = int(args[0])
-                volume = float(args[1])
-                if 0 <= track_id < len(song.tracks):
-                    track = song.tracks[track_id]
-                    if hasattr(track, 'mixer_device') and hasattr(track.mixer_device, 'volume'):
-                        track.mixer_device.volume.value = max(0.0, min(1.0, volume))
-                        self._send_response(addr, "/live/track/volume/response", ["success", track_id, track.mixer_device.volume.value])
-
-            elif address == "/live/track/mute" and len(args) >= 2:
-                track_id = int(args[0])
-                mute = bool(int(args[1]))
-                if 0 <= track_id < len(song.tracks):
-                    track = song.tracks[track_id]
-                    track.mute = mute
-                    self._send_response(addr, "/live/track/mute/response", ["success", track_id, track.mute])
-
-            elif address == "/live/track/solo" and len(args) >= 2:
-                track_id = int(args[0])
-                solo = bool(int(args[1]))
-                if 0 <= track_id < len(song.tracks):
-                    track = song.tracks[track_id]
-                    track.solo = solo
-                    self._send_response(addr, "/live/track/solo/response", ["success", track_id, track.solo])
-
-            elif address == "/live/track/arm" and len(args) >= 2:
-                track_id = int(args[0])
-                arm = bool(int(args[1]))
-                if 0 <= track_id < len(song.tracks):
-                    track = song.tracks[track_id]
-                    if hasattr(track, 'can_be_armed') and track.can_be_armed:
-                        track.arm = arm
-                        self._send_response(addr, "/live/track/arm/response", ["success", track_id, track.arm])
-
-            elif address == "/live/clip/launch" and len(args) >= 2:
-                track_id = int(args[0])
-                clip_slot = int(args[1])
-                if 0 <= track_id < len(song.tracks) and 0 <= clip_slot < len(song.scenes):
-                    clip_slots = song.tracks[track_id].clip_slots
-                    if clip_slot < len(clip_slots) and clip_slots[clip_slot].clip:
-                        clip_slots[clip_slot].clip.fire()
-                        self._send_response(addr, "/live/clip/launch/response", ["success", track_id, clip_slot])
-
-            elif address == "/live/scene/launch" and args:
-                scene_id = int(args[0])
-                if 0 <= scene_id < len(song.scenes):
-                    song.scenes[scene_id].fire()
-                    self._send_response(addr, "/live/scene/launch/response", ["success", scene_id])
-
-            elif address == "/live/get":
-                response = self._get_live_set_info()
-                self._send_response(addr, "/live/get/response", response)
-
-            elif address == "/live/tracks":
-                response = self._get_track_info()
-                self._send_response(addr, "/live/tracks/response", response)
+            timetag, messages = decode_packet(data, 0, size)
+        except OSCDecodeError as e:
+            stats.count("parse_errors")
+            self.log.sampled("parse", WARNING, "OSC parse error: %s", e)
+            return
+        parsed = time.perf_counter()
 
+        if timetag is None:
+            request_id, address = split_request(messages[0][0])
+            stats.record(address, "parse", parsed - started)
+            if request_id is not None:
+                seen, cached = self._claim_request(addr, request_id)
+                if seen:
+                    # A retransmission; answer it if the original already ran
+                    stats.count("duplicates")
+                    if cached is not None:
+                        self._send_response(addr, *cached, request_id=request_id)
+                    return
+            self._commands.append(partial(self._execute, addr, request_id, address, messages[0][1], parsed))
+            stats.queued(len(self._commands))
+            return
+
+        stats.record("#bundle", "parse", parsed - started)
+        delay = timetag_delay(timetag)
+        if delay > 0:
+            command = partial(self._handle_bundle, messages, addr)
+            with self._scheduled_lock:
+                heapq.heappush(self._scheduled, (time.monotonic() + delay, next(self._schedule_order), command))
+        else:
+            self._commands.append(partial(self._handle_bundle, messages, addr, parsed))
+            stats.queued(len(self._commands))
+
+    def _execute(self, addr: Any, request_id: Optional[int], address: str, args: list,
+                 queued: Optional[float] = None):
+        """Run one queued message and send its reply"""
+        if queued is not None:
+            self._stats.record(address, "queue", time.perf_counter() - queued)
+        self._sender = addr
+        try:
+            response = self._dispatch(address, args)
         except Exception as e:
-            self.parent.log_message(f"Error handling OSC message: {e}")
-            self._send_response(addr, "/error", [str(e)])
-
-    def _get_live_set_info(self):
-        song = self.parent._c_instance.song()
-        info = {
-            "tempo": song.tempo,
-            "is_playing": song.is_playing,
-            "track_count": len(song.tracks),
-            "scene_count": len(song.scenes)
+            self.log.warning("Error handling OSC message %s: %s", address, e)
+            response = (ERROR_ADDRESS, [str(e)])
+        if not response:
+            if request_id is None:
+                return
+            # The client is waiting on this request; fail it now rather than at its timeout
+            response = (ERROR_ADDRESS, [f"No response for {address}"])
+        if request_id is not None:
+            self._remember_reply(addr, request_id, response)
+        self._send_response(addr, *response, request_id=request_id)
+
+    def _claim_request(self, addr: Any, request_id: int) -> Tuple[bool, Optional[Tuple[str, list]]]:
+        """Return ``(seen, reply)`` for a request ID, marking it as seen if it is new.
+
+        ``reply`` is ``None`` while the first copy of the request is still queued.
+        """
+        now = time.monotonic()
+        key = (addr, request_id)
+        with self._replies_lock:
+            entry = self._replies.get(key)
+            if entry is not None and now - entry[0] <= self.dedupe_window:
+                return True, entry[1]
+            if entry is not None:
+                self._reply_bytes -= entry[2]
+            self._replies[key] = (now, None, 0)
+            self._replies.move_to_end(key)
+        return False, None
+
+    def _remember_reply(self, addr: Any, request_id: int, response: Tuple[str, list]):
+        now = time.monotonic()
+        key = (addr, request_id)
+        size = len(response[0]) + sum(len(arg) if isinstance(arg, (bytes, str)) else 8 for arg in response[1])
+        with self._replies_lock:
+            replies = self._replies
+            entry = replies.pop(key, None)
+            if entry is not None:
+                self._reply_bytes -= entry[2]
+            if size > _MAX_CACHED_REPLY:
+                response, size = _REPLY_NOT_KEPT, 0
+            replies[key] = (now, response, size)
+            self._reply_bytes += size
+            # Entries are in arrival order, so expired ones are at the front
+            while replies:
+                oldest, (stored, _, stored_size) = next(iter(replies.items()))
+                if (now - stored <= self.dedupe_window and len(replies) <= _REPLY_CACHE_LIMIT
+                        and self._reply_bytes <= _REPLY_CACHE_BYTES):
+                    break
+                del replies[oldest]
+                self._reply_bytes -= stored_size
+
+    def _touch_peer(self, addr: Any):
+        now = time.monotonic()
+        with self._peers_lock:
+            self._peers[addr] = now
+            # Drop senders gone quiet at most once per peer_timeout, so a
+            # stream of one-off senders can't grow the table
+            if now - self._peers_pruned >= self.peer_timeout:
+                self._prune_peers(now)
+
+    def _prune_peers(self, now: float):
+        cutoff = now - self.peer_timeout
+        for addr in [addr for addr, seen in self._peers.items() if seen < cutoff]:
+            del self._peers[addr]
+        self._peers_pruned = now
+
+    def active_peers(self) -> List[Any]:
+        """Senders heard from within ``peer_timeout`` seconds, most recent first"""
+        with self._peers_lock:
+            self._prune_peers(time.monotonic())
+            return sorted(self._peers, key=self._peers.__getitem__, reverse=True)
+
+    def _handle_bundle(self, messages: List[Tuple[str, list]], addr: Any, queued: Optional[float] = None):
+        """Dispatch every message of a bundle and send one aggregated ``/bundle/response``"""
+        if queued is not None:
+            self._stats.record("#bundle", "queue", time.perf_counter() - queued)
+        self._sender = addr
+        calls = [(address, lambda address=address, args=args: self._dispatch(split_request(address)[1], args))
+                 for address, args in messages]
+        self._send_response(addr, "/bundle/response", self._run_all(calls))
+
+    def _run_all(self, calls: List[Tuple[str, Callable[[], Any]]]) -> list:
+        """Run every call and summarize the outcome as ``["success", count]`` or
+        ``["error", count, index, reason, ...]`` listing the calls that failed"""
+        errors = []
+        for index, (address, call) in enumerate(calls):
+            try:
+                call()
+            except Exception as e:
+                self.log.warning("Error handling OSC message %s: %s", address, e)
+                errors.extend([index, str(e)])
+        return ["error" if errors else "success", len(calls)] + errors
+
+    def _register_routes(self):
+        router = self._router
+        router.collection("track", lambda: len(self._state.tracks))
+        router.collection("scene", lambda: self._state.scene_count)
+
+        router.add("/live/play", self._play)
+        router.add("/live/stop", self._stop)
+        router.add("/live/tempo", self._set_tempo)
+        for prop, handler in (("volume", self._set_track_volume), ("mute", self._set_track_mute),
+                              ("solo", self._set_track_solo), ("arm", self._set_track_arm)):
+            router.add(f"/live/track/{prop}", handler)
+            router.add(f"/live/track/<track>/{prop}", handler, patterns=True)
+        router.add("/live/clip/launch", self._launch_clip)
+        router.add("/live/track/<track>/clip/<scene>/launch", self._launch_clip)
+        router.add("/live/clip/notes", self._get_notes)
+        router.add("/live/track/<track>/clip/<scene>/notes", self._get_notes, patterns=True)
+        router.add("/live/clip/notes/set", self._set_notes)
+        router.add("/live/scene/launch", self._launch_scene)
+        router.add("/live/scene/<scene>/launch", self._launch_scene)
+        router.add("/live/get", lambda args: ("/live/get/response", self._get_live_set_info(args)))
+        router.add("/live/tracks", lambda args: ("/live/tracks/response", self._get_track_info(args)))
+        router.add("/live/track/devices", self._get_devices)
+        router.add("/live/track/<track>/devices", self._get_devices, patterns=True)
+        router.add("/live/device/parameters", self._get_parameters)
+        router.add("/live/device/parameters/set", self._set_parameters)
+        router.add("/live/session/matrix", self._session_matrix)
+        router.add("/live/peers", self._get_peers)
+        router.add("/live/batch", self._batch)
+        router.add("/live/subscribe", self._subscribe)
+        router.add("/live/unsubscribe", self._unsubscribe)
+        router.add(METERS_PATH, self._stream_meters)
+        router.add("/live/ramp", self._ramp)
+        router.add("/live/ramp/cancel", self._cancel_ramps)
+        router.add("/live/log/level", self._log_level)
+        router.add("/live/log/recent", self._recent_log)
+        router.add("/live/stats", lambda args: ("/live/stats/response", [json.dumps(
+            self._stats.snapshot(len(self._commands), len(self._scheduled)), separators=(",", ":"))]))
+        router.add("/live/stats/reset", self._reset_stats)
+
+        # Operations of /live/batch: name -> (argument count, step builder)
+        self._batch_ops: Dict[str, Tuple[int, Callable[[Any, list], BatchStep]]] = {
+            "volume": (2, self._volume_step),
+            "mute": (2, lambda song, args: _assignment(self._batch_track(song, args[0]), "mute", bool(int(args[1])))),
+            "solo": (2, lambda song, args: _assignment(self._batch_track(song, args[0]), "solo", bool(int(args[1])))),
+            "arm": (2, self._arm_step),
+            "tempo": (1, lambda song, args: _assignment(song, "tempo", max(20.0, min(999.0, float(args[0]))))),
+            "launch": (2, self._launch_step),
+            "parameter": (4, self._parameter_step),
         }
-        return [str(info)]
 
-    def _get_track_info(self):
-        self.parent.log_message("DEBUG: _get_track_info started")
-        song = self.parent._c_instance.song()
-        self.parent.log_message(f"DEBUG: got song, track count: {len(song.tracks)}")
-        tracks = []
-        for i, track in enumerate(song.tracks):
-            self.parent.log_message(f"DEBUG: processing track {i}")
-            # Handle arm property safely - Master/Return tracks don't support it
+    def _dispatch(self, address: str, args: list) -> Optional[Tuple[str, list]]:
+        """Apply one message to the Live set and return its ``(response address, args)``.
+
+        Index segments of the address are prepended to ``args``. A pattern that
+        selects several targets answers with one aggregated ``<pattern>/response``.
+        """
+        self.log.debug("OSC %r %r", address, args)
+
+        started = time.perf_counter()
+        targets = self._router.resolve(address)
+        if not targets:
+            self._stats.count("unknown_addresses")
+            return None
+        resolved = time.perf_counter()
+        self._stats.record(address, "dispatch", resolved - started)
+        failed = True
+        try:
+            if len(targets) == 1 and not is_pattern(address):
+                handler, indices = targets[0]
+                response = handler(indices + args)
+            else:
+                calls = [(address, lambda handler=handler, indices=indices: handler(indices + args))
+                         for handler, indices in targets]
+                response = (address + "/response", self._run_all(calls))
+            failed = False
+            return response
+        finally:
+            # Handlers work on the Live API directly, so their time is the Live API time
+            self._stats.record(address, "live", time.perf_counter() - resolved)
+            self._stats.call(address, failed)
+
+    def _song(self):
+        return self.parent._c_instance.song()
+
+    def _play(self, args: list):
+        self._song().start_playing()
+        return ("/live/play/response", ["success"])
+
+    def _stop(self, args: list):
+        self._song().stop_playing()
+        return ("/live/stop/response", ["success"])
+
+    def _set_tempo(self, args: list):
+        if not args:
+            return None
+        song = self._song()
+        tempo = float(args[0])
+        song.tempo = max(20.0, min(999.0, tempo))
+        return ("/live/tempo/response", ["success", song.tempo])
+
+    def _track(self, args: list):
+        """Track addressed by ``args[0]``, or ``None`` if it is out of range"""
+        song = self._song()
+        track_id = int(args[0])
+        if 0 <= track_id < len(song.tracks):
+            return song.tracks[track_id]
+        return None
+
+    def _set_track_volume(self, args: list):
+        if len(args) < 2:
+            return None
+        track = self._track(args)
+        if track is not None and hasattr(track, 'mixer_device') and hasattr(track.mixer_device, 'volume'):
+            track.mixer_device.volume.value = max(0.0, min(1.0, float(args[1])))
+            return ("/live/track/volume/response", ["success", int(args[0]), track.mixer_device.volume.value])
+        return None
+
+    def _set_track_mute(self, args: list):
+        if len(args) < 2:
+            return None
+        track = self._track(args)
+        if track is not None:
+            track.mute = bool(int(args[1]))
+            return ("/live/track/mute/response", ["success", int(args[0]), track.mute])
+        return None
+
+    def _set_track_solo(self, args: list):
+        if len(args) < 2:
+            return None
+        track = self._track(args)
+        if track is not None:
+            track.solo = bool(int(args[1]))
+            return ("/live/track/solo/response", ["success", int(args[0]), track.solo])
+        return None
+
+    def _set_track_arm(self, args: list):
+        if len(args) < 2:
+            return None
+        track = self._track(args)
+        if track is not None and hasattr(track, 'can_be_armed') and track.can_be_armed:
+            track.arm = bool(int(args[1]))
+            return ("/live/track/arm/response", ["success", int(args[0]), track.arm])
+        return None
+
+    def _launch_clip(self, args: list):
+        if len(args) < 2:
+            return None
+        song = self._song()
+        track_id = int(args[0])
+        clip_slot = int(args[1])
+        if 0 <= track_id < len(song.tracks) and 0 <= clip_slot < len(song.scenes):
+            clip_slots = song.tracks[track_id].clip_slots
+            if clip_slot < len(clip_slots) and clip_slots[clip_slot].clip:
+                clip_slots[clip_slot].clip.fire()
+                return ("/live/clip/launch/response", ["success", track_id, clip_slot])
+        return None
+
+    def _launch_scene(self, args: list):
+        if not args:
+            return None
+        song = self._song()
+        scene_id = int(args[0])
+        if 0 <= scene_id < len(song.scenes):
+            song.scenes[scene_id].fire()
+            return ("/live/scene/launch/response", ["success", scene_id])
+        return None
+
+    def _batch(self, args: list):
+        """Validate every operation in ``args`` and only then apply them all at once.
+
+        ``args`` is a flat list of operations, each its name followed by its
+        arguments, e.g. ``["volume", 0, 0.8, "mute", 3, 1, "tempo", 120.0]``.
+        Replies ``["success", count, result, ...]`` with the resulting value of
+        every operation, or ``["error", count, index, reason, ...]`` with
+        nothing applied. If applying fails part way, the operations already
+        applied are reverted (launched clips keep playing).
+        """
+        song = self._song()
+        steps: List[Optional[BatchStep]] = []
+        errors: list = []
+        position = 0
+        while position < len(args):
+            name = args[position]
+            operation = self._batch_ops.get(name)
+            if operation is None:
+                # The argument count is unknown, so the rest can't be parsed
+                errors.extend([len(steps), f"Unknown batch operation {name!r}"])
+                steps.append(None)
+                break
+            arity, build = operation
+            operation_args = args[position + 1:position + 1 + arity]
+            position += 1 + arity
+            try:
+                if len(operation_args) < arity:
+                    raise ValueError(f"{name} takes {arity} arguments")
+                steps.append(build(song, operation_args))
+            except Exception as e:
+                errors.extend([len(steps), str(e)])
+                steps.append(None)
+        if errors:
+            return ("/live/batch/response", ["error", len(steps)] + errors)
+        return ("/live/batch/response", self._apply_steps(song, steps))
+
+    def _apply_steps(self, song, steps: List[BatchStep]) -> list:
+        """Apply validated steps in one undo step where Live supports it.
+
+        Returns ``["success", count, result, ...]``, or ``["error", count,
+        index, reason]`` after reverting the steps applied before the failing
+        one.
+        """
+        begin_undo = getattr(song, "begin_undo_step", None)
+        if begin_undo is not None:
+            begin_undo()
+        results = []
+        try:
+            for index, (apply, _) in enumerate(steps):
+                results.append(apply())
+        except Exception as e:
+            self.log.warning("Batch operation %d failed, reverting: %s", index, e)
+            for _, restore in reversed(steps[:index]):
+                if restore is not None:
+                    try:
+                        restore()
+                    except Exception as restore_error:
+                        self.log.error("Could not revert batch operation: %s", restore_error)
+            return ["error", len(steps), index, str(e)]
+        finally:
+            if begin_undo is not None:
+                song.end_undo_step()
+        return ["success", len(steps)] + results
+
+    @staticmethod
+    def _batch_track(song, value: Any):
+        track_id = int(value)
+        if not 0 <= track_id < len(song.tracks):
+            raise ValueError(f"Track {track_id} out of range")
+        return song.tracks[track_id]
+
+    def _volume_step(self, song, args: list) -> BatchStep:
+        volume = getattr(getattr(self._batch_track(song, args[0]), 'mixer_device', None), 'volume', None)
+        if volume is None:
+            raise ValueError(f"Track {args[0]} has no volume")
+        return _assignment(volume, "value", max(0.0, min(1.0, float(args[1]))))
+
+    def _arm_step(self, song, args: list) -> BatchStep:
+        track = self._batch_track(song, args[0])
+        if not getattr(track, 'can_be_armed', False):
+            raise ValueError(f"Track {args[0]} can't be armed")
+        return _assignment(track, "arm", bool(int(args[1])))
+
+    def _launch_step(self, song, args: list) -> BatchStep:
+        clip_slots = self._batch_track(song, args[0]).clip_slots
+        slot = int(args[1])
+        clip = clip_slots[slot].clip if 0 <= slot < len(clip_slots) else None
+        if not clip:
+            raise ValueError(f"No clip at track {args[0]} slot {slot}")
+
+        def fire():
+            clip.fire()
+            return True
+        return fire, None
+
+    def _parameter_step(self, song, args: list) -> BatchStep:
+        parameter = find_parameter(device_parameters(self._batch_track(song, args[0]), args[1]), args[2])
+        return _assignment(parameter, "value", parameter_value(parameter, args[3]))
+
+    @staticmethod
+    def _page_options(address: str, args: list) -> Tuple[Tuple[str, ...], int, Optional[int]]:
+        """``fields``, ``start`` and ``count`` of ``key, value`` option pairs"""
+        if len(args) % 2:
+            raise ValueError(f"{address} options must be key, value pairs")
+        options = dict(zip(args[0::2], args[1::2]))
+        unknown = set(options) - {"fields", "start", "count"}
+        if unknown:
+            raise ValueError(f"Unknown {address} options: {', '.join(sorted(unknown))}")
+        count = options.get("count")
+        return options.get("fields"), int(options.get("start", 0)), None if count is None else int(count)
+
+    def _get_devices(self, args: list):
+        """A page of a track's devices as JSON.
+
+        ``args`` is the track index followed by ``key, value`` options:
+        ``fields`` (comma separated, from ``DEVICE_FIELDS``), ``start`` and
+        ``count``.
+        """
+        if not args:
+            return None
+        track = self._batch_track(self._song(), args[0])
+        fields, start, count = self._page_options("/live/track/devices", args[1:])
+        reply = device_page(track, parse_fields(fields, DEVICE_FIELDS), start, count)
+        reply = {"track": int(args[0]), "count": reply["count"], "start": reply["start"], "devices": reply["rows"]}
+        return ("/live/track/devices/response", [json.dumps(reply, separators=(",", ":"))])
+
+    def _get_parameters(self, args: list):
+        """A page of a device's parameters as JSON.
+
+        ``args`` is the track index, the device index (or ``mixer``) and
+        ``key, value`` options: ``fields`` (comma separated, from
+        ``PARAMETER_FIELDS``), ``start`` and ``count``.
+        """
+        if len(args) < 2:
+            return None
+        parameters = device_parameters(self._batch_track(self._song(), args[0]), args[1])
+        fields, start, count = self._page_options("/live/device/parameters", args[2:])
+        reply = parameter_page(parameters, parse_fields(fields, PARAMETER_FIELDS), start, count)
+        reply = {"track": int(args[0]), "device": args[1], "count": reply["count"], "start": reply["start"],
+                 "parameters": reply["rows"]}
+        return ("/live/device/parameters/response", [json.dumps(reply, separators=(",", ":"))])
+
+    def _set_parameters(self, args: list):
+        """Set many parameters of one device at once, like a ``/live/batch``.
+
+        ``args`` is the track index, the device index (or ``mixer``) and
+        ``parameter, value`` pairs, each parameter given by index or name.
+        Values are clamped to the parameter's range. Replies ``["success",
+        count, value, ...]`` or ``["error", count, index, reason, ...]`` with
+        nothing written.
+        """
+        if len(args) < 2 or len(args) % 2:
+            return None
+        song = self._song()
+        parameters = device_parameters(self._batch_track(song, args[0]), args[1])
+        steps: List[BatchStep] = []
+        errors: list = []
+        count = (len(args) - 2) // 2
+        for number in range(count):
+            key, value = args[2 + 2 * number:4 + 2 * number]
             try:
-                arm_state = track.arm if hasattr(track, 'can_be_armed') and track.can_be_armed else False
-            except:
-                arm_state = False
-
-            track_info = {
-                "index": i,
-                "name": str(track.name) if hasattr(track, 'name') else f"Track {i}",
-                "color": track.color_index if hasattr(track, 'color_index') else 0,
-                "is_foldable": hasattr(track, 'is_foldable') and track.is_foldable,
-                "mute": track.mute if hasattr(track, 'mute') else False,
-                "solo": track.solo if hasattr(track, 'solo') else False,
-                "arm": arm_state,
-                "volume": track.mixer_device.volume.value if hasattr(track, 'mixer_device') and hasattr(track.mixer_device, 'volume') else None
-            }
-            tracks.append(track_info)
-        self.parent.log_message(f"DEBUG: processed {len(tracks)} tracks")
-        import json
-        result = [json.dumps(tracks)]
-        self.parent.log_message(f"DEBUG: JSON serialized, length: {len(result[0])}")
-        return result
-
-    def _parse_osc_message(self, data: bytes) -> Tuple[str, list]:
+                parameter = find_parameter(parameters, key)
+                steps.append(_assignment(parameter, "value", parameter_value(parameter, value)))
+            except Exception as e:
+                errors.extend([number, str(e)])
+        if errors:
+            return ("/live/device/parameters/set/response", ["error", count] + errors)
+        return ("/live/device/parameters/set/response", self._apply_steps(song, steps))
+
+    def _midi_clip(self, song, args: list):
+        clip_slots = self._batch_track(song, args[0]).clip_slots
+        slot = int(args[1])
+        clip = clip_slots[slot].clip if 0 <= slot < len(clip_slots) else None
+        if not clip:
+            raise ValueError(f"No clip at track {args[0]} slot {slot}")
+        if not getattr(clip, "is_midi_clip", False):
+            raise ValueError(f"Clip at track {args[0]} slot {slot} is not a MIDI clip")
+        return clip
+
+    def _get_notes(self, args: list):
+        """A chunk of a MIDI clip's notes as a snapshot blob.
+
+        ``args`` is the track and clip slot index followed by ``key, value``
+        options: ``start`` (index of the first note) and ``count`` (notes per
+        chunk). Notes are ordered by start and pitch, and the blob carries
+        the version of the note list so chunks of different versions are
+        never mixed.
+        """
+        if len(args) < 2:
+            return None
+        clip = self._midi_clip(self._song(), args)
+        options = args[2:]
+        if len(options) % 2:
+            raise ValueError("/live/clip/notes options must be key, value pairs")
+        options = dict(zip(options[0::2], options[1::2]))
+        unknown = set(options) - {"start", "count"}
+        if unknown:
+            raise ValueError(f"Unknown /live/clip/notes options: {', '.join(sorted(unknown))}")
+        start = max(0, int(options.get("start", 0)))
+        count = max(0, min(MAX_CHUNK, int(options.get("count", DEFAULT_CHUNK))))
+
+        version, notes = self._notes.notes((int(args[0]), int(args[1])), clip)
+        return ("/live/clip/notes/response", [encode_notes(version, len(notes), start, notes[start:start + count])])
+
+    def _set_notes(self, args: list):
+        """Receive a chunk of a MIDI clip's new notes and, with the last one,
+        replace the clip's notes in one Live call and one undo step.
+
+        ``args`` is the track and clip slot index and a note chunk blob.
+        Replies ``["pending", received, total]`` until every chunk is in,
+        then ``["success", total]``.
+        """
+        if len(args) < 3:
+            return None
+        song = self._song()
+        clip = self._midi_clip(song, args)
+        _, total, start, notes = decode_notes(args[2])
+        for pitch, _, duration, _, _ in notes:
+            if pitch > 127 or not duration > 0:
+                raise ValueError(f"Invalid note: pitch {pitch}, duration {duration}")
+        key = (int(args[0]), int(args[1]))
+        received, complete = self._note_uploads.add((self._sender,) + key, total, start, notes)
+        if complete is None:
+            return ("/live/clip/notes/set/response", ["pending", received, total])
+
+        begin_undo = getattr(song, "begin_undo_step", None)
+        if begin_undo is not None:
+            begin_undo()
         try:
-            idx = data.index(b',')
-            address = data[:idx].decode('utf-8').rstrip('\x00')
-
-            type_tags = []
-            values = []
-
-            type_tag_start = idx
-            idx = data.index(b'\x00', type_tag_start) + 1
-            if idx % 4 != 0:
-                idx += 4 - (idx % 4)
-
-            type_tags_str = data[type_tag_start:idx].decode('utf-8').rstrip('\x00')
-
-            for tag in type_tags_str[1:]:
-                if tag == 'i':
-                    value = struct.unpack('>i', data[idx:idx+4])[0]
-                    values.append(value)
-                    idx += 4
-                elif tag == 'f':
-                    value = struct.unpack('>f', data[idx:idx+4])[0]
-                    values.append(value)
-                    idx += 4
-                elif tag == 's':
-                    end = data.index(b'\x00', idx)
-                    value = data[idx:end].decode('utf-8')
-                    values.append(value)
-                    idx = end + 1
-                    if idx % 4 != 0:
-                        idx += 4 - (idx % 4)
-
-            return address, values
+            replace_notes(clip, complete)
+        finally:
+            if begin_undo is not None:
+                song.end_undo_step()
+        self._notes.forget(key)
+        return ("/live/clip/notes/set/response", ["success", total])
+
+    def _session_matrix(self, args: list):
+        """Every clip slot's flags as a snapshot blob, with clip names for ``["names", 1]``"""
+        if len(args) % 2:
+            raise ValueError("/live/session/matrix options must be key, value pairs")
+        options = dict(zip(args[0::2], args[1::2]))
+        unknown = set(options) - {"names"}
+        if unknown:
+            raise ValueError(f"Unknown /live/session/matrix options: {', '.join(sorted(unknown))}")
+        if self._matrix is None:
+            self._matrix = SessionMatrix(self._song())
+        return ("/live/session/matrix/response", [self._matrix.packed(bool(int(options.get("names", 0))))])
+
+    def _get_peers(self, args: list):
+        peers = []
+        for peer in self.active_peers():
+            if isinstance(peer, StreamPeer):
+                peers.append(f"tcp:{peer.addr[0]}:{peer.addr[1]}")
+            else:
+                peers.append(f"udp:{peer[0]}:{peer[1]}")
+        return ("/live/peers/response", peers)
+
+    def _subscribe(self, args: list):
+        """Subscribe the sender to the paths matching ``args``; subscribing
+        again renews the lease. Current values are sent for new patterns only."""
+        patterns = [str(arg) for arg in args]
+        if not patterns:
+            return None
+        # A pattern that can't be matched would fail every later tick
+        for pattern in patterns:
+            validate_pattern(pattern)
+        _, current = self._subscriptions.get(self._sender, (0.0, []))
+        added = [pattern for pattern in dict.fromkeys(patterns) if pattern not in current]
+        subscribed = current + added
+        self._subscriptions[self._sender] = (time.monotonic() + self.subscription_lease, subscribed)
+
+        if added:
+            snapshot = self._snapshots.setdefault(self._sender, {})
+            for path, value in self._state.values():
+                if any(matches(pattern, path) for pattern in added):
+                    snapshot[path] = value
+        return ("/live/subscribe/response", ["success", self.subscription_lease] + subscribed)
+
+    def _unsubscribe(self, args: list):
+        """Drop the given patterns, or every subscription of the sender without arguments"""
+        _, current = self._subscriptions.pop(self._sender, (0.0, []))
+        remaining = [pattern for pattern in current if args and pattern not in args]
+        if remaining:
+            self._subscriptions[self._sender] = (time.monotonic() + self.subscription_lease, remaining)
+        return ("/live/unsubscribe/response", ["success"] + remaining)
+
+    def _stream_meters(self, args: list):
+        """Stream the sender's meter levels with ``key, value`` options ``rate``
+        (frames per second, 0 stops), ``hold`` (peak hold seconds) and
+        ``tracks`` (comma separated indices, every track by default).
+
+        Subscribes the sender to ``METERS_PATH``; the stream lasts as long as
+        that subscription.
+        """
+        if len(args) % 2:
+            raise ValueError("/live/meters options must be key, value pairs")
+        options = dict(zip(args[0::2], args[1::2]))
+        unknown = set(options) - {"rate", "hold", "tracks"}
+        if unknown:
+            raise ValueError(f"Unknown /live/meters options: {', '.join(sorted(unknown))}")
+        rate = float(options.get("rate", DEFAULT_RATE))
+        if rate <= 0:
+            self._meters.pop(self._sender, None)
+            self._unsubscribe([METERS_PATH])
+            return ("/live/meters/response", ["success", 0.0, 0.0])
+
+        tracks = options.get("tracks")
+        if tracks is not None:
+            tracks = sorted({int(index) for index in str(tracks).split(",") if index.strip()})
+        stream = MeterStream(tracks, rate, float(options.get("hold", DEFAULT_HOLD)))
+        current = self._meters.get(self._sender)
+        if current is None or current.options != stream.options:
+            # Sending the same options again (as renewals do) keeps the running stream
+            self._meters[self._sender] = stream
+        self._subscribe([METERS_PATH])
+        return ("/live/meters/response", ["success", self.subscription_lease, rate])
+
+    def _push_meters(self):
+        """Read the meters every stream needs once and send the frames that are due"""
+        now = time.monotonic()
+        tracks = self._song().tracks
+        readings: Dict[int, Optional[Tuple[float, float]]] = {}
+        for peer, stream in list(self._meters.items()):
+            expires, patterns = self._subscriptions.get(peer, (0.0, []))
+            if expires < now or METERS_PATH not in patterns:
+                del self._meters[peer]
+                continue
+            for index in range(len(tracks)) if stream.tracks is None else stream.tracks:
+                if index not in readings:
+                    readings[index] = self._read_meter(tracks, index)
+                if readings[index] is not None:
+                    stream.add(index, *readings[index])
+            frame = stream.frame(now)
+            if frame is not None:
+                self._send_notifications(peer, [(NOTIFY_PREFIX + METERS_PATH, [frame])])
 
+    @staticmethod
+    def _read_meter(tracks, index: int) -> Optional[Tuple[float, float]]:
+        if not 0 <= index < len(tracks):
+            return None
+        track = tracks[index]
+        try:
+            return float(getattr(track, 'output_meter_left', 0.0)), float(getattr(track, 'output_meter_right', 0.0))
+        except Exception:
+            # Tracks without audio output have no meters
+            return 0.0, 0.0
+
+    def _ramp(self, args: list):
+        """Move the values matching ``args[0]`` (``/live/tempo`` or
+        ``/live/track/<index>/volume``, patterns allowed) to ``args[1]`` over
+        ``args[2]`` seconds along the curve named by ``args[3]`` (linear by
+        default); replies with the paths being ramped"""
+        if len(args) < 3:
+            raise ValueError("/live/ramp takes a target, value, duration and optional curve")
+        pattern, end, duration = str(args[0]), float(args[1]), float(args[2])
+        curve = str(args[3]) if len(args) > 3 else "linear"
+        now = time.monotonic()
+        started = []
+        for path, value in self._state.values():
+            if value is None or not matches(pattern, path):
+                continue
+            target = self._ramp_target(path)
+            if target is not None:
+                setter, low, high = target
+                # Targets are clamped up front so the ramp writes exactly what it interpolates
+                self._ramps.start(path, setter, float(value), max(low, min(high, end)), duration, now, curve)
+                started.append(path)
+        if not started:
+            raise ValueError(f"No rampable value at {pattern}")
+        return ("/live/ramp/response", ["success"] + started)
+
+    def _ramp_target(self, path: str) -> Optional[Tuple[Callable[[float], None], float, float]]:
+        """Setter and range of the value at ``path``, ``None`` if it can't be ramped"""
+        if path == "/live/tempo":
+            return partial(setattr, self._song(), "tempo"), 20.0, 999.0
+        parts = path.split("/")
+        if len(parts) == 5 and parts[2] == "track" and parts[4] == "volume":
+            volume = self._song().tracks[int(parts[3])].mixer_device.volume
+            return partial(setattr, volume, "value"), 0.0, 1.0
+        return None
+
+    def _cancel_ramps(self, args: list):
+        """Stop the ramps matching the patterns in ``args``, or every ramp"""
+        cancelled = []
+        for path in self._ramps.paths():
+            if not args or any(matches(str(pattern), path) for pattern in args):
+                self._ramps.cancel(path)
+                cancelled.append(path)
+        return ("/live/ramp/cancel/response", ["success"] + cancelled)
+
+    def _state_changed(self, path: str, value: Any):
+        if self._ramps:
+            # Someone else writing a ramped value cancels the ramp
+            self._ramps.written(path, value)
+        if self._subscriptions:
+            self._changes[path] = value
+
+    def _push_changes(self):
+        """Send each subscriber the values that changed during this tick, coalesced"""
+        changes, self._changes = self._changes, {}
+        snapshots, self._snapshots = self._snapshots, {}
+        now = time.monotonic()
+        for peer, (expires, patterns) in list(self._subscriptions.items()):
+            if expires < now:
+                del self._subscriptions[peer]
+                continue
+            values = snapshots.get(peer, {})
+            try:
+                for path, value in changes.items():
+                    if any(matches(pattern, path) for pattern in patterns):
+                        values[path] = value
+            except Exception as e:
+                # One broken subscription must not cost the others their changes
+                self.log.warning("Dropping subscriptions of %s: %s", peer, e)
+                del self._subscriptions[peer]
+                continue
+            if values:
+                self._send_notifications(peer, [(NOTIFY_PREFIX + path, [] if value is None else [value])
+                                                for path, value in values.items()])
+
+    def _send_notifications(self, peer: Any, messages: List[Tuple[str, list]]):
+        try:
+            if isinstance(peer, StreamPeer):
+                peer.send(encode_bundle(messages))
+            elif self.socket:
+                for packet in encode_bundles(messages, IMMEDIATELY, self.max_datagram_size):
+                    self.socket.sendto(packet, peer)
         except Exception as e:
-            self.parent.log_message(f"OSC parse error: {e}")
-            return "", []
+            self.log.warning("Failed to push changes to %s, unsubscribing: %s", peer, e)
+            self._subscriptions.pop(peer, None)
+
+    def _log_level(self, args: list):
+        if args:
+            self.log.level = parse_level(args[0])
+        return ("/live/log/level/response", ["success", level_name(self.log.level)])
 
-    def _send_response(self, addr: Tuple[str, int], osc_addr: str, args: list):
+    def _reset_stats(self, args: list):
+        self._stats.reset()
+        return ("/live/stats/reset/response", ["success"])
+
+    def _recent_log(self, args: list):
+        return ("/live/log/recent/response", self.log.recent(int(args[0]) if args else None))
+
+    def _get_live_set_info(self, args: list):
+        """The set info as a ``str(dict)``, or a snapshot blob for ``["format", "binary"]``"""
+        info = self._state.live_set_info()
+        if self._binary_format(dict(zip(args[0::2], args[1::2]))):
+            return [encode_set_info(info)]
+        return [str(info)]
+
+    @staticmethod
+    def _binary_format(options: Dict[str, Any]) -> bool:
+        reply_format = options.get("format", "text")
+        if reply_format not in ("text", "binary"):
+            raise ValueError(f"Unknown reply format {reply_format!r}")
+        return reply_format == "binary"
+
+    def _get_track_info(self, args: list):
+        """Every track as a JSON list followed by ``version, epoch``.
+
+        ``[since, epoch]`` or ``key, value`` pairs (``fields`` as a comma
+        separated list, ``start``, ``count``, ``since``, ``epoch``) return a
+        JSON object with just the requested part of the track list instead,
+        or a snapshot blob of it with ``format`` ``binary``.
+        """
+        state = self._state
+        if not args:
+            return [state.tracks_json(), state.version, state.epoch]
+
+        if isinstance(args[0], str):
+            if len(args) % 2:
+                raise ValueError("/live/tracks options must be key, value pairs")
+            options = dict(zip(args[0::2], args[1::2]))
+        else:
+            options = {"since": args[0], "epoch": args[1] if len(args) > 1 else None}
+        unknown = set(options) - {"fields", "start", "count", "since", "epoch", "format"}
+        if unknown:
+            raise ValueError(f"Unknown /live/tracks options: {', '.join(sorted(unknown))}")
+
+        fields = options.get("fields")
+        binary = self._binary_format(options)
+        if binary and fields is not None:
+            raise ValueError("Binary track snapshots always hold every field")
+        reply = state.query_tracks(
+            since=None if options.get("since") is None else int(options["since"]),
+            epoch=None if options.get("epoch") is None else int(options["epoch"]),
+            start=int(options.get("start", 0)),
+            count=None if options.get("count") is None else int(options["count"]),
+            fields=None if fields is None else [field.strip() for field in str(fields).split(",") if field.strip()])
+        if binary:
+            return [encode_tracks(reply)]
+        return [json.dumps(reply, separators=(",", ":"))]
+
+    def _send_response(self, addr: Any, osc_addr: str, args: list,
+                       request_id: Optional[int] = None):
         if not self.socket:
             return
 
+        # Replies are counted against the endpoint that was asked
+        endpoint = osc_addr[:-len("/response")] if osc_addr.endswith("/response") else osc_addr
+        if request_id is not None:
+            osc_addr = request_address(request_id, osc_addr)
         try:
-            message = self._encode_osc_message(osc_addr, args)
-            # Always send responses to localhost:11001 where the Python client listens
-            response_addr = ('127.0.0.1', 11001)
-            self.socket.sendto(message, response_addr)
-            self.parent.log_message(f"Sent response {osc_addr} to {response_addr}")
+            started = time.perf_counter()
+            message = thread_encoder().encode(osc_addr, args)
+            encoded = time.perf_counter()
+            self._stats.record(endpoint, "encode", encoded - started)
+            if isinstance(addr, StreamPeer):
+                # Streams have no datagram limit and keep the reply ordered
+                addr.send(message)
+                self._stats.record(endpoint, "send", time.perf_counter() - encoded)
+                self.log.debug("Sent response %s to %s", osc_addr, addr)
+                return
+            # Reply to the socket the request came from
+            if len(message) <= self.max_datagram_size:
+                self.socket.sendto(message, addr)
+            else:
+                for chunk in chunk_packet(message, next(self._transfer_ids), self.max_datagram_size):
+                    self.socket.sendto(encode_message(*chunk), addr)
+                self._stats.count("chunked_replies")
+            self._stats.record(endpoint, "send", time.perf_counter() - encoded)
+            self.log.debug("Sent response %s to %s", osc_addr, addr)
         except Exception as e:
-            self.parent.log_message(f"Failed to send OSC response: {e}")
-
-    def _encode_osc_message(self, address: str, args: list) -> bytes:
-        address_bytes = address.encode('utf-8') + b'\x00'
-        if len(address_bytes) % 4 != 0:
-            address_bytes += b'\x00' * (4 - len(address_bytes) % 4)
-
-        type_tags = ','
-        arg_bytes = b''
-
-        for arg in args:
-            if isinstance(arg, int):
-                type_tags += 'i'
-                arg_bytes += struct.pack('>i', arg)
-            elif isinstance(arg, float):
-                type_tags += 'f'
-                arg_bytes += struct.pack('>f', arg)
-            elif isinstance(arg, str):
-                type_tags += 's'
-                s_bytes = arg.encode('utf-8') + b'\x00'
-                if len(s_bytes) % 4 != 0:
-                    s_bytes += b'\x00' * (4 - len(s_bytes) % 4)
-                arg_bytes += s_bytes
-
-        type_tag_bytes = type_tags.encode('utf-8') + b'\x00'
-        if len(type_tag_bytes) % 4 != 0:
-            type_tag_bytes += b'\x00' * (4 - len(type_tag_bytes) % 4)
-
-        return address_bytes + type_tag_bytes + arg_bytes
+            self._stats.count("send_errors")
+            self.log.sampled("send", ERROR, "Failed to send OSC response: %s", e)
 
     def process_messages(self):
-        pass
+        """Run queued commands on Live's main thread; called from update_display.
+
+        Stops once ``tick_budget`` seconds are spent and leaves the rest for
+        the next tick.
+        """
+        tick_started = time.perf_counter()
+        now = time.monotonic()
+        if self._scheduled:
+            with self._scheduled_lock:
+                while self._scheduled and self._scheduled[0][0] <= now:
+                    self._commands.append(heapq.heappop(self._scheduled)[2])
+
+        commands = self._commands
+        deadline = time.perf_counter() + self.tick_budget
+        while commands:
+            try:
+                commands.popleft()()
+            except Exception as e:
+                self.log.error("Error running OSC command: %s", e)
+            if time.perf_counter() >= deadline:
+                break
+
+        if self._ramps:
+            for path, error in self._ramps.advance(time.monotonic()):
+                self.log.warning("Ramp of %s stopped: %s", path, error)
+        if self._changes or self._snapshots:
+            self._push_changes()
+        if self._meters:
+            self._push_meters()
+        self._stats.tick(time.perf_counter() - tick_started, bool(commands))
 
     def shutdown(self):
         self.running = False
+        self._state.disconnect()
+        if self._matrix is not None:
+            self._matrix.disconnect()
+        self._notes.clear()
+        if self._listener:
+            self._listener.stop()
+        if self._stream_listener:
+            self._stream_listener.stop()
         if self.thread:
             self.thread.join(timeout=1.0)
+        if self.tcp_thread:
+            self.tcp_thread.join(timeout=1.0)
         if self.socket:
             self.socket.close()
             self.socket = None
-        self.parent.log_message("OSC Server shut down")
\ No newline at end of file
+        if self.tcp_socket:
+            self.tcp_socket.close()
+            self.tcp_socket = None
+        self.log.info("OSC Server shut down")
\ No newline at end of file
@@ -5,7 +5,7 @@ class OrbitRemote:
     def __init__(self, c_instance):
         self._c_instance = c_instance
         self.log_message = c_instance.log_message
-        self._osc_server = OSCServer(self, port=11000)
+        self._osc_server = OSCServer(self, port=11000, tcp_port=11000)
         self.log_message("OrbitRemote: Initialized with OSC server")
 
     def disconnect(self):
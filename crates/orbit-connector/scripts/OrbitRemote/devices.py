@@ -0,0 +1,105 @@
+"""
+Device and parameter pages for ``/live/track/devices`` and ``/live/device/parameters``.
+
+Devices can have hundreds of parameters and every Live API property read
+crosses into Live, so only the rows of the requested page are visited and
+only the requested fields of those rows are read.
+
+A track's mixer is addressed as the device ``"mixer"``; its parameters are
+volume, panning and the sends, in that order.
+"""
+
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+MIXER = "mixer"
+
+# Fields of /live/track/devices rows, in reply order
+DEVICE_FIELDS = ("index", "name", "class_name", "type", "is_active", "parameter_count")
+# Fields of /live/device/parameters rows, in reply order
+PARAMETER_FIELDS = ("index", "name", "value", "min", "max", "is_quantized", "is_enabled", "value_items")
+
+_DEVICE_READERS: Dict[str, Callable[[Any], Any]] = {
+    "name": lambda device: device.name,
+    "class_name": lambda device: getattr(device, "class_name", None),
+    "type": lambda device: int(getattr(device, "type", 0)),
+    "is_active": lambda device: bool(getattr(device, "is_active", True)),
+    "parameter_count": lambda device: len(device.parameters),
+}
+_PARAMETER_READERS: Dict[str, Callable[[Any], Any]] = {
+    "name": lambda parameter: parameter.name,
+    "value": lambda parameter: float(parameter.value),
+    "min": lambda parameter: float(parameter.min),
+    "max": lambda parameter: float(parameter.max),
+    "is_quantized": lambda parameter: bool(getattr(parameter, "is_quantized", False)),
+    "is_enabled": lambda parameter: bool(getattr(parameter, "is_enabled", True)),
+    "value_items": lambda parameter: [str(item) for item in getattr(parameter, "value_items", ())],
+}
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Tuple[str, ...]:
+    """Fields of a comma separated ``fields`` option (every field without
+    one), always starting with ``index``"""
+    if fields is None:
+        return tuple(allowed)
+    requested = [field.strip() for field in str(fields).split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ("index",) + tuple(field for field in requested if field != "index")
+
+
+def page(items: Sequence[Any], fields: Sequence[str], readers: Dict[str, Callable[[Any], Any]],
+         start: int = 0, count: Optional[int] = None) -> Dict[str, Any]:
+    """Rows ``start`` to ``start + count`` of ``items`` with just ``fields``"""
+    start = max(0, start)
+    stop = len(items) if count is None else min(len(items), start + max(0, count))
+    rows = []
+    for index in range(start, stop):
+        item = items[index]
+        rows.append({field: index if field == "index" else readers[field](item) for field in fields})
+    return {"count": len(items), "start": start, "rows": rows}
+
+
+def device_page(track, fields: Sequence[str], start: int = 0, count: Optional[int] = None) -> Dict[str, Any]:
+    return page(track.devices, fields, _DEVICE_READERS, start, count)
+
+
+def parameter_page(parameters: Sequence[Any], fields: Sequence[str], start: int = 0,
+                   count: Optional[int] = None) -> Dict[str, Any]:
+    return page(parameters, fields, _PARAMETER_READERS, start, count)
+
+
+def device_parameters(track, device: Any) -> Sequence[Any]:
+    """Parameters of the track's device at index ``device``, or of its mixer"""
+    if device == MIXER:
+        mixer = track.mixer_device
+        return [mixer.volume, mixer.panning] + list(getattr(mixer, "sends", ()))
+    devices = track.devices
+    index = int(device)
+    if not 0 <= index < len(devices):
+        raise ValueError(f"Device {index} out of range")
+    return devices[index].parameters
+
+
+def find_parameter(parameters: Sequence[Any], key: Any) -> Any:
+    """Parameter by index, or by name if ``key`` is a string"""
+    if isinstance(key, str) and not key.isdigit():
+        for parameter in parameters:
+            if parameter.name == key:
+                return parameter
+        raise ValueError(f"No parameter named {key!r}")
+    index = int(key)
+    if not 0 <= index < len(parameters):
+        raise ValueError(f"Parameter {index} out of range")
+    return parameters[index]
+
+
+def parameter_value(parameter, value: float) -> float:
+    """``value`` clamped to the parameter's range, and whole for quantized
+    parameters, since Live rejects anything else"""
+    if not getattr(parameter, "is_enabled", True):
+        raise ValueError(f"Parameter {parameter.name!r} is disabled")
+    value = max(parameter.min, min(parameter.max, float(value)))
+    if getattr(parameter, "is_quantized", False):
+        value = float(round(value))
+    return value
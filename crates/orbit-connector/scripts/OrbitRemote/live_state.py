@@ -0,0 +1,228 @@
+"""
+In-memory model of the Live set for OrbitRemote.
+
+The model is read from the song once and then kept current by Live's change
+listeners, so session queries are answered without walking the Live API.
+Like every Live API access it must be built, updated and read on Live's main
+thread.
+"""
+
+import json
+import random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Fields of every track in /live/tracks, in reply order
+TRACK_FIELDS = ("index", "name", "color", "is_foldable", "mute", "solo", "arm", "volume")
+
+# Called with the path and new value of every change, e.g. ("/live/tempo", 128.0)
+ChangeCallback = Callable[[str, Any], None]
+
+
+def _read_arm(track) -> bool:
+    # Master/Return tracks don't support arm
+    try:
+        return bool(track.arm) if getattr(track, 'can_be_armed', False) else False
+    except Exception:
+        return False
+
+
+def _read_volume(parameter) -> Optional[float]:
+    return parameter.value if parameter is not None else None
+
+
+def listen(subject, prop: str, callback: Callable[[], None], into: list):
+    """Add a Live listener for ``prop`` if ``subject`` has one, recording it in ``into``"""
+    add = getattr(subject, f"add_{prop}_listener", None)
+    if add is None:
+        return
+    add(callback)
+    into.append((subject, prop, callback))
+
+
+def unlisten(listeners: list):
+    """Remove every listener recorded by ``listen()``"""
+    for subject, prop, callback in listeners:
+        try:
+            getattr(subject, f"remove_{prop}_listener")(callback)
+        except Exception:
+            # The track may already be gone from the set
+            pass
+    del listeners[:]
+
+
+class LiveState:
+    """Cached tempo, transport and track list of a Live song.
+
+    Every value has a path: ``/live/tempo``, ``/live/transport`` (is playing),
+    ``/live/tracks`` (track count) and ``/live/track/<index>/<field>`` for the
+    fields of ``/live/tracks``. ``on_change`` is called for each value that
+    changes.
+
+    ``version`` grows with every change and each track records the version it
+    last changed at, so ``query_tracks()`` can return only what a client has
+    not seen. ``epoch`` is random per instance, so versions handed out before
+    a restart are never mistaken for current ones.
+    """
+
+    def __init__(self, song, on_change: Optional[ChangeCallback] = None):
+        self._song = song
+        self._on_change = on_change
+        # (subject, property, callback) for every listener this model added
+        self._song_listeners: List[Tuple[Any, str, Callable[[], None]]] = []
+        self._track_listeners: List[Tuple[Any, str, Callable[[], None]]] = []
+        self._tracks_json: Optional[str] = None
+
+        self.tempo = song.tempo
+        self.is_playing = song.is_playing
+        self.scene_count = len(song.scenes)
+        self.tracks: List[Dict[str, Any]] = []
+        self.epoch = random.getrandbits(31)
+        self.version = 0
+        self._track_versions: List[int] = []
+        # Index -> version at which the track at that index was deleted
+        self._removed: Dict[int, int] = {}
+
+        self._listen(song, "tempo", self._on_tempo, self._song_listeners)
+        self._listen(song, "is_playing", self._on_is_playing, self._song_listeners)
+        self._listen(song, "scenes", self._on_scenes, self._song_listeners)
+        self._listen(song, "tracks", self._rebuild_tracks, self._song_listeners)
+        self._read_tracks(initial=True)
+
+    def live_set_info(self) -> Dict[str, Any]:
+        return {
+            "tempo": self.tempo,
+            "is_playing": self.is_playing,
+            "track_count": len(self.tracks),
+            "scene_count": self.scene_count
+        }
+
+    def tracks_json(self) -> str:
+        """The track list as JSON, serialized again only after a change"""
+        if self._tracks_json is None:
+            self._tracks_json = json.dumps(self.tracks)
+        return self._tracks_json
+
+    def query_tracks(self, since: Optional[int] = None, epoch: Optional[int] = None, start: int = 0,
+                     count: Optional[int] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Tracks ``start`` to ``start + count`` reduced to ``fields`` (plus ``index``).
+
+        With ``since``, only tracks changed after that version are included
+        along with the indices deleted since then; if ``since`` does not belong
+        to this instance (``epoch`` differs) every track is (``"full": true``).
+        """
+        if fields is not None:
+            unknown = [field for field in fields if field not in TRACK_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown track fields: {', '.join(unknown)}")
+        stop = len(self.tracks) if count is None else min(len(self.tracks), start + count)
+        start = max(0, start)
+
+        full = since is None or epoch != self.epoch or since > self.version
+        if full:
+            tracks, removed = self.tracks[start:stop], []
+        else:
+            versions = self._track_versions
+            tracks = [self.tracks[index] for index in range(start, stop) if versions[index] > since]
+            removed = sorted(index for index, stamp in self._removed.items() if stamp > since)
+        if fields is not None:
+            keys = ["index"] + [field for field in fields if field != "index"]
+            tracks = [{key: info[key] for key in keys} for info in tracks]
+        return {"epoch": self.epoch, "version": self.version, "full": full, "count": len(self.tracks),
+                "start": start, "tracks": tracks, "removed": removed}
+
+    def values(self) -> Iterator[Tuple[str, Any]]:
+        """Every path with its current value"""
+        yield "/live/tempo", self.tempo
+        yield "/live/transport", self.is_playing
+        yield "/live/tracks", len(self.tracks)
+        for info in self.tracks:
+            prefix = f"/live/track/{info['index']}/"
+            for key, value in info.items():
+                if key != "index":
+                    yield prefix + key, value
+
+    def disconnect(self):
+        """Remove every listener added to the song and its tracks"""
+        self._unlisten(self._track_listeners)
+        self._unlisten(self._song_listeners)
+
+    _listen = staticmethod(listen)
+    _unlisten = staticmethod(unlisten)
+
+    def _notify(self, path: str, value: Any):
+        if self._on_change is not None:
+            self._on_change(path, value)
+
+    def _bump(self) -> int:
+        self.version += 1
+        return self.version
+
+    def _on_tempo(self):
+        self._bump()
+        self.tempo = self._song.tempo
+        self._notify("/live/tempo", self.tempo)
+
+    def _on_is_playing(self):
+        self._bump()
+        self.is_playing = self._song.is_playing
+        self._notify("/live/transport", self.is_playing)
+
+    def _on_scenes(self):
+        self._bump()
+        self.scene_count = len(self._song.scenes)
+
+    def _read_tracks(self, initial: bool = False):
+        """Read every track again and listen to the new track list"""
+        self._unlisten(self._track_listeners)
+        old_tracks, old_versions = self.tracks, self._track_versions
+        self.tracks = [self._add_track(index, track) for index, track in enumerate(self._song.tracks)]
+        self._tracks_json = None
+
+        # Only indices whose contents differ count as changed; the first read
+        # keeps version 0, every later one (even from no tracks) gets a new version
+        version = self.version if initial else self._bump()
+        self._track_versions = [
+            old_versions[index] if index < len(old_tracks) and old_tracks[index] == info else version
+            for index, info in enumerate(self.tracks)
+        ]
+        for index in range(len(self.tracks), len(old_tracks)):
+            self._removed[index] = version
+        for index in range(len(self.tracks)):
+            self._removed.pop(index, None)
+
+    def _rebuild_tracks(self):
+        self._read_tracks()
+        if self._on_change is not None:
+            # Indices may have shifted, so every track value may have changed
+            for path, value in self.values():
+                if path.startswith("/live/track"):
+                    self._on_change(path, value)
+
+    def _add_track(self, index: int, track) -> Dict[str, Any]:
+        mixer = getattr(track, 'mixer_device', None)
+        volume = getattr(mixer, 'volume', None)
+        fields = [
+            ("name", track, "name", lambda: str(track.name) if hasattr(track, 'name') else f"Track {index}"),
+            ("color", track, "color_index", lambda: getattr(track, 'color_index', 0)),
+            ("is_foldable", None, None, lambda: bool(getattr(track, 'is_foldable', False))),
+            ("mute", track, "mute", lambda: getattr(track, 'mute', False)),
+            ("solo", track, "solo", lambda: getattr(track, 'solo', False)),
+            ("arm", track, "arm", lambda: _read_arm(track)),
+            ("volume", volume, "value", lambda: _read_volume(volume)),
+        ]
+        info: Dict[str, Any] = {"index": index}
+        for key, subject, prop, read in fields:
+            info[key] = read()
+            if subject is not None and (key != "arm" or getattr(track, 'can_be_armed', False)):
+                self._listen(subject, prop, self._updater(info, key, read), self._track_listeners)
+        return info
+
+    def _updater(self, info: Dict[str, Any], key: str, read: Callable[[], Any]) -> Callable[[], None]:
+        path = f"/live/track/{info['index']}/{key}"
+
+        def update():
+            info[key] = read()
+            self._track_versions[info['index']] = self._bump()
+            self._tracks_json = None
+            self._notify(path, info[key])
+        return update
@@ -0,0 +1,74 @@
+"""
+Track output meter streams for ``/live/meters`` subscribers.
+
+Live only exposes the current meter levels, so OrbitRemote reads them on
+every control surface tick and each stream reduces those readings to frames
+at the rate its client asked for.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .snapshot import encode_meters
+
+DEFAULT_RATE = 10.0
+DEFAULT_HOLD = 1.5
+
+
+class MeterStream:
+    """Meter levels of some tracks (every track if ``tracks`` is ``None``),
+    reduced to at most ``rate`` frames per second.
+
+    Levels read between two frames are folded together with ``max`` so a
+    short peak is never dropped, and each record also carries the highest
+    level of the last ``hold`` seconds.
+    """
+
+    def __init__(self, tracks: Optional[List[int]] = None, rate: float = DEFAULT_RATE, hold: float = DEFAULT_HOLD):
+        if rate <= 0:
+            raise ValueError("Meter rate must be positive")
+        self.tracks = tracks
+        self.rate = rate
+        self.hold = hold
+        self.sequence = 0
+        self._due = 0.0
+        # Index -> [left, right], the loudest levels since the last frame
+        self._levels: Dict[int, List[float]] = {}
+        # Index -> (held peak, time the hold ends)
+        self._peaks: Dict[int, Tuple[float, float]] = {}
+
+    @property
+    def options(self) -> Tuple[Optional[List[int]], float, float]:
+        return self.tracks, self.rate, self.hold
+
+    def add(self, index: int, left: float, right: float):
+        """Fold one reading of a track into the next frame"""
+        levels = self._levels.get(index)
+        if levels is None:
+            self._levels[index] = [left, right]
+        else:
+            if left > levels[0]:
+                levels[0] = left
+            if right > levels[1]:
+                levels[1] = right
+
+    def frame(self, now: float) -> Optional[bytes]:
+        """The packed frame if one is due at ``now``, else ``None``"""
+        if now < self._due or not self._levels:
+            return None
+        # Keep the average rate even though ticks don't line up with it
+        self._due += 1.0 / self.rate
+        if self._due <= now:
+            self._due = now + 1.0 / self.rate
+
+        records = []
+        peaks = self._peaks
+        for index, (left, right) in sorted(self._levels.items()):
+            level = max(left, right)
+            peak, held_until = peaks.get(index, (0.0, 0.0))
+            if level >= peak or now >= held_until:
+                peak, held_until = level, now + self.hold
+                peaks[index] = (peak, held_until)
+            records.append((index, left, right, peak))
+        self._levels = {}
+        self.sequence += 1
+        return encode_meters(self.sequence, records)
@@ -0,0 +1,128 @@
+"""
+MIDI clip notes for ``/live/clip/notes`` and ``/live/clip/notes/set``.
+
+Dense clips hold thousands of notes, more than one datagram can carry, so
+notes are read in chunks of a clip's sorted note list. The list is read from
+Live once and kept until the clip's notes change; its version lets a client
+tell that the notes changed between two chunks. Writes arrive the same way
+and are applied to Live in a single call once every chunk is in.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Set, Tuple
+
+from .live_state import listen, unlisten
+from .snapshot import Note
+
+DEFAULT_CHUNK = 256
+# Largest chunk a reader may ask for, so a reply stays a reasonable size
+MAX_CHUNK = 4096
+
+# Clips whose notes are kept; the least recently read are dropped first
+MAX_CLIPS = 16
+# Writes being received at once; the oldest unfinished one is dropped first
+MAX_UPLOADS = 8
+
+# get_notes() range covering every note a clip can hold
+_FROM_TIME = -8192.0
+_TIME_SPAN = 16384.0
+
+
+def read_notes(clip) -> List[Note]:
+    """Every note of a MIDI clip, ordered by start and pitch"""
+    notes = clip.get_notes(_FROM_TIME, 0, _TIME_SPAN, 128)
+    return sorted(((int(pitch), float(start), float(duration), float(velocity), bool(mute))
+                   for pitch, start, duration, velocity, mute in notes), key=lambda note: (note[1], note[0]))
+
+
+def replace_notes(clip, notes: List[Note]):
+    """Replace every note of ``clip`` with ``notes``"""
+    clip.select_all_notes()
+    try:
+        clip.replace_selected_notes(tuple(notes))
+    finally:
+        clip.deselect_all_notes()
+
+
+class NoteCache:
+    """Sorted notes of recently read clips, keyed by e.g. ``(track, slot)``"""
+
+    def __init__(self):
+        # Key -> (clip, version, notes, listeners)
+        self._clips: "OrderedDict[Hashable, Tuple[Any, int, List[Note], list]]" = OrderedDict()
+        # Keys whose clip reported a change since it was read
+        self._stale: Set[Hashable] = set()
+        self._versions = 0
+
+    def notes(self, key: Hashable, clip) -> Tuple[int, List[Note]]:
+        """The version and notes of ``clip``, read again only if they changed"""
+        entry = self._clips.get(key)
+        if entry is not None and entry[0] == clip:
+            self._clips.move_to_end(key)
+            if key not in self._stale:
+                return entry[1], entry[2]
+            listeners = entry[3]
+        else:
+            self.forget(key)
+            listeners = []
+            listen(clip, "notes", lambda: self._stale.add(key), listeners)
+        self._stale.discard(key)
+        self._versions += 1
+        entry = (clip, self._versions, read_notes(clip), listeners)
+        self._clips[key] = entry
+        while len(self._clips) > MAX_CLIPS:
+            self.forget(next(iter(self._clips)))
+        return entry[1], entry[2]
+
+    def forget(self, key: Hashable):
+        self._stale.discard(key)
+        entry = self._clips.pop(key, None)
+        if entry is not None:
+            unlisten(entry[3])
+
+    def clear(self):
+        for key in list(self._clips):
+            self.forget(key)
+
+
+class NoteUploads:
+    """Note chunks of writes still being received, keyed by e.g. ``(sender, track, slot)``"""
+
+    def __init__(self):
+        # Key -> (notes, received count)
+        self._uploads: "OrderedDict[Hashable, Tuple[List[Optional[Note]], int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._uploads)
+
+    def add(self, key: Hashable, total: int, start: int, notes: List[Note]) -> Tuple[int, Optional[List[Note]]]:
+        """Store a chunk; returns how many notes were received so far and,
+        once every chunk is in, the complete note list.
+
+        A chunk starting at 0 begins a new write, dropping an unfinished one.
+        """
+        if start + len(notes) > total:
+            raise ValueError(f"Notes {start}-{start + len(notes)} are beyond the {total} notes of the write")
+        upload = self._uploads.get(key)
+        if start == 0 or upload is None:
+            if start != 0:
+                raise ValueError("No write in progress; the first chunk must start at note 0")
+            upload = ([None] * total, 0)
+        received, count = upload
+        if len(received) != total:
+            raise ValueError(f"Write of {len(received)} notes in progress, not {total}")
+        for offset, note in enumerate(notes):
+            if received[start + offset] is None:
+                count += 1
+            received[start + offset] = note
+        if count == total:
+            self._uploads.pop(key, None)
+            return count, received
+        self._uploads[key] = (received, count)
+        self._uploads.move_to_end(key)
+        while len(self._uploads) > MAX_UPLOADS:
+            self._uploads.popitem(last=False)
+        return count, None
+
+    def clear(self):
+        self._uploads.clear()
@@ -0,0 +1,530 @@
+"""
+Shared OSC 1.0 codec used by OrbitRemote, the Python client and the diagnostics scripts.
+
+Arguments map to type tags as follows: ``int`` ``i`` (``h`` beyond 32 bits),
+``float`` ``f``, ``str`` ``s``, bytes-like ``b``, ``True``/``False`` ``T``/``F``,
+``None`` ``N``, lists and tuples ``[...]`` arrays, and the ``Double`` and
+``Int64`` wrappers ``d`` and ``h``. Decoding returns plain Python values.
+
+This module only depends on the standard library so it can be loaded both as part of
+the OrbitRemote package inside Live and as a top-level module from the client.
+"""
+
+import itertools
+import struct
+import threading
+import time
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+INT = struct.Struct('>i')
+FLOAT = struct.Struct('>f')
+
+BUNDLE_TAG = b'#bundle\x00'
+_BUNDLE_HEADER = struct.Struct('>8sQ')
+
+# Special timetag meaning "dispatch on receipt"
+IMMEDIATELY = 1
+# Seconds between the NTP epoch (1900) used by OSC timetags and the Unix epoch
+_NTP_EPOCH_OFFSET = 2208988800
+
+
+class Double(float):
+    """A float sent with the 64-bit ``d`` tag instead of ``f``"""
+    __slots__ = ()
+
+
+class Int64(int):
+    """An int always sent with the 64-bit ``h`` tag"""
+    __slots__ = ()
+
+
+_TAG_BY_TYPE = {int: 'i', float: 'f', str: 's', bytes: 'b', bytearray: 'b', memoryview: 'b',
+                Double: 'd', Int64: 'h', type(None): 'N'}
+
+# struct codes of the tags with a fixed-size payload; T, F and N have none
+_FIXED_CODES = {'i': 'i', 'f': 'f', 'd': 'd', 'h': 'q', 'T': '', 'F': '', 'N': ''}
+_CONSTANTS = {'T': True, 'F': False, 'N': None}
+_INT32_MIN = -(1 << 31)
+_INT32_MAX = (1 << 31) - 1
+
+# Tags whose size depends on the value, so the message format is built per call
+_VARIABLE_TAGS = frozenset('sb')
+# Types whose tag depends on the value (bools) or that nest (arrays); messages
+# with them are laid out per call
+_DYNAMIC_TYPES = (bool, list, tuple)
+_MISSING = object()
+
+# Compiled layouts keyed by message signature. Numeric signatures repeat
+# constantly; string arguments add their padded length to the format, so the
+# caches are bounded and simply reset when they grow too large.
+_CACHE_LIMIT = 1024
+_struct_cache = {}
+_layout_cache = {}
+_decode_cache = {}
+
+
+class OSCDecodeError(ValueError):
+    """Raised when a packet is not a well-formed OSC message"""
+
+
+def padded_size(length: int) -> int:
+    """Size of an OSC string of ``length`` bytes including its null padding"""
+    return (length + 4) & ~3
+
+
+def _cached_struct(fmt: str) -> struct.Struct:
+    compiled = _struct_cache.get(fmt)
+    if compiled is None:
+        if len(_struct_cache) >= _CACHE_LIMIT:
+            _struct_cache.clear()
+        compiled = _struct_cache[fmt] = struct.Struct(fmt)
+    return compiled
+
+
+def _header(address: str, tags: str) -> bytes:
+    """The padded address and type tag string of a message"""
+    address_bytes = address.encode('utf-8')
+    tag_bytes = b',' + tags.encode('ascii')
+    return struct.pack(f'>{padded_size(len(address_bytes))}s{padded_size(len(tag_bytes))}s',
+                       address_bytes, tag_bytes)
+
+
+def _run_format(codes: str) -> str:
+    """Shorten runs of one struct code to a repeat count (``ffff`` -> ``4f``)"""
+    return ''.join([code if count == 1 else f'{count}{code}'
+                    for code, count in ((code, len(list(run))) for code, run in itertools.groupby(codes))])
+
+
+# How the arguments after the header are packed: ``(compiled format, count)``
+# for a run of ``count`` fixed-size numbers, ``('s', 1)`` and ``('b', 1)`` for
+# strings and blobs, and ``(None, 1)`` for T, F and N, which have no payload
+PayloadPlan = List[Tuple[Union[struct.Struct, str, None], int]]
+
+# Null padding after a string of length ``n`` is ``_STRING_PADDING[n & 3]``,
+# after a blob ``_BLOB_PADDING[n & 3]``
+_STRING_PADDING = (b'\x00\x00\x00\x00', b'\x00\x00\x00', b'\x00\x00', b'\x00')
+_BLOB_PADDING = (b'', b'\x00\x00\x00', b'\x00\x00', b'\x00')
+
+
+def _payload_plan(tags: Iterable[str]) -> PayloadPlan:
+    plan: PayloadPlan = []
+    run = ''
+    count = 0
+    for tag in tags:
+        code = _FIXED_CODES.get(tag)
+        if code:
+            run += code
+            count += 1
+            continue
+        if run:
+            plan.append((_cached_struct('>' + _run_format(run)), count))
+            run, count = '', 0
+        if tag in _VARIABLE_TAGS:
+            plan.append((tag, 1))
+        elif code is not None:
+            plan.append((None, 1))
+    if run:
+        plan.append((_cached_struct('>' + _run_format(run)), count))
+    return plan
+
+
+def _layout(key: tuple) -> Optional[Tuple[bytes, str, Optional[struct.Struct], PayloadPlan]]:
+    """Build the cached layout for a ``(address, *argument types)`` signature:
+    the padded address/type tag header, the tags, for fixed-size signatures
+    the compiled format for the whole message and otherwise the payload plan.
+    ``None`` for signatures that must be laid out per call."""
+    if any(issubclass(arg_type, _DYNAMIC_TYPES) for arg_type in key[1:]):
+        layout = None
+    else:
+        tags = ''.join([_type_tag(arg_type) for arg_type in key[1:]])
+        header = _header(key[0], tags)
+        compiled = None
+        if not _VARIABLE_TAGS.intersection(tags):
+            compiled = struct.Struct(f'>{len(header)}s' + _run_format(''.join([_FIXED_CODES[tag] for tag in tags])))
+        layout = (header, tags, compiled, _payload_plan(tags))
+    if len(_layout_cache) >= _CACHE_LIMIT:
+        _layout_cache.clear()
+    _layout_cache[key] = layout
+    return layout
+
+
+def _type_tag(arg_type: type) -> str:
+    tag = _TAG_BY_TYPE.get(arg_type)
+    if tag is not None:
+        return tag
+    # Subclasses of the supported types
+    if issubclass(arg_type, Double):
+        return 'd'
+    if issubclass(arg_type, Int64):
+        return 'h'
+    if issubclass(arg_type, int):
+        return 'i'
+    if issubclass(arg_type, float):
+        return 'f'
+    if issubclass(arg_type, str):
+        return 's'
+    if issubclass(arg_type, (bytes, bytearray)):
+        return 'b'
+    raise TypeError(f"Unsupported OSC argument type: {arg_type.__name__}")
+
+
+def _value_tag(arg: Any) -> str:
+    """Tag of one argument, looking at values where the type is not enough"""
+    if arg is True:
+        return 'T'
+    if arg is False:
+        return 'F'
+    tag = _type_tag(type(arg))
+    if tag == 'i' and not _INT32_MIN <= arg <= _INT32_MAX:
+        return 'h'
+    return tag
+
+
+# A fixed-size message as its compiled format and values, or a message with
+# strings or blobs already joined into bytes
+Prepared = Union[Tuple[struct.Struct, Sequence[Any]], bytes]
+
+
+def _prepare(address: str, args: Sequence[Any]) -> Prepared:
+    """Return the compiled format and values, or the bytes, that encode ``address``/``args``"""
+    key = (address, *map(type, args))
+    layout = _layout_cache.get(key, _MISSING)
+    if layout is _MISSING:
+        layout = _layout(key)
+    if layout is None:
+        return _prepare_dynamic(address, args)
+    header, tags, compiled, plan = layout
+    if compiled is None:
+        return _join_plan(header, plan, args)
+    if 'N' in tags:
+        # Nil has no payload
+        return compiled, (header, *[arg for arg in args if arg is not None])
+    return compiled, (header, *args)
+
+
+def _prepare_dynamic(address: str, args: Sequence[Any]) -> bytes:
+    """Lay out a message with bools, arrays or 64-bit ints from its values"""
+    tags: List[str] = []
+    flat: List[Any] = []
+    _flatten(args, tags, flat)
+    return _join_plan(_header(address, ''.join(tags)), _payload_plan(tags), flat)
+
+
+def _flatten(args: Sequence[Any], tags: List[str], flat: List[Any]):
+    """Tag every argument, opening and closing arrays around nested sequences"""
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            tags.append('[')
+            _flatten(arg, tags, flat)
+            tags.append(']')
+        else:
+            tags.append(_value_tag(arg))
+            flat.append(arg)
+
+
+def _join_plan(header: bytes, plan: PayloadPlan, args: Sequence[Any]) -> bytes:
+    """Bytes of a message whose strings or blobs set its size.
+
+    Joining the parts is cheaper than compiling (or looking up) a format for
+    each string length, which rarely repeats.
+    """
+    parts = [header]
+    position = 0
+    for part, count in plan:
+        if part == 's':
+            arg = args[position].encode('utf-8')
+            parts.append(arg)
+            parts.append(_STRING_PADDING[len(arg) & 3])
+        elif part == 'b':
+            # Blobs are length-prefixed and padded without a terminator
+            arg = bytes(args[position])
+            parts.append(INT.pack(len(arg)))
+            parts.append(arg)
+            parts.append(_BLOB_PADDING[len(arg) & 3])
+        elif part is not None:
+            parts.append(part.pack(*args[position:position + count]))
+        position += count
+    return b''.join(parts)
+
+
+class OSCEncoder:
+    """Encodes OSC messages with the shared layout caches.
+
+    Messages are packed into new ``bytes``: in CPython ``Struct.pack`` beats
+    ``pack_into`` a reusable buffer plus a view of it at every message size,
+    so there is no per-encoder buffer to keep.
+    """
+
+    def encode(self, address: str, args: Sequence[Any] = ()) -> bytes:
+        """Encode a message into a standalone ``bytes`` object"""
+        try:
+            prepared = _prepare(address, args)
+            if prepared.__class__ is bytes:
+                return prepared
+            compiled, values = prepared
+            return compiled.pack(*values)
+        except struct.error:
+            # An int beyond 32 bits in a cached signature; it is sent as int64
+            return _prepare_dynamic(address, args)
+
+    # Kept for callers that hand the result straight to a socket
+    encode_into = encode
+
+
+# A decode plan: compiled formats for runs of fixed-size numbers, and the
+# tags (s, b, T, F, N, [, ]) between them
+DecodePlan = List[Union[struct.Struct, str]]
+
+
+def _decoder(tags: bytes) -> Union[struct.Struct, DecodePlan]:
+    """Compiled format for a numeric-only type tag string, a decode plan otherwise"""
+    try:
+        return _decode_cache[tags]
+    except KeyError:
+        pass
+    plan: DecodePlan = []
+    run = ''
+    depth = 0
+    for tag in tags.decode('ascii', 'replace'):
+        code = _FIXED_CODES.get(tag)
+        if code:
+            run += code
+            continue
+        if tag not in 'sbTFN[]':
+            raise OSCDecodeError(f"Unsupported OSC type tag: {tag!r}")
+        depth += {'[': 1, ']': -1}.get(tag, 0)
+        if depth < 0:
+            raise OSCDecodeError("Unbalanced OSC array tags")
+        if run:
+            plan.append(struct.Struct('>' + _run_format(run)))
+            run = ''
+        plan.append(tag)
+    if depth:
+        raise OSCDecodeError("Unbalanced OSC array tags")
+    if run or not plan:
+        plan.append(struct.Struct('>' + _run_format(run)))
+    compiled = plan[0] if len(plan) == 1 and isinstance(plan[0], struct.Struct) else plan
+    if len(_decode_cache) >= _CACHE_LIMIT:
+        _decode_cache.clear()
+    _decode_cache[tags] = compiled
+    return compiled
+
+
+def decode_message(data, start: int = 0, end: Optional[int] = None) -> Tuple[str, List[Any]]:
+    """Decode one OSC message from ``data[start:end]``.
+
+    ``data`` may be ``bytes`` or a ``bytearray`` receive buffer. Numeric
+    arguments are unpacked in place with one compiled format per signature,
+    or per run of numbers in messages that also hold strings, blobs or arrays.
+    """
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    if end is None:
+        end = len(data)
+
+    try:
+        terminator = data.find(0, start, end)
+        if terminator < 0:
+            raise OSCDecodeError("Unterminated OSC address")
+        address = data[start:terminator].decode('utf-8')
+        # padded_size() inlined here and below; calls dominate small messages
+        offset = start + ((terminator - start + 4) & ~3)
+        if offset >= end or data[offset] != 0x2C:  # ','
+            # Messages without a type tag string carry no arguments
+            return address, []
+
+        terminator = data.find(0, offset, end)
+        if terminator < 0:
+            raise OSCDecodeError("Unterminated OSC type tag string")
+        tags = data[offset + 1:terminator]
+        if tags.__class__ is not bytes:
+            tags = bytes(tags)
+        offset += (terminator - offset + 4) & ~3
+
+        compiled = _decode_cache.get(tags) or _decoder(tags)
+        if compiled.__class__ is struct.Struct:
+            if offset + compiled.size > end:
+                raise OSCDecodeError("OSC message truncated")
+            return address, list(compiled.unpack_from(data, offset))
+
+        values: List[Any] = []
+        # Enclosing lists while inside an array
+        outer: List[List[Any]] = []
+        for step in compiled:
+            if step.__class__ is struct.Struct:
+                if offset + step.size > end:
+                    raise OSCDecodeError("OSC message truncated")
+                values.extend(step.unpack_from(data, offset))
+                offset += step.size
+            elif step == 's':
+                terminator = data.find(0, offset, end)
+                if terminator < 0:
+                    raise OSCDecodeError("Unterminated OSC string")
+                values.append(data[offset:terminator].decode('utf-8'))
+                offset += (terminator - offset + 4) & ~3
+            elif step == 'b':
+                size = INT.unpack_from(data, offset)[0]
+                offset += 4
+                if size < 0 or offset + size > end:
+                    raise OSCDecodeError("OSC blob truncated")
+                values.append(bytes(data[offset:offset + size]))
+                offset += (size + 3) & ~3
+            elif step == '[':
+                outer.append(values)
+                values = []
+            elif step == ']':
+                array = values
+                values = outer.pop()
+                values.append(array)
+            else:
+                values.append(_CONSTANTS[step])
+        if offset > end:
+            raise OSCDecodeError("OSC message truncated")
+        return address, values
+    except (struct.error, UnicodeDecodeError) as e:
+        raise OSCDecodeError(str(e)) from e
+
+
+Message = Tuple[str, List[Any]]
+
+
+def time_to_timetag(seconds: float) -> int:
+    """Convert a Unix timestamp to a 64-bit OSC (NTP) timetag"""
+    return int((seconds + _NTP_EPOCH_OFFSET) * (1 << 32))
+
+
+def timetag_to_time(timetag: int) -> Optional[float]:
+    """Convert an OSC timetag to a Unix timestamp, ``None`` for IMMEDIATELY"""
+    if timetag == IMMEDIATELY:
+        return None
+    return timetag / (1 << 32) - _NTP_EPOCH_OFFSET
+
+
+def timetag_delay(timetag: int) -> float:
+    """Seconds until ``timetag`` is due, 0 if it is immediate or in the past"""
+    due = timetag_to_time(timetag)
+    return 0.0 if due is None else max(0.0, due - time.time())
+
+
+def encode_bundles(messages: Iterable[Tuple[str, Sequence[Any]]], timetag: int = IMMEDIATELY,
+                   max_size: Optional[int] = None) -> List[bytes]:
+    """Encode messages as OSC bundles, starting a new bundle whenever adding a
+    message would exceed ``max_size`` bytes"""
+    encoder = thread_encoder()
+    header = _BUNDLE_HEADER.pack(BUNDLE_TAG, timetag)
+    bundles = []
+    parts = [header]
+    size = len(header)
+
+    for address, args in messages:
+        message = encoder.encode(address, args)
+        element_size = 4 + len(message)
+        if max_size is not None and len(parts) > 1 and size + element_size > max_size:
+            bundles.append(b''.join(parts))
+            parts = [header]
+            size = len(header)
+        parts.append(INT.pack(len(message)))
+        parts.append(message)
+        size += element_size
+
+    if len(parts) > 1:
+        bundles.append(b''.join(parts))
+    return bundles
+
+
+def encode_bundle(messages: Iterable[Tuple[str, Sequence[Any]]], timetag: int = IMMEDIATELY) -> bytes:
+    """Encode messages as a single OSC bundle"""
+    bundles = encode_bundles(messages, timetag)
+    return bundles[0] if bundles else _BUNDLE_HEADER.pack(BUNDLE_TAG, timetag)
+
+
+def is_bundle(data, start: int = 0) -> bool:
+    return data.startswith(BUNDLE_TAG, start)
+
+
+def decode_bundle(data, start: int = 0, end: Optional[int] = None) -> Tuple[int, List[Message]]:
+    """Decode a bundle into its timetag and the messages it contains.
+
+    Nested bundles are flattened in order; their elements are dispatched with
+    the outer bundle.
+    """
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    if end is None:
+        end = len(data)
+    if end - start < _BUNDLE_HEADER.size or not is_bundle(data, start):
+        raise OSCDecodeError("Not an OSC bundle")
+
+    timetag = _BUNDLE_HEADER.unpack_from(data, start)[1]
+    offset = start + _BUNDLE_HEADER.size
+    messages = []
+    while offset < end:
+        if offset + 4 > end:
+            raise OSCDecodeError("OSC bundle truncated")
+        size = INT.unpack_from(data, offset)[0]
+        offset += 4
+        element_end = offset + size
+        if size < 0 or element_end > end:
+            raise OSCDecodeError("OSC bundle element truncated")
+        if is_bundle(data, offset):
+            messages.extend(decode_bundle(data, offset, element_end)[1])
+        else:
+            messages.append(decode_message(data, offset, element_end))
+        offset = element_end
+    return timetag, messages
+
+
+def decode_packet(data, start: int = 0, end: Optional[int] = None) -> Tuple[Optional[int], List[Message]]:
+    """Decode a datagram that holds either a message or a bundle.
+
+    Returns ``(timetag, messages)``; the timetag is ``None`` for a bare message.
+    """
+    if is_bundle(data, start):
+        return decode_bundle(data, start, end)
+    return None, [decode_message(data, start, end)]
+
+
+# OSC 1.1 stream framing (RFC 1055 SLIP, double-END variant)
+SLIP_END = b'\xc0'
+_SLIP_ESC = b'\xdb'
+_SLIP_ESC_END = b'\xdb\xdc'
+_SLIP_ESC_ESC = b'\xdb\xdd'
+
+
+def slip_encode(packet) -> bytes:
+    """Frame one packet for a stream transport"""
+    return SLIP_END + bytes(packet).replace(_SLIP_ESC, _SLIP_ESC_ESC).replace(SLIP_END, _SLIP_ESC_END) + SLIP_END
+
+
+class SlipDecoder:
+    """Splits a SLIP-framed byte stream back into packets"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Add received bytes and return the packets completed by them"""
+        self._buffer += data
+        if SLIP_END not in data:
+            return []
+        *frames, rest = self._buffer.split(SLIP_END)
+        self._buffer = bytearray(rest)
+        # Every escaped ESC is followed by ESC_ESC, so ESC_END can be undone first
+        return [bytes(frame).replace(_SLIP_ESC_END, SLIP_END).replace(_SLIP_ESC_ESC, _SLIP_ESC)
+                for frame in frames if frame]
+
+
+_local = threading.local()
+
+
+def thread_encoder() -> OSCEncoder:
+    """Return the calling thread's encoder, creating it on first use"""
+    encoder = getattr(_local, 'encoder', None)
+    if encoder is None:
+        encoder = _local.encoder = OSCEncoder()
+    return encoder
+
+
+def encode_message(address: str, args: Sequence[Any] = ()) -> bytes:
+    """Encode a message using the calling thread's encoder"""
+    return thread_encoder().encode(address, args)
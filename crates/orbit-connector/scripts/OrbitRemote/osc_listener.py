@@ -0,0 +1,283 @@
+"""
+Event-driven receive loops shared by OrbitRemote and the Python client.
+"""
+
+import abc
+import selectors
+import socket
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from .osc_codec import SlipDecoder, slip_encode
+
+DEFAULT_BUFFER_SIZE = 4096
+
+DatagramHandler = Callable[[bytearray, int, Tuple[str, int]], None]
+
+
+class _SelectorLoop(abc.ABC):
+    """Runs a selector until ``stop()`` wakes it through a socket pair, so
+    shutdown does not wait for a poll interval"""
+
+    def __init__(self, on_error: Optional[Callable[[Exception], None]] = None):
+        self._on_error = on_error
+        self._running = True
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._wake_reader, selectors.EVENT_READ)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def run(self):
+        """Dispatch readiness events until ``stop()`` is called"""
+        try:
+            while self._running:
+                for key, mask in self._selector.select():
+                    if not self._running:
+                        break
+                    if key.fileobj is self._wake_reader:
+                        self._drain_wakeups()
+                        self._woken()
+                    else:
+                        self._ready(key, mask)
+        finally:
+            self._close()
+
+    @abc.abstractmethod
+    def _ready(self, key: selectors.SelectorKey, mask: int):
+        """Handle ``mask`` events on a socket the subclass registered"""
+
+    def _woken(self):
+        """Called on the loop thread after ``_wake()``"""
+
+    def _wake(self):
+        try:
+            self._wake_writer.send(b'\x00')
+        except OSError:
+            # Already full of wakeups, or closed during shutdown
+            pass
+
+    def _drain_wakeups(self):
+        try:
+            while self._wake_reader.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def _close(self):
+        self._selector.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+
+    def _report(self, error: Exception):
+        if self._on_error is not None:
+            self._on_error(error)
+
+    def stop(self):
+        """Stop the loop; returns immediately, join the thread running ``run()`` to wait"""
+        self._running = False
+        self._wake()
+
+
+class OSCListener(_SelectorLoop):
+    """Blocks until its UDP socket is readable and drains every queued
+    datagram per wakeup into one preallocated buffer.
+
+    The handler receives ``(buffer, size, addr)`` and must be done with the
+    buffer when it returns.
+    """
+
+    def __init__(self, sock: socket.socket, handler: DatagramHandler,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        super().__init__(on_error)
+        sock.setblocking(False)
+        self._sock = sock
+        self._handler = handler
+        self._buffer = bytearray(buffer_size)
+        self._selector.register(sock, selectors.EVENT_READ)
+
+    def _ready(self, key: selectors.SelectorKey, mask: int):
+        sock = self._sock
+        buffer = self._buffer
+        handler = self._handler
+        while self._running:
+            try:
+                size, addr = sock.recvfrom_into(buffer)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # e.g. a closed socket during shutdown, or an ICMP error from an earlier send
+                if self._running:
+                    self._report(e)
+                return
+            try:
+                handler(buffer, size, addr)
+            except Exception as e:
+                self._report(e)
+
+
+class StreamPeer:
+    """A client connected over TCP; packets sent to it are SLIP-framed.
+
+    ``send()`` never blocks, since it runs on Live's main thread: what the
+    socket does not take at once is queued and written by the listener
+    thread when the socket becomes writable. A peer that lets more than
+    ``max_queued`` bytes pile up is not reading and gets disconnected.
+    """
+
+    max_queued = 4 * 1024 * 1024
+
+    def __init__(self, sock: socket.socket, addr: Tuple[str, int],
+                 on_backlog: Optional[Callable[["StreamPeer"], None]] = None):
+        self.sock = sock
+        self.addr = addr
+        self.decoder = SlipDecoder()
+        self.closed = False
+        self._send_lock = threading.Lock()
+        self._outbox: deque = deque()
+        self._queued = 0
+        # Tells the listener that there is something to write or to disconnect
+        self._on_backlog = on_backlog
+
+    def send(self, packet) -> None:
+        data = memoryview(slip_encode(packet))
+        with self._send_lock:
+            if self.closed:
+                raise ConnectionError(f"{self!r} is disconnected")
+            if not self._outbox:
+                try:
+                    data = data[self.sock.send(data):]
+                except (BlockingIOError, InterruptedError):
+                    pass
+                if not data:
+                    return
+            if self._queued + len(data) > self.max_queued:
+                self.closed = True
+                self._outbox.clear()
+                self._queued = 0
+            else:
+                self._outbox.append(data)
+                self._queued += len(data)
+                if len(self._outbox) > 1:
+                    # The listener already waits for the socket to become writable
+                    return
+        if self._on_backlog is not None:
+            self._on_backlog(self)
+        if self.closed:
+            raise ConnectionError(f"{self!r} stopped reading; disconnecting")
+
+    def flush(self) -> bool:
+        """Write queued data as far as the socket takes it without blocking;
+        ``True`` once nothing is left"""
+        with self._send_lock:
+            outbox = self._outbox
+            while outbox:
+                chunk = outbox[0]
+                try:
+                    sent = self.sock.send(chunk)
+                except (BlockingIOError, InterruptedError):
+                    return False
+                self._queued -= sent
+                if sent < len(chunk):
+                    outbox[0] = chunk[sent:]
+                    return False
+                outbox.popleft()
+            return True
+
+    def __repr__(self) -> str:
+        return f"StreamPeer({self.addr[0]}:{self.addr[1]})"
+
+
+class OSCStreamListener(_SelectorLoop):
+    """Accepts TCP connections and splits their SLIP-framed streams into packets.
+
+    The handler receives ``(packet, peer)``; replies go through ``peer.send``.
+    """
+
+    def __init__(self, sock: socket.socket, handler: Callable[[bytes, StreamPeer], None],
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        super().__init__(on_error)
+        sock.setblocking(False)
+        self._sock = sock
+        self._handler = handler
+        self._buffer_size = buffer_size
+        self._peers: Dict[socket.socket, StreamPeer] = {}
+        # Peers with queued output or to disconnect, handed over from other threads
+        self._backlogged: deque = deque()
+        self._selector.register(sock, selectors.EVENT_READ)
+
+    def _ready(self, key: selectors.SelectorKey, mask: int):
+        if key.fileobj is self._sock:
+            self._accept()
+            return
+
+        peer = self._peers[key.fileobj]
+        if mask & selectors.EVENT_WRITE:
+            try:
+                if peer.flush():
+                    self._selector.modify(peer.sock, selectors.EVENT_READ)
+            except OSError as e:
+                self._report(e)
+                self._disconnect(peer)
+                return
+        if not mask & selectors.EVENT_READ:
+            return
+        try:
+            data = peer.sock.recv(self._buffer_size)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._report(e)
+            data = b''
+        if not data:
+            self._disconnect(peer)
+            return
+
+        for packet in peer.decoder.feed(data):
+            try:
+                self._handler(packet, peer)
+            except Exception as e:
+                self._report(e)
+
+    def _accept(self):
+        try:
+            conn, addr = self._sock.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        conn.setblocking(False)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._peers[conn] = StreamPeer(conn, addr, self._backlog)
+        self._selector.register(conn, selectors.EVENT_READ)
+
+    def _backlog(self, peer: StreamPeer):
+        self._backlogged.append(peer)
+        self._wake()
+
+    def _woken(self):
+        while self._backlogged:
+            peer = self._backlogged.popleft()
+            if peer.sock not in self._peers:
+                continue
+            if peer.closed:
+                self._disconnect(peer)
+            else:
+                self._selector.modify(peer.sock, selectors.EVENT_READ | selectors.EVENT_WRITE)
+
+    def _disconnect(self, peer: StreamPeer):
+        peer.closed = True
+        if self._peers.pop(peer.sock, None) is None:
+            return
+        self._selector.unregister(peer.sock)
+        peer.sock.close()
+
+    def _close(self):
+        for peer in list(self._peers.values()):
+            self._disconnect(peer)
+        super()._close()
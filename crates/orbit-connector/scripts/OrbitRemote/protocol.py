@@ -0,0 +1,105 @@
+"""
+Conventions shared by OrbitRemote and its clients on top of plain OSC.
+"""
+
+import time
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+# A request that expects a correlated reply is sent as ``/req/<id><address>``;
+# OrbitRemote answers with ``/req/<id><response address>``, or
+# ``/req/<id>/error`` when the request failed or produced no response.
+REQUEST_PREFIX = "/req/"
+ERROR_ADDRESS = "/error"
+
+# Values a client subscribed to with ``/live/subscribe [pattern, ...]`` are
+# pushed as ``/notify<path> [value]``, e.g. ``/notify/live/tempo [128.0]``;
+# all changes of one tick are sent together in a bundle.
+NOTIFY_PREFIX = "/notify"
+
+# Subscribers to this path configured with ``/live/meters`` receive one
+# ``/notify/live/meters [blob]`` of packed track meter levels per frame
+METERS_PATH = "/live/meters"
+
+# Largest datagram OrbitRemote reads by default; clients keep requests smaller
+RECEIVE_BUFFER_SIZE = 65536
+
+# A packet larger than the sender's datagram limit is split into
+# ``/chunk [transfer id, index, count, blob]`` messages; the receiver joins the
+# blobs back into the original packet once all ``count`` pieces arrived.
+CHUNK_ADDRESS = "/chunk"
+# Address, type tags and the three int arguments of a chunk message plus the blob size
+_CHUNK_OVERHEAD = 8 + 8 + 12 + 4
+
+
+def request_address(request_id: int, address: str) -> str:
+    """Address carrying ``request_id`` in front of ``address``"""
+    return f"{REQUEST_PREFIX}{request_id}{address}"
+
+
+def split_request(address: str) -> Tuple[Optional[int], str]:
+    """Split ``/req/<id><address>`` into ``(id, address)``; ``(None, address)`` otherwise"""
+    if not address.startswith(REQUEST_PREFIX):
+        return None, address
+    end = address.find('/', len(REQUEST_PREFIX))
+    if end < 0:
+        return None, address
+    try:
+        return int(address[len(REQUEST_PREFIX):end]), address[end:]
+    except ValueError:
+        return None, address
+
+
+def chunk_packet(packet: bytes, transfer_id: int, max_datagram_size: int) -> Iterator[Tuple[str, list]]:
+    """Split ``packet`` into chunk messages that each fit ``max_datagram_size``"""
+    chunk_size = (max_datagram_size - _CHUNK_OVERHEAD) & ~3
+    if chunk_size <= 0:
+        raise ValueError(f"max_datagram_size {max_datagram_size} is too small for chunking")
+    count = (len(packet) + chunk_size - 1) // chunk_size
+    for index in range(count):
+        start = index * chunk_size
+        yield CHUNK_ADDRESS, [transfer_id, index, count, packet[start:start + chunk_size]]
+
+
+class ChunkAssembler:
+    """Reassembles chunked packets, dropping transfers that stay incomplete
+    for longer than ``timeout`` seconds"""
+
+    def __init__(self, timeout: float = 2.0):
+        self.timeout = timeout
+        # (source, transfer id) -> (first arrival, count, pieces by index)
+        self._transfers: Dict[Tuple[Hashable, int], Tuple[float, int, Dict[int, bytes]]] = {}
+
+    def add(self, source: Hashable, transfer_id: int, index: int, count: int, data: bytes) -> Optional[bytes]:
+        """Store one chunk; returns the whole packet once its last chunk arrived.
+
+        Chunks that can't belong to the transfer (an index outside ``count``,
+        or a ``count`` other than its first chunk's) are dropped.
+        """
+        now = time.monotonic()
+        self._expire(now)
+        if not 0 <= index < count:
+            return None
+
+        key = (source, transfer_id)
+        transfer = self._transfers.get(key)
+        if transfer is None:
+            transfer = self._transfers[key] = (now, count, {})
+        elif transfer[1] != count:
+            return None
+        pieces = transfer[2]
+        pieces[index] = data
+        if len(pieces) < count:
+            return None
+
+        del self._transfers[key]
+        return b''.join([pieces[i] for i in range(count)])
+
+    def _expire(self, now: float):
+        expired: List[Tuple[Hashable, int]] = [
+            key for key, (started, _, _) in self._transfers.items() if now - started > self.timeout
+        ]
+        for key in expired:
+            del self._transfers[key]
+
+    def __len__(self) -> int:
+        return len(self._transfers)
@@ -0,0 +1,95 @@
+"""
+Parameter ramps interpolated by OrbitRemote on every control surface tick.
+
+A client sends one ``/live/ramp`` message instead of a stream of writes, so a
+fade follows Live's tick instead of network jitter.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Interpolation curves over t from 0.0 to 1.0
+CURVES: Dict[str, Callable[[float], float]] = {
+    "linear": lambda t: t,
+    "ease-in": lambda t: t * t,
+    "ease-out": lambda t: t * (2.0 - t),
+    "ease-in-out": lambda t: t * t * (3.0 - 2.0 * t),
+}
+
+# Difference between a written and a reported value that counts as another write
+_TOLERANCE = 1e-6
+
+
+class _Ramp:
+    __slots__ = ("setter", "start", "end", "started", "duration", "curve", "last")
+
+    def __init__(self, setter: Callable[[float], None], start: float, end: float, started: float,
+                 duration: float, curve: Callable[[float], float]):
+        self.setter = setter
+        self.start = start
+        self.end = end
+        self.started = started
+        self.duration = duration
+        self.curve = curve
+        # Value this ramp wrote last
+        self.last = start
+
+
+class RampTable:
+    """Running ramps keyed by the path of the value they move.
+
+    Starting a ramp on a path replaces the one running there, and any write
+    to a ramped value that the ramp did not make itself (another client, the
+    Live UI, automation) cancels it.
+    """
+
+    def __init__(self):
+        self._ramps: Dict[str, _Ramp] = {}
+
+    def __len__(self) -> int:
+        return len(self._ramps)
+
+    def start(self, path: str, setter: Callable[[float], None], start: float, end: float,
+              duration: float, now: float, curve: str = "linear"):
+        shape = CURVES.get(curve)
+        if shape is None:
+            raise ValueError(f"Unknown ramp curve {curve!r}; expected one of {', '.join(CURVES)}")
+        if duration < 0:
+            raise ValueError("Ramp duration must not be negative")
+        self._ramps[path] = _Ramp(setter, start, end, now, duration, shape)
+
+    def paths(self) -> List[str]:
+        return list(self._ramps)
+
+    def cancel(self, path: str) -> bool:
+        return self._ramps.pop(path, None) is not None
+
+    def written(self, path: str, value: Optional[float]):
+        """Cancel the ramp on ``path`` if ``value`` is not what it wrote"""
+        ramp = self._ramps.get(path)
+        if ramp is not None and (value is None or abs(value - ramp.last) > _TOLERANCE):
+            del self._ramps[path]
+
+    def advance(self, now: float) -> List[Tuple[str, Exception]]:
+        """Write every ramp's value for ``now`` and drop the finished ones.
+
+        Ramps whose target fails (e.g. a deleted track) are dropped too and
+        returned with their error.
+        """
+        failed = []
+        for path, ramp in list(self._ramps.items()):
+            elapsed = now - ramp.started
+            if elapsed >= ramp.duration:
+                value = ramp.end
+            else:
+                value = ramp.start + (ramp.end - ramp.start) * ramp.curve(elapsed / ramp.duration)
+            # Recorded first: the write notifies written() before it returns
+            ramp.last = value
+            try:
+                ramp.setter(value)
+            except Exception as e:
+                failed.append((path, e))
+                self._ramps.pop(path, None)
+                continue
+            if elapsed >= ramp.duration:
+                self._ramps.pop(path, None)
+        return failed
@@ -0,0 +1,113 @@
+"""
+Levelled logging for OrbitRemote.
+
+Live's ``log_message`` writes synchronously to Log.txt, which is far too slow
+for per-packet messages. ``RemoteLog`` only forwards messages at or above its
+level, keeps every event (including debug ones) in a ring buffer that is
+formatted only when dumped, and rate-limits hot-path messages per key.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+_LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+
+def level_name(level: int) -> str:
+    return _LEVEL_NAMES.get(level, str(level))
+
+
+def parse_level(value: Any) -> int:
+    """Level from a name (``"debug"``) or number (``10``)"""
+    if isinstance(value, str):
+        try:
+            return LEVELS[value.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown log level {value!r}; expected one of {', '.join(LEVELS)}")
+    return int(value)
+
+
+class RemoteLog:
+    """Log messages through ``write`` (Live's ``log_message``) by level.
+
+    Messages take ``%``-style arguments that are only formatted when a message
+    is written or dumped.
+    """
+
+    def __init__(self, write: Callable[[str], None], level: int = INFO, buffer_size: int = 512,
+                 sample_interval: float = 1.0):
+        self._write = write
+        self.level = level
+        # (timestamp, level, message, args) of recent events at any level
+        self._recent: deque = deque(maxlen=buffer_size)
+        self.sample_interval = sample_interval
+        # key -> [time last written, messages suppressed since]
+        self._samples: Dict[str, List[float]] = {}
+        self._samples_lock = threading.Lock()
+
+    def log(self, level: int, message: str, *args: Any):
+        self._recent.append((time.time(), level, message, args))
+        if level >= self.level:
+            self._emit(level, message, args)
+
+    def debug(self, message: str, *args: Any):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message: str, *args: Any):
+        self.log(INFO, message, *args)
+
+    def warning(self, message: str, *args: Any):
+        self.log(WARNING, message, *args)
+
+    def error(self, message: str, *args: Any):
+        self.log(ERROR, message, *args)
+
+    def sampled(self, key: str, level: int, message: str, *args: Any):
+        """Log at most once per ``sample_interval`` for ``key``; later messages
+        report how many were suppressed in between"""
+        self._recent.append((time.time(), level, message, args))
+        if level < self.level:
+            return
+        now = time.monotonic()
+        with self._samples_lock:
+            sample = self._samples.get(key)
+            if sample is not None and now - sample[0] < self.sample_interval:
+                sample[1] += 1
+                return
+            suppressed = int(sample[1]) if sample is not None else 0
+            self._samples[key] = [now, 0]
+        if suppressed:
+            message = f"{message} ({suppressed} similar suppressed)"
+        self._emit(level, message, args)
+
+    def recent(self, count: Optional[int] = None) -> List[str]:
+        """The last ``count`` events (all buffered ones by default), oldest first"""
+        events = list(self._recent)
+        if count is not None:
+            events = events[-count:] if count > 0 else []
+        return [self._format(timestamp, level, message, args) for timestamp, level, message, args in events]
+
+    def _emit(self, level: int, message: str, args: tuple):
+        self._write(f"{level_name(level).upper()}: {self._text(message, args)}")
+
+    @staticmethod
+    def _text(message: str, args: tuple) -> str:
+        try:
+            return message % args if args else message
+        except Exception:
+            # A broken format string must not take down the caller
+            return f"{message} {args!r}"
+
+    @classmethod
+    def _format(cls, timestamp: float, level: int, message: str, args: tuple) -> str:
+        text = cls._text(message, args)
+        clock = time.strftime("%H:%M:%S", time.localtime(timestamp))
+        return f"{clock}.{int(timestamp * 1000) % 1000:03d} {level_name(level).upper()} {text}"
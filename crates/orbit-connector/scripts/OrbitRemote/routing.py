@@ -0,0 +1,170 @@
+"""
+OSC address space for OrbitRemote.
+
+Handlers are registered against address templates. A template segment written
+as ``<name>`` is an index into a collection (tracks, scenes, ...) whose size
+is looked up when a message arrives, so ``/live/track/<track>/volume`` covers
+``/live/track/0/volume`` up to the last track. Literal addresses are served
+from a dict; everything else is matched segment by segment, including the OSC
+1.0 wildcards ``?``, ``*``, ``[...]`` and ``{a,b}``.
+
+Wildcards only reach routes registered with ``patterns=True``, so a message
+such as ``/live/*`` can't fan out to transport commands or other actions.
+"""
+
+import re
+from functools import lru_cache
+from itertools import product
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Handler = Callable[[list], Optional[Tuple[str, list]]]
+
+_PATTERN_CHARS = frozenset('?*[]{}')
+
+
+def is_pattern(address: str) -> bool:
+    """Whether ``address`` uses any OSC wildcard"""
+    return not _PATTERN_CHARS.isdisjoint(address)
+
+
+@lru_cache(maxsize=512)
+def compile_segment(segment: str):
+    """Compile one address segment of an OSC 1.0 pattern to a regex"""
+    regex = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == '?':
+            regex.append('.')
+        elif char == '*':
+            regex.append('.*')
+        elif char == '[':
+            end = segment.index(']', i)
+            body = segment[i + 1:end]
+            negate = body.startswith('!')
+            if negate:
+                body = body[1:]
+            # Only '-' keeps its meaning inside a class
+            body = ''.join(c if c == '-' else re.escape(c) for c in body)
+            regex.append('[' + ('^' if negate else '') + body + ']')
+            i = end
+        elif char == '{':
+            end = segment.index('}', i)
+            options = segment[i + 1:end].split(',')
+            regex.append('(?:' + '|'.join(re.escape(option) for option in options) + ')')
+            i = end
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return re.compile(''.join(regex) + r'\Z', re.DOTALL)
+
+
+def validate_pattern(pattern: str):
+    """Raise ``ValueError`` unless every segment of ``pattern`` compiles"""
+    if not pattern.startswith('/'):
+        raise ValueError(f"OSC pattern {pattern!r} must start with '/'")
+    for segment in pattern.split('/'):
+        try:
+            compile_segment(segment)
+        except (ValueError, re.error):
+            raise ValueError(f"Invalid OSC pattern {pattern!r}")
+
+
+def _matches(pattern: str, value: str) -> bool:
+    if _PATTERN_CHARS.isdisjoint(pattern):
+        return pattern == value
+    return compile_segment(pattern).match(value) is not None
+
+
+def matches(pattern: str, address: str) -> bool:
+    """Whether the OSC pattern ``pattern`` selects the concrete ``address``"""
+    if _PATTERN_CHARS.isdisjoint(pattern):
+        return pattern == address
+    pattern_segments = pattern.split('/')
+    segments = address.split('/')
+    return len(pattern_segments) == len(segments) and all(
+        _matches(pattern_segment, segment) for pattern_segment, segment in zip(pattern_segments, segments))
+
+
+class Route:
+    """A handler registered against an address template"""
+
+    def __init__(self, template: str, handler: Handler, patterns: bool = False):
+        self.template = template
+        self.handler = handler
+        self.patterns = patterns
+        self.segments = template.split('/')
+        self.placeholders = [
+            (position, segment[1:-1]) for position, segment in enumerate(self.segments)
+            if segment.startswith('<') and segment.endswith('>')
+        ]
+
+    def match(self, segments: Sequence[str], sizes: Dict[str, Callable[[], int]]) -> List[List[int]]:
+        """Return the index values for every concrete address ``segments`` matches"""
+        placeholder_positions = dict(self.placeholders)
+        candidates = []
+        for position, (pattern, segment) in enumerate(zip(segments, self.segments)):
+            name = placeholder_positions.get(position)
+            if name is None:
+                if not _matches(pattern, segment):
+                    return []
+                continue
+
+            count = sizes[name]()
+            if pattern.isdigit():
+                index = int(pattern)
+                values = [index] if index < count else []
+            else:
+                regex = compile_segment(pattern)
+                values = [index for index in range(count) if regex.match(str(index))]
+            if not values:
+                return []
+            candidates.append(values)
+
+        return [list(indices) for indices in product(*candidates)]
+
+
+class Router:
+    """Dispatch table mapping OSC addresses and patterns to handlers"""
+
+    def __init__(self):
+        self._literal: Dict[str, Handler] = {}
+        self._routes: Dict[int, List[Route]] = {}
+        self._sizes: Dict[str, Callable[[], int]] = {}
+
+    def collection(self, name: str, size: Callable[[], int]):
+        """Register the size lookup for a ``<name>`` template segment"""
+        self._sizes[name] = size
+
+    def add(self, template: str, handler: Handler, patterns: bool = False):
+        """Register ``handler`` for an address template.
+
+        Only routes added with ``patterns=True`` are selected by wildcard
+        addresses; the others answer concrete addresses alone.
+        """
+        route = Route(template, handler, patterns)
+        if not route.placeholders:
+            self._literal[template] = handler
+            if not patterns:
+                return
+        self._routes.setdefault(len(route.segments), []).append(route)
+
+    def resolve(self, address: str) -> List[Tuple[Handler, List[int]]]:
+        """Return ``(handler, index values)`` for every target ``address`` selects.
+
+        Index values are meant to be prepended to the message arguments, so
+        ``/live/track/3/volume 0.5`` reaches the handler as ``[3, 0.5]``.
+        """
+        handler = self._literal.get(address)
+        if handler is not None:
+            return [(handler, [])]
+
+        segments = address.split('/')
+        pattern = is_pattern(address)
+        targets = []
+        for route in self._routes.get(len(segments), ()):
+            if pattern and not route.patterns:
+                continue
+            for indices in route.match(segments, self._sizes):
+                targets.append((route.handler, indices))
+        return targets
@@ -0,0 +1,142 @@
+"""
+Clip slot matrix of the session view for ``/live/session/matrix``.
+
+Every slot's state is read once and then kept current by the slot's change
+listeners, so a snapshot of the whole tracks x scenes grid is packed from
+memory, and the packed bytes are reused until a slot changes. Like
+``LiveState`` it must be built, updated and read on Live's main thread.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .live_state import listen, unlisten
+from .snapshot import HAS_CLIP, PLAYING, RECORDING, TRIGGERED, encode_matrix
+
+# Clip slot properties whose listeners update a slot
+_SLOT_PROPERTIES = ("has_clip", "playing_status", "is_triggered")
+
+
+def _slot_flags(slot) -> int:
+    if not getattr(slot, "has_clip", False):
+        return TRIGGERED if getattr(slot, "is_triggered", False) else 0
+    flags = HAS_CLIP
+    if getattr(slot, "is_playing", False):
+        flags |= PLAYING
+    if getattr(slot, "is_triggered", False):
+        flags |= TRIGGERED
+    if getattr(slot, "is_recording", False):
+        flags |= RECORDING
+    return flags
+
+
+class SessionMatrix:
+    """Flags and clip names of every clip slot of a Live song.
+
+    Slots are stored track by track (``track * scene_count + scene``).
+    ``version`` grows with every change; adding or removing tracks or scenes
+    reads the whole grid again, once, when the matrix is next read.
+    """
+
+    def __init__(self, song):
+        self._song = song
+        self._song_listeners: List[Tuple[Any, str, Callable[[], None]]] = []
+        self._slot_listeners: List[Tuple[Any, str, Callable[[], None]]] = []
+        # Cell -> the clip in that slot and its name listener
+        self._clips: Dict[int, Tuple[Any, list]] = {}
+        self.track_count = 0
+        self.scene_count = 0
+        self.version = 0
+        self._flags = bytearray()
+        self._names: List[Optional[str]] = []
+        # Packed snapshot, without and with names, until the next change
+        self._packed: Dict[bool, bytes] = {}
+        # Set when tracks, scenes or a track's slots changed; one edit can
+        # fire many of these listeners, so the grid is read at the next access
+        self._stale = True
+
+        listen(song, "tracks", self._invalidate, self._song_listeners)
+        listen(song, "scenes", self._invalidate, self._song_listeners)
+
+    def packed(self, names: bool = False) -> bytes:
+        """The matrix as a ``snapshot.encode_matrix()`` blob"""
+        if self._stale:
+            self._read()
+        blob = self._packed.get(names)
+        if blob is None:
+            blob = encode_matrix(self.version, self.track_count, self.scene_count, self._flags,
+                                 self._names if names else None)
+            self._packed[names] = blob
+        return blob
+
+    def flags(self, track: int, scene: int) -> int:
+        if self._stale:
+            self._read()
+        return self._flags[track * self.scene_count + scene]
+
+    def disconnect(self):
+        """Remove every listener added to the song, its slots and clips"""
+        self._unlisten_slots()
+        unlisten(self._song_listeners)
+
+    def _unlisten_slots(self):
+        unlisten(self._slot_listeners)
+        for _, listeners in self._clips.values():
+            unlisten(listeners)
+        self._clips = {}
+
+    def _invalidate(self):
+        self._stale = True
+        self._packed = {}
+
+    def _read(self):
+        """Read every slot again and listen to the new grid"""
+        self._unlisten_slots()
+        self._stale = False
+        tracks = self._song.tracks
+        scene_count = len(self._song.scenes)
+        self.track_count = len(tracks)
+        self.scene_count = scene_count
+        self._flags = bytearray(len(tracks) * scene_count)
+        self._names = [None] * len(self._flags)
+        for index, track in enumerate(tracks):
+            listen(track, "clip_slots", self._invalidate, self._slot_listeners)
+            slots = track.clip_slots
+            for scene in range(min(scene_count, len(slots))):
+                cell = index * scene_count + scene
+                slot = slots[scene]
+                update = self._updater(cell, slot)
+                for prop in _SLOT_PROPERTIES:
+                    listen(slot, prop, update, self._slot_listeners)
+                self._read_slot(cell, slot, update)
+        self._changed()
+
+    def _updater(self, cell: int, slot) -> Callable[[], None]:
+        def update():
+            if self._stale:
+                # The cell may belong to another slot once the grid is read again
+                return
+            self._read_slot(cell, slot, update)
+            self._changed()
+        return update
+
+    def _read_slot(self, cell: int, slot, update: Callable[[], None]):
+        flags = _slot_flags(slot)
+        self._flags[cell] = flags
+        clip = slot.clip if flags & HAS_CLIP else None
+        self._names[cell] = None if clip is None else str(getattr(clip, "name", ""))
+
+        # Follow renames of the clip now in the slot
+        current = self._clips.get(cell)
+        if current is not None and current[0] == clip:
+            return
+        if current is not None:
+            unlisten(current[1])
+            del self._clips[cell]
+        if clip is not None:
+            listeners: list = []
+            listen(clip, "name", update, listeners)
+            self._clips[cell] = (clip, listeners)
+
+    def _changed(self):
+        self.version += 1
+        self._packed = {}
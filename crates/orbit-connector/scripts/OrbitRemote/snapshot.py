@@ -0,0 +1,347 @@
+"""
+Binary snapshots of the Live set, sent as a single OSC blob.
+
+Snapshots replace the ``str(dict)`` and JSON replies for clients that ask for
+``["format", "binary"]``: every track is a fixed-size big-endian record and
+track names are kept once each in a string table after the records, so a
+snapshot is a fraction of the JSON size and decoding is a ``struct`` call
+per row.
+
+Meter frames streamed to ``/live/meters`` subscribers use the same approach
+with one 5-byte record per track, the ``/live/session/matrix`` snapshot
+packs the state of every clip slot into four bits, and MIDI notes travel
+as 11-byte records in chunks of a clip's note list.
+"""
+
+import math
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+SET_INFO_MAGIC = b"OSI1"
+TRACKS_MAGIC = b"OTR1"
+
+# magic, tempo, is playing, track count, scene count
+_SET_INFO = struct.Struct(">4sd?HH")
+# magic, epoch, version, full, track count, record count, removed count
+_TRACKS_HEADER = struct.Struct(">4sII?HHH")
+# index, name (string table index), color index (-1 if unset), flags, volume (NaN if unset)
+TRACK_RECORD = struct.Struct(">HHhBf")
+_UINT16 = struct.Struct(">H")
+
+# Bits of a track record's flags
+IS_FOLDABLE = 0x01
+MUTE = 0x02
+SOLO = 0x04
+ARM = 0x08
+_FLAGS = (("is_foldable", IS_FOLDABLE), ("mute", MUTE), ("solo", SOLO), ("arm", ARM))
+
+
+# magic, frame sequence number, record count
+_METERS_HEADER = struct.Struct(">4sIH")
+# index, left, right, held peak, each level scaled from 0.0-1.0 to 0-255
+METER_RECORD = struct.Struct(">HBBB")
+METERS_MAGIC = b"OMT1"
+
+# magic, version, track count, scene count, has clip names
+_MATRIX_HEADER = struct.Struct(">4sIHH?")
+MATRIX_MAGIC = b"OSM1"
+
+# Bits of a clip slot's flags
+HAS_CLIP = 0x1
+PLAYING = 0x2
+TRIGGERED = 0x4
+RECORDING = 0x8
+_SLOT_FLAGS = (("has_clip", HAS_CLIP), ("playing", PLAYING), ("triggered", TRIGGERED), ("recording", RECORDING))
+
+# magic, version of the clip's notes, note count of the clip, index of the first note, record count
+_NOTES_HEADER = struct.Struct(">4sIIIH")
+# pitch, start and duration in beats, velocity, mute
+NOTE_RECORD = struct.Struct(">BffBB")
+NOTES_MAGIC = b"ONT1"
+
+# A note as Live's Clip.get_notes() returns it: pitch, start, duration, velocity, mute
+Note = Tuple[int, float, float, float, bool]
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot blob is truncated or of an unknown format"""
+
+
+def encode_set_info(info: Dict[str, Any]) -> bytes:
+    """Pack the ``/live/get`` values"""
+    return _SET_INFO.pack(SET_INFO_MAGIC, float(info["tempo"]), bool(info["is_playing"]),
+                          info["track_count"], info["scene_count"])
+
+
+def decode_set_info(data: bytes) -> Dict[str, Any]:
+    if len(data) < _SET_INFO.size or bytes(data[:4]) != SET_INFO_MAGIC:
+        raise SnapshotError("Not a set info snapshot")
+    _, tempo, is_playing, track_count, scene_count = _SET_INFO.unpack_from(data)
+    return {"tempo": tempo, "is_playing": is_playing, "track_count": track_count, "scene_count": scene_count}
+
+
+def encode_tracks(query: Dict[str, Any]) -> bytes:
+    """Pack a ``LiveState.query_tracks()`` result (with every field) into one blob"""
+    tracks = query["tracks"]
+    removed = query["removed"]
+    names: Dict[str, int] = {}
+    parts = [_TRACKS_HEADER.pack(TRACKS_MAGIC, query["epoch"], query["version"], query["full"],
+                                 query["count"], len(tracks), len(removed))]
+    for info in tracks:
+        flags = 0
+        for key, bit in _FLAGS:
+            if info[key]:
+                flags |= bit
+        color = info["color"]
+        volume = info["volume"]
+        parts.append(TRACK_RECORD.pack(
+            info["index"], names.setdefault(info["name"], len(names)),
+            -1 if color is None else color, flags, math.nan if volume is None else volume))
+    parts.extend(_UINT16.pack(index) for index in removed)
+    parts.append(_UINT16.pack(len(names)))
+    for name in names:
+        encoded = name.encode("utf-8")
+        parts.append(_UINT16.pack(len(encoded)))
+        parts.append(encoded)
+    return b"".join(parts)
+
+
+def decode_tracks(data: bytes) -> "TrackTable":
+    data = bytes(data)
+    if len(data) < _TRACKS_HEADER.size or data[:4] != TRACKS_MAGIC:
+        raise SnapshotError("Not a track snapshot")
+    _, epoch, version, full, count, record_count, removed_count = _TRACKS_HEADER.unpack_from(data)
+    records_start = _TRACKS_HEADER.size
+    offset = records_start + record_count * TRACK_RECORD.size
+    try:
+        removed = [_UINT16.unpack_from(data, offset + 2 * i)[0] for i in range(removed_count)]
+        offset += 2 * removed_count
+        (name_count,) = _UINT16.unpack_from(data, offset)
+        offset += 2
+        names = []
+        for _ in range(name_count):
+            (size,) = _UINT16.unpack_from(data, offset)
+            offset += 2
+            if offset + size > len(data):
+                raise SnapshotError("Track snapshot truncated")
+            names.append(data[offset:offset + size].decode("utf-8"))
+            offset += size
+    except struct.error:
+        raise SnapshotError("Track snapshot truncated")
+    return TrackTable(data, records_start, record_count, names, epoch, version, full, count, removed)
+
+
+def _meter_byte(level: float) -> int:
+    return max(0, min(255, int(round(level * 255))))
+
+
+def encode_meters(sequence: int, records: Sequence[Tuple[int, float, float, float]]) -> bytes:
+    """Pack ``(track index, left, right, peak)`` levels into a meter frame"""
+    parts = [_METERS_HEADER.pack(METERS_MAGIC, sequence & 0xFFFFFFFF, len(records))]
+    parts.extend(METER_RECORD.pack(index, _meter_byte(left), _meter_byte(right), _meter_byte(peak))
+                 for index, left, right, peak in records)
+    return b"".join(parts)
+
+
+def decode_meters(data: bytes) -> Tuple[int, List[Tuple[int, float, float, float]]]:
+    """The sequence number and ``(track index, left, right, peak)`` levels of a meter frame"""
+    data = bytes(data)
+    if len(data) < _METERS_HEADER.size or data[:4] != METERS_MAGIC:
+        raise SnapshotError("Not a meter frame")
+    _, sequence, count = _METERS_HEADER.unpack_from(data)
+    end = _METERS_HEADER.size + count * METER_RECORD.size
+    if len(data) < end:
+        raise SnapshotError("Meter frame truncated")
+    return sequence, [(index, left / 255, right / 255, peak / 255) for index, left, right, peak
+                      in METER_RECORD.iter_unpack(data[_METERS_HEADER.size:end])]
+
+
+def encode_matrix(version: int, track_count: int, scene_count: int, flags: Sequence[int],
+                  names: Optional[Sequence[Optional[str]]] = None) -> bytes:
+    """Pack the flags of every clip slot, track by track, two slots per byte.
+
+    With ``names`` (per slot, like ``flags``) the clip names follow as a
+    string table and one table index per slot holding a clip.
+    """
+    packed = bytearray((high << 4) | low for high, low in zip(flags[0::2], flags[1::2]))
+    if len(flags) % 2:
+        packed.append(flags[-1] << 4)
+    parts = [_MATRIX_HEADER.pack(MATRIX_MAGIC, version & 0xFFFFFFFF, track_count, scene_count, names is not None),
+             bytes(packed)]
+    if names is not None:
+        table: Dict[str, int] = {}
+        indices = [table.setdefault(names[cell] or "", len(table))
+                   for cell in range(len(flags)) if flags[cell] & HAS_CLIP]
+        parts.append(_UINT16.pack(len(table)))
+        for name in table:
+            encoded = name.encode("utf-8")
+            parts.append(_UINT16.pack(len(encoded)))
+            parts.append(encoded)
+        parts.append(struct.pack(f">{len(indices)}H", *indices))
+    return b"".join(parts)
+
+
+def decode_matrix(data: bytes) -> "ClipMatrix":
+    data = bytes(data)
+    if len(data) < _MATRIX_HEADER.size or data[:4] != MATRIX_MAGIC:
+        raise SnapshotError("Not a session matrix")
+    _, version, track_count, scene_count, has_names = _MATRIX_HEADER.unpack_from(data)
+    cells = track_count * scene_count
+    offset = _MATRIX_HEADER.size + (cells + 1) // 2
+    if len(data) < offset:
+        raise SnapshotError("Session matrix truncated")
+    packed = data[_MATRIX_HEADER.size:offset]
+    flags = bytearray(2 * len(packed))
+    flags[0::2] = bytes(byte >> 4 for byte in packed)
+    flags[1::2] = bytes(byte & 0xF for byte in packed)
+    del flags[cells:]
+    names: Optional[List[Optional[str]]] = None
+    if has_names:
+        try:
+            (name_count,) = _UINT16.unpack_from(data, offset)
+            offset += 2
+            table = []
+            for _ in range(name_count):
+                (size,) = _UINT16.unpack_from(data, offset)
+                offset += 2
+                if offset + size > len(data):
+                    raise SnapshotError("Session matrix truncated")
+                table.append(data[offset:offset + size].decode("utf-8"))
+                offset += size
+            clips = [cell for cell in range(cells) if flags[cell] & HAS_CLIP]
+            indices = struct.unpack_from(f">{len(clips)}H", data, offset)
+            names = [None] * cells
+            for cell, index in zip(clips, indices):
+                names[cell] = table[index]
+        except (struct.error, IndexError):
+            raise SnapshotError("Session matrix truncated")
+    return ClipMatrix(version, track_count, scene_count, flags, names)
+
+
+def encode_notes(version: int, total: int, start: int, notes: Sequence[Note]) -> bytes:
+    """Pack notes ``start`` to ``start + len(notes)`` of a clip holding ``total`` notes"""
+    parts = [_NOTES_HEADER.pack(NOTES_MAGIC, version & 0xFFFFFFFF, total, start, len(notes))]
+    pack = NOTE_RECORD.pack
+    parts.extend(pack(pitch, note_start, duration, max(0, min(127, int(round(velocity)))), bool(mute))
+                 for pitch, note_start, duration, velocity, mute in notes)
+    return b"".join(parts)
+
+
+def decode_notes(data: bytes) -> Tuple[int, int, int, List[Note]]:
+    """The version, total note count, first index and notes of a note chunk"""
+    data = bytes(data)
+    if len(data) < _NOTES_HEADER.size or data[:4] != NOTES_MAGIC:
+        raise SnapshotError("Not a note chunk")
+    _, version, total, start, count = _NOTES_HEADER.unpack_from(data)
+    end = _NOTES_HEADER.size + count * NOTE_RECORD.size
+    if len(data) < end:
+        raise SnapshotError("Note chunk truncated")
+    notes = [(pitch, note_start, duration, float(velocity), bool(mute)) for pitch, note_start, duration, velocity, mute
+             in NOTE_RECORD.iter_unpack(data[_NOTES_HEADER.size:end])]
+    return version, total, start, notes
+
+
+class ClipMatrix:
+    """Clip slot states of a ``/live/session/matrix`` snapshot, indexed by
+    ``(track, scene)``"""
+
+    def __init__(self, version: int, track_count: int, scene_count: int, flags: bytearray,
+                 names: Optional[List[Optional[str]]] = None):
+        self.version = version
+        self.track_count = track_count
+        self.scene_count = scene_count
+        self._flags = flags
+        self._names = names
+
+    def _cell(self, track: int, scene: int) -> int:
+        if not (0 <= track < self.track_count and 0 <= scene < self.scene_count):
+            raise IndexError("clip slot out of range")
+        return track * self.scene_count + scene
+
+    def flags(self, track: int, scene: int) -> int:
+        return self._flags[self._cell(track, scene)]
+
+    def __getitem__(self, slot: Tuple[int, int]) -> Dict[str, Any]:
+        """The slot as ``{"has_clip", "playing", "triggered", "recording"}``,
+        plus ``name`` if the snapshot has clip names"""
+        cell = self._cell(*slot)
+        flags = self._flags[cell]
+        state: Dict[str, Any] = {key: bool(flags & bit) for key, bit in _SLOT_FLAGS}
+        if self._names is not None:
+            state["name"] = self._names[cell]
+        return state
+
+    def has_clip(self, track: int, scene: int) -> bool:
+        return bool(self.flags(track, scene) & HAS_CLIP)
+
+    def name(self, track: int, scene: int) -> Optional[str]:
+        return None if self._names is None else self._names[self._cell(track, scene)]
+
+    def clips(self) -> Iterator[Tuple[int, int]]:
+        """``(track, scene)`` of every slot holding a clip"""
+        scenes = self.scene_count
+        return ((cell // scenes, cell % scenes) for cell, flags in enumerate(self._flags) if flags & HAS_CLIP)
+
+
+class TrackTable(Sequence):
+    """Tracks of a snapshot, backed by the received bytes.
+
+    Rows are unpacked only when accessed (``table[i]`` returns the same dict
+    as ``/live/tracks``); ``column()`` unpacks one field of every row.
+    """
+
+    def __init__(self, data: bytes, offset: int, length: int, names: List[str],
+                 epoch: int, version: int, full: bool, count: int, removed: List[int]):
+        self._data = data
+        self._offset = offset
+        self._length = length
+        self.names = names
+        self.epoch = epoch
+        self.version = version
+        self.full = full
+        # Number of tracks in the set, which may be more than the rows of a page
+        self.count = count
+        self.removed = removed
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._length))]
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("track table index out of range")
+        return self._row(TRACK_RECORD.unpack_from(self._data, self._offset + position * TRACK_RECORD.size))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self._row(record) for record in self._records())
+
+    def column(self, field: str) -> list:
+        """One field (as in ``/live/tracks``) of every row"""
+        if field == "name":
+            names = self.names
+            return [names[record[1]] for record in self._records()]
+        if field == "index":
+            return [record[0] for record in self._records()]
+        if field == "color":
+            return [None if record[2] < 0 else record[2] for record in self._records()]
+        if field == "volume":
+            return [None if math.isnan(record[4]) else record[4] for record in self._records()]
+        for key, bit in _FLAGS:
+            if key == field:
+                return [bool(record[3] & bit) for record in self._records()]
+        raise KeyError(field)
+
+    def _records(self) -> Iterator[Tuple[int, int, int, int, float]]:
+        end = self._offset + self._length * TRACK_RECORD.size
+        return TRACK_RECORD.iter_unpack(memoryview(self._data)[self._offset:end])
+
+    def _row(self, record: Tuple[int, int, int, int, float]) -> Dict[str, Any]:
+        index, name, color, flags, volume = record
+        row: Dict[str, Any] = {"index": index, "name": self.names[name], "color": None if color < 0 else color}
+        for key, bit in _FLAGS:
+            row[key] = bool(flags & bit)
+        row["volume"] = None if math.isnan(volume) else volume
+        return row
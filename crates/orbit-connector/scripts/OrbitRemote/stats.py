@@ -0,0 +1,126 @@
+"""
+Counters and latency histograms for ``/live/stats``.
+
+Every packet is timed through its stages (parse, queue wait, dispatch, the
+handler's Live API work, encode and send) per endpoint. Histograms use fixed
+bucket bounds, so recording is a bisect and an increment.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict
+
+# Upper bounds of the histogram buckets in microseconds; a last bucket takes the rest
+BUCKET_BOUNDS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+STAGES = ("parse", "queue", "dispatch", "live", "encode", "send")
+
+# Endpoints tracked separately; anything beyond is counted under OTHER
+MAX_ENDPOINTS = 256
+OTHER = "(other)"
+
+
+def endpoint_key(address: str) -> str:
+    """Address with its index segments replaced, so ``/live/track/3/volume``
+    and ``/live/track/4/volume`` share ``/live/track/<n>/volume``"""
+    if not any(character.isdigit() for character in address):
+        return address
+    return "/".join("<n>" if segment.isdigit() else segment for segment in address.split("/"))
+
+
+class Histogram:
+    """Count, total, maximum and bucket counts of durations"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_US) + 1)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKET_BOUNDS_US, seconds * 1e6)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "total_ms": round(self.total * 1e3, 3), "max_ms": round(self.max * 1e3, 3),
+                "buckets": list(self.buckets)}
+
+
+class ServerStats:
+    """Per-endpoint stage histograms plus server-wide counters; safe to
+    update from the socket threads and Live's main thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._since = time.monotonic()
+            self._counters: Dict[str, int] = {}
+            self._endpoints: Dict[str, Dict[str, Any]] = {}
+            self._ticks = Histogram()
+            self._max_queue = 0
+
+    def count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def record(self, address: str, stage: str, seconds: float):
+        with self._lock:
+            self._endpoint(address)[stage].record(seconds)
+
+    def call(self, address: str, failed: bool = False):
+        with self._lock:
+            endpoint = self._endpoint(address)
+            endpoint["calls"] += 1
+            if failed:
+                endpoint["errors"] += 1
+
+    def queued(self, depth: int):
+        if depth > self._max_queue:
+            with self._lock:
+                self._max_queue = max(self._max_queue, depth)
+
+    def tick(self, seconds: float, exhausted: bool):
+        with self._lock:
+            self._ticks.record(seconds)
+            if exhausted:
+                self._counters["budget_exhausted"] = self._counters.get("budget_exhausted", 0) + 1
+
+    def _endpoint(self, address: str) -> Dict[str, Any]:
+        key = endpoint_key(address)
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            if len(self._endpoints) >= MAX_ENDPOINTS:
+                key = OTHER
+                endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = {"calls": 0, "errors": 0}
+                endpoint.update((stage, Histogram()) for stage in STAGES)
+                self._endpoints[key] = endpoint
+        return endpoint
+
+    def snapshot(self, queue_depth: int = 0, scheduled: int = 0) -> Dict[str, Any]:
+        """Everything recorded since the last reset, as JSON-serializable values"""
+        with self._lock:
+            endpoints = {}
+            for key, endpoint in self._endpoints.items():
+                entry: Dict[str, Any] = {"calls": endpoint["calls"], "errors": endpoint["errors"]}
+                for stage in STAGES:
+                    if endpoint[stage].count:
+                        entry[stage] = endpoint[stage].to_dict()
+                endpoints[key] = entry
+            return {
+                "seconds": round(time.monotonic() - self._since, 3),
+                "bucket_bounds_us": list(BUCKET_BOUNDS_US),
+                "counters": dict(self._counters),
+                "queue": {"depth": queue_depth, "scheduled": scheduled, "max_depth": self._max_queue},
+                "ticks": self._ticks.to_dict(),
+                "endpoints": endpoints,
+            }
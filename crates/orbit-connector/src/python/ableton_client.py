@@ -2,194 +2,574 @@
 Python OSC client for controlling Ableton Live through the OrbitRemote script.
 """
 
+import itertools
+import os
+import random
 import socket
-import struct
-from typing import List, Union, Optional, Dict, Any
+import sys
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import List, Union, Optional, Dict, Any, AsyncIterator, Callable, Iterator, Sequence, Tuple
 import asyncio
 import threading
 import time
+import types
 import json
 
 
+def _load_orbit_remote():
+    """Make the OrbitRemote script's modules importable as ``OrbitRemote.<module>``.
+
+    The OSC codec and protocol modules ship with the OrbitRemote script, so
+    both ends of the connection share one implementation; the ones imported
+    below only use the standard library for that reason. They are found in an
+    ``OrbitRemote`` folder next to this file (the release layout) or in the
+    repository's script folder, and loaded under a package without running its
+    ``__init__``, which needs Live. Nothing is added to ``sys.path``.
+    """
+    if 'OrbitRemote' in sys.modules:
+        return
+    here = os.path.dirname(os.path.abspath(__file__))
+    for path in (os.path.join(here, "OrbitRemote"), os.path.join(here, "..", "..", "scripts", "OrbitRemote")):
+        if os.path.isfile(os.path.join(path, "osc_codec.py")):
+            package = types.ModuleType('OrbitRemote')
+            package.__path__ = [os.path.abspath(path)]
+            sys.modules['OrbitRemote'] = package
+            return
+    raise ImportError(f"OrbitRemote's OSC modules were not found next to {__file__}")
+
+
+_load_orbit_remote()
+
+from OrbitRemote.osc_codec import (IMMEDIATELY, OSCDecodeError, SlipDecoder, decode_message,  # noqa: E402
+                                   decode_packet, encode_bundles, encode_message, slip_encode, thread_encoder)
+from OrbitRemote.osc_listener import OSCListener  # noqa: E402
+from OrbitRemote.protocol import (CHUNK_ADDRESS, ERROR_ADDRESS, METERS_PATH, NOTIFY_PREFIX,  # noqa: E402
+                                  RECEIVE_BUFFER_SIZE, ChunkAssembler, request_address, split_request)
+from OrbitRemote.routing import matches  # noqa: E402
+from OrbitRemote.snapshot import (NOTE_RECORD, ClipMatrix, Note, SnapshotError, TrackTable,  # noqa: E402
+                                  decode_matrix, decode_meters, decode_notes, decode_set_info, decode_tracks,
+                                  encode_notes)
+
+
+class OSCBundle:
+    """Messages collected by ``AbletonOSCClient.bundle()`` and sent together"""
+
+    def __init__(self, timetag: int = IMMEDIATELY):
+        self.timetag = timetag
+        self.messages: List[Tuple[str, List[Union[int, float, str]]]] = []
+
+    def add(self, address: str, args: Optional[Sequence[Union[int, float, str]]] = None):
+        """Queue a message for the bundle"""
+        self.messages.append((address, list(args) if args else []))
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+
+class RttEstimator:
+    """Smoothed round-trip time of one endpoint.
+
+    The retransmission timeout is ``srtt + 4 * rttvar`` as in RFC 6298, kept
+    within ``[min_timeout, max_timeout]`` and doubled for every retry.
+    """
+
+    def __init__(self, initial_timeout: float = 0.25, min_timeout: float = 0.02, max_timeout: float = 2.0):
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+
+    def sample(self, rtt: float):
+        """Add a round-trip time measured on a request that was sent once"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    @property
+    def timeout(self) -> float:
+        if self.srtt is None:
+            return self.initial_timeout
+        return min(self.max_timeout, max(self.min_timeout, self.srtt + 4 * self.rttvar))
+
+    def backoff_timeout(self, attempt: int) -> float:
+        """Timeout for the ``attempt``-th retransmission (0 for the first send)"""
+        return min(self.max_timeout, self.timeout * (2 ** attempt))
+
+
 class AbletonOSCClient:
     """OSC client for sending commands to Ableton Live via OrbitRemote"""
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 11000, response_port: int = 11001):
+    # Largest datagram sent to OrbitRemote; bigger bundles and note writes are
+    # split. OrbitRemote reads up to RECEIVE_BUFFER_SIZE bytes, but like its
+    # own replies (max_datagram_size) requests stay at 8 KB to limit IP
+    # fragmentation off localhost.
+    max_packet_size = 8192
+    # Retransmissions of an unanswered UDP request before waiting out its timeout.
+    # OrbitRemote answers a repeated request ID from its reply cache, so
+    # retrying writes does not apply them twice.
+    max_retries = 3
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11000, response_port: int = 0,
+                 receive_buffer_size: int = 65536, chunk_timeout: float = 2.0,
+                 transport: str = "udp", tcp_port: Optional[int] = None):
         self.host = host
         self.port = port
+        # OrbitRemote replies to the address a request came from, so requests
+        # are sent from the response socket. Port 0 picks a free port, which
+        # lets any number of clients share one OrbitRemote.
         self.response_port = response_port
+        # Default transport for sends, "udp" or "tcp"; any call can override it.
+        # The TCP connection is opened on first use.
+        self.transport = transport
+        self.tcp_port = port if tcp_port is None else tcp_port
+        self.tcp_socket: Optional[socket.socket] = None
+        self._tcp_lock = threading.Lock()
+        # Must hold the largest datagram OrbitRemote sends before chunking
+        self.receive_buffer_size = receive_buffer_size
+        self._chunks = ChunkAssembler(chunk_timeout)
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('127.0.0.1' if host in ('127.0.0.1', 'localhost') else '', response_port))
+        self.response_port = self.socket.getsockname()[1]
+        self.response_socket = self.socket
 
-        # Response listener setup
-        self.response_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.response_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.response_socket.bind(('127.0.0.1', self.response_port))
-        self.response_socket.settimeout(0.1)
-
-        self.responses: Dict[str, Any] = {}
-        self.response_events: Dict[str, threading.Event] = {}
-        self.request_locks: Dict[str, threading.Lock] = {}
+        # Requests in flight keyed by correlation ID, plus the IDs waiting on each
+        # response address for replies that carry no ID
+        self._pending: Dict[int, Any] = {}
+        self._pending_by_address: Dict[str, deque] = {}
+        self._pending_lock = threading.Lock()
+        # Start at a random ID: OrbitRemote remembers replies per sender address
+        # for a while, and a new client may reuse the address of an old one
+        self._request_ids = itertools.count(random.randrange(1, 1 << 30))
+        self._rtt: Dict[str, RttEstimator] = {}
+        # (pattern, callback) for every subscription, and the timer renewing
+        # their lease with OrbitRemote
+        self._subscribers: List[Tuple[str, Callable[[str, list], None]]] = []
+        self._subscribers_lock = threading.Lock()
+        self._renewal: Optional[threading.Timer] = None
+        # /live/meters options and the subscriber decoding the frames, while streaming
+        self._meters: Optional[Tuple[list, Callable[[str, list], None]]] = None
+        # Local copy of the track list as (epoch, version, tracks), updated from deltas
+        self._tracks: Optional[Tuple[int, int, List[Dict[str, Any]]]] = None
+        self._tracks_lock = threading.Lock()
+        self._bundles = threading.local()
         self.running = True
 
-        # Start response listener thread
-        self.listener_thread = threading.Thread(target=self._response_listener)
+        self._start_listener()
+
+    def _start_listener(self):
+        """Start the listener thread receiving replies on the client socket"""
+        self._listener = OSCListener(self.socket, self._handle_datagram,
+                                     buffer_size=self.receive_buffer_size,
+                                     on_error=lambda e: print(f"OSC response listener error: {e}"))
+        self.listener_thread = threading.Thread(target=self._listener.run)
         self.listener_thread.daemon = True
         self.listener_thread.start()
 
-    def __del__(self):
+    def close(self):
+        """Stop the response listener and close the sockets"""
+        self._end_subscriptions()
         self.running = False
-        if hasattr(self, 'listener_thread'):
-            self.listener_thread.join(timeout=0.5)
-        if hasattr(self, 'socket'):
-            self.socket.close()
-        if hasattr(self, 'response_socket'):
-            self.response_socket.close()
-
-    def _response_listener(self):
-        """Listen for OSC responses from Ableton"""
-        while self.running:
+        listener = getattr(self, '_listener', None)
+        if listener is not None:
+            listener.stop()
+            self._listener = None
+        thread = getattr(self, 'listener_thread', None)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=0.5)
+        for name in ('socket', 'response_socket'):
+            sock = getattr(self, name, None)
+            if sock is not None:
+                sock.close()
+        tcp_socket = getattr(self, 'tcp_socket', None)
+        if tcp_socket is not None:
+            self.tcp_socket = None
             try:
-                data, addr = self.response_socket.recvfrom(4096)
-                address, args = self._parse_osc_message(data)
-
-                # Store response and signal any waiting threads
-                self.responses[address] = args
-                if address in self.response_events:
-                    self.response_events[address].set()
-                    print(f"DEBUG: Signaled event for {address}")
-                else:
-                    print(f"DEBUG: No event waiting for {address}")
+                # Wakes the reader thread blocked in recv
+                tcp_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            tcp_socket.close()
 
-                # Log for debugging
-                print(f"Received OSC response: {address} {args}")
+    def __del__(self):
+        self.close()
 
-            except socket.timeout:
+    def _handle_datagram(self, data: bytes, size: Optional[int], addr: Tuple[str, int]):
+        """Resolve the requests answered by one received datagram"""
+        _, messages = decode_packet(data, 0, size)
+        for address, args in messages:
+            if address == CHUNK_ADDRESS:
+                # Large responses arrive in pieces; handle the packet once complete
+                packet = self._chunks.add(addr, *args)
+                if packet is not None:
+                    self._handle_datagram(packet, None, addr)
                 continue
-            except Exception as e:
-                if self.running:
-                    print(f"OSC response listener error: {e}")
+            if address.startswith(NOTIFY_PREFIX):
+                self._notify(address[len(NOTIFY_PREFIX):], args)
+                continue
+            print(f"Received OSC response: {address} {args}")
+            self._resolve_response(address, args)
+
+    def _resolve_response(self, address: str, args: list):
+        """Complete the pending request a response belongs to"""
+        request_id, address = split_request(address)
+        with self._pending_lock:
+            if request_id is None:
+                # Reply without a correlation ID: hand it to the oldest waiter
+                waiting = self._pending_by_address.get(address)
+                while waiting and request_id not in self._pending:
+                    request_id = waiting.popleft()
+            future = self._pending.get(request_id)
+
+        if future is None:
+            print(f"DEBUG: No request waiting for {address}")
+        elif not future.done():
+            future.set_result((address, args))
+
+    def _tcp_connection(self) -> socket.socket:
+        """Return the TCP connection to OrbitRemote, connecting on first use"""
+        with self._tcp_lock:
+            if self.tcp_socket is None:
+                sock = socket.create_connection((self.host, self.tcp_port))
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.tcp_socket = sock
+                reader = threading.Thread(target=self._read_stream, args=(sock,))
+                reader.daemon = True
+                reader.start()
+            return self.tcp_socket
+
+    def _read_stream(self, sock: socket.socket):
+        """Resolve requests from the SLIP-framed packets arriving on ``sock``"""
+        decoder = SlipDecoder()
+        while True:
+            try:
+                data = sock.recv(self.receive_buffer_size)
+            except OSError:
+                data = b''
+            if not data:
+                break
+            for packet in decoder.feed(data):
+                try:
+                    self._handle_datagram(packet, None, (self.host, self.tcp_port))
+                except OSCDecodeError as e:
+                    print(f"OSC parse error: {e}")
+
+        with self._tcp_lock:
+            if self.tcp_socket is sock:
+                self.tcp_socket = None
+        sock.close()
+
+    def _send_packet(self, packet, transport: Optional[str] = None):
+        """Send one encoded packet over UDP or, SLIP-framed, over TCP"""
+        if (transport or self.transport) == "tcp":
+            sock = self._tcp_connection()
+            with self._tcp_lock:
+                sock.sendall(slip_encode(packet))
+        else:
+            self.socket.sendto(packet, (self.host, self.port))
 
     def _parse_osc_message(self, data: bytes) -> tuple:
         """Parse an OSC message from bytes"""
         try:
-            # Find the comma that separates address from type tags
-            idx = data.index(b',')
-            address = data[:idx].decode('utf-8').rstrip('\x00')
-
-            # Parse type tags
-            type_tag_start = idx
-            idx = data.index(b'\x00', type_tag_start) + 1
-            if idx % 4 != 0:
-                idx += 4 - (idx % 4)
-
-            type_tags_str = data[type_tag_start:idx].decode('utf-8').rstrip('\x00')
-
-            values = []
-            for tag in type_tags_str[1:]:  # Skip the comma
-                if tag == 'i':
-                    value = struct.unpack('>i', data[idx:idx + 4])[0]
-                    values.append(value)
-                    idx += 4
-                elif tag == 'f':
-                    value = struct.unpack('>f', data[idx:idx + 4])[0]
-                    values.append(value)
-                    idx += 4
-                elif tag == 's':
-                    end = data.index(b'\x00', idx)
-                    value = data[idx:end].decode('utf-8')
-                    values.append(value)
-                    idx = end + 1
-                    if idx % 4 != 0:
-                        idx += 4 - (idx % 4)
-
-            return address, values
-
-        except Exception as e:
+            return decode_message(data)
+        except OSCDecodeError as e:
             print(f"OSC parse error: {e}")
             return "", []
 
     def _encode_osc_message(self, address: str, args: List[Union[int, float, str]]) -> bytes:
         """Encode an OSC message into bytes"""
-        # Encode address with null padding
-        address_bytes = address.encode('utf-8') + b'\x00'
-        while len(address_bytes) % 4 != 0:
-            address_bytes += b'\x00'
-
-        # Build type tags and argument data
-        type_tags = ','
-        arg_bytes = b''
-
-        for arg in args:
-            if isinstance(arg, int):
-                type_tags += 'i'
-                arg_bytes += struct.pack('>i', arg)
-            elif isinstance(arg, float):
-                type_tags += 'f'
-                arg_bytes += struct.pack('>f', arg)
-            elif isinstance(arg, str):
-                type_tags += 's'
-                s_bytes = arg.encode('utf-8') + b'\x00'
-                while len(s_bytes) % 4 != 0:
-                    s_bytes += b'\x00'
-                arg_bytes += s_bytes
-
-        # Encode type tags with null padding
-        type_tag_bytes = type_tags.encode('utf-8') + b'\x00'
-        while len(type_tag_bytes) % 4 != 0:
-            type_tag_bytes += b'\x00'
-
-        return address_bytes + type_tag_bytes + arg_bytes
-
-    def send_message(self, address: str, args: Optional[List[Union[int, float, str]]] = None) -> bool:
-        """Send an OSC message to Ableton Live"""
+        return encode_message(address, args)
+
+    def send_message(self, address: str, args: Optional[List[Union[int, float, str]]] = None,
+                     transport: Optional[str] = None) -> bool:
+        """Send an OSC message to Ableton Live over ``transport`` (the client default if None)"""
         if args is None:
             args = []
 
+        bundle = getattr(self._bundles, 'current', None)
+        if bundle is not None:
+            bundle.add(address, args)
+            return True
+        return self._send_now(address, args, transport)
+
+    def _send_now(self, address: str, args: List[Union[int, float, str]], transport: Optional[str] = None) -> bool:
+        """Send a message right away, even inside a ``bundle()`` block"""
         try:
-            message = self._encode_osc_message(address, args)
-            self.socket.sendto(message, (self.host, self.port))
+            self._send_packet(thread_encoder().encode(address, args), transport)
             return True
         except Exception as e:
             print(f"Failed to send OSC message {address}: {e}")
             return False
 
+    def send_bundle(self, messages: Sequence[Tuple[str, Sequence[Union[int, float, str]]]],
+                    timetag: int = IMMEDIATELY, transport: Optional[str] = None) -> bool:
+        """Send messages as OSC bundles, one datagram per ``max_packet_size`` bytes.
+
+        OrbitRemote answers each bundle with a single ``/bundle/response``.
+        Over TCP all messages go out as one bundle.
+        """
+        transport = transport or self.transport
+        max_size = None if transport == "tcp" else min(self.max_packet_size, RECEIVE_BUFFER_SIZE)
+        try:
+            for packet in encode_bundles(messages, timetag, max_size):
+                self._send_packet(packet, transport)
+            return True
+        except Exception as e:
+            print(f"Failed to send OSC bundle: {e}")
+            return False
+
+    @contextmanager
+    def bundle(self, timetag: int = IMMEDIATELY) -> Iterator[OSCBundle]:
+        """Collect the messages sent from this thread and flush them as one bundle.
+
+        ::
+
+            with client.bundle():
+                for track_id in range(64):
+                    client.set_track_volume(track_id, 0.8)
+
+        Nested ``bundle()`` blocks join the outermost one. Nothing is sent if
+        the block raises. Requests that wait for a reply (queries, ``batch()``
+        and the like) are not collected; they are sent right away.
+        """
+        outer = getattr(self._bundles, 'current', None)
+        if outer is not None:
+            yield outer
+            return
+
+        bundle = OSCBundle(timetag)
+        self._bundles.current = bundle
+        try:
+            yield bundle
+        finally:
+            self._bundles.current = None
+        if bundle.messages:
+            self.send_bundle(bundle.messages, bundle.timetag)
+
+    def _register_request(self, future: Any, response_address: str) -> int:
+        """Add a pending request and return its correlation ID"""
+        request_id = next(self._request_ids)
+        with self._pending_lock:
+            self._pending[request_id] = future
+            self._pending_by_address.setdefault(response_address, deque()).append(request_id)
+        return request_id
+
+    def _release_request(self, request_id: int, response_address: str):
+        with self._pending_lock:
+            del self._pending[request_id]
+            waiting = self._pending_by_address.get(response_address)
+            if waiting is not None:
+                try:
+                    waiting.remove(request_id)
+                except ValueError:
+                    pass
+                if not waiting:
+                    del self._pending_by_address[response_address]
+
+    def round_trip(self, address: str) -> RttEstimator:
+        """Round-trip estimate for requests to ``address``"""
+        estimator = self._rtt.get(address)
+        if estimator is None:
+            estimator = self._rtt.setdefault(address, RttEstimator())
+        return estimator
+
+    def _attempt_timeouts(self, timeout: float, estimator: RttEstimator,
+                          transport: Optional[str] = None) -> Iterator[float]:
+        """How long to wait after each transmission of a request, within ``timeout`` overall"""
+        if (transport or self.transport) == "tcp":
+            # The stream delivers the request or fails; retransmitting cannot help
+            yield timeout
+            return
+        deadline = time.monotonic() + timeout
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            yield remaining if attempt == self.max_retries else min(estimator.backoff_timeout(attempt), remaining)
+
+    @staticmethod
+    def _reply_args(address: str, reply: Tuple[str, list]) -> Optional[list]:
+        """Arguments of a reply, or ``None`` if OrbitRemote reported an error"""
+        reply_address, reply_args = reply
+        if reply_address == ERROR_ADDRESS:
+            print(f"Error response to {address}: {reply_args}")
+            return None
+        return reply_args
+
     def send_and_wait_for_response(self, address: str, args: Optional[List[Union[int, float, str]]] = None,
-                                   response_address: str = None, timeout: float = 5.0) -> Optional[Any]:
-        """Send an OSC message and wait for a response"""
+                                   response_address: str = None, timeout: float = 5.0,
+                                   transport: Optional[str] = None) -> Optional[Any]:
+        """Send an OSC message and wait for a response.
+
+        Each request carries a correlation ID that OrbitRemote echoes back, so
+        any number of requests (even to the same address) can be in flight and
+        an ``/error`` reply fails the request immediately. Pass
+        ``transport="tcp"`` for bulk queries whose replies would otherwise be
+        chunked.
+
+        Over UDP an unanswered request is sent again with the same ID after a
+        timeout derived from the measured round-trip time of ``address``;
+        ``timeout`` bounds the whole exchange.
+        """
         if response_address is None:
             response_address = address + "/response"
 
-        # Get or create a lock for this address to prevent concurrent requests
-        if address not in self.request_locks:
-            self.request_locks[address] = threading.Lock()
-        request_lock = self.request_locks[address]
+        estimator = self.round_trip(address)
+        future: Future = Future()
+        request_id = self._register_request(future, response_address)
+        try:
+            for attempt, wait in enumerate(self._attempt_timeouts(timeout, estimator, transport)):
+                sent = time.monotonic()
+                # Sent outside any bundle, which would hold it until after the wait
+                if not self._send_now(request_address(request_id, address), args or [], transport):
+                    return None
+                try:
+                    reply = future.result(wait)
+                except FutureTimeoutError:
+                    continue
+                if attempt == 0:
+                    # A reply to a retransmitted request is ambiguous (Karn's algorithm)
+                    estimator.sample(time.monotonic() - sent)
+                return self._reply_args(address, reply)
 
-        with request_lock:
-            # Clear any old response
-            if response_address in self.responses:
-                del self.responses[response_address]
+            print(f"Timeout waiting for response to {address}")
+            return None
 
-            # Create event for this response
-            event = threading.Event()
-            self.response_events[response_address] = event
+        finally:
+            self._release_request(request_id, response_address)
 
-            try:
-                # Send the message
-                if not self.send_message(address, args):
-                    return None
+    # Push subscriptions
+    def subscribe(self, patterns: Union[str, Sequence[str]], callback: Callable[[str, list], None],
+                  timeout: float = 5.0) -> bool:
+        """Call ``callback(path, args)`` whenever a value matching ``patterns`` changes.
 
-                # Wait for response
-                if event.wait(timeout):
-                    response = self.responses.get(response_address)
-                    return response
-                else:
-                    print(f"Timeout waiting for response to {address}")
-                    return None
+        Patterns are OSC patterns over the paths OrbitRemote publishes, e.g.
+        ``/live/tempo``, ``/live/transport`` or ``/live/track/*/volume``. The
+        current values are delivered right after subscribing. Callbacks run
+        on the listener thread.
+        """
+        patterns = self._add_subscriber(patterns, callback)
+        response = self.send_and_wait_for_response("/live/subscribe", patterns, timeout=timeout)
+        if response is None:
+            self.unsubscribe(callback)
+            return False
+        self._schedule_renewal(float(response[1]))
+        return True
+
+    def stream_meters(self, callback: Callable[[int, List[Tuple[int, float, float, float]]], None],
+                      tracks: Optional[Sequence[int]] = None, rate: float = 10.0, hold: float = 1.5,
+                      timeout: float = 5.0) -> bool:
+        """Call ``callback(sequence, levels)`` with the output meters of ``tracks``
+        (every track by default) up to ``rate`` times per second.
+
+        ``levels`` holds ``(track index, left, right, peak)`` tuples scaled
+        0.0-1.0; left and right are the loudest levels since the previous
+        frame and peak is held for ``hold`` seconds. Calling this again
+        replaces the stream; ``stop_meters()`` ends it.
+        """
+        def deliver(path: str, args: list):
+            if args and isinstance(args[0], bytes):
+                callback(*decode_meters(args[0]))
 
-            finally:
-                # Clean up
-                if response_address in self.response_events:
-                    del self.response_events[response_address]
+        options: List[Union[int, float, str]] = ["rate", float(rate), "hold", float(hold)]
+        if tracks is not None:
+            options += ["tracks", ",".join(str(index) for index in tracks)]
+        self.stop_meters()
+        self._add_subscriber(METERS_PATH, deliver)
+        self._meters = (options, deliver)
+        response = self.send_and_wait_for_response(METERS_PATH, options, timeout=timeout)
+        if response is None:
+            self.stop_meters()
+            return False
+        self._schedule_renewal(float(response[1]))
+        return True
+
+    def stop_meters(self) -> bool:
+        """End the stream started by ``stream_meters()``"""
+        meters, self._meters = self._meters, None
+        if meters is None:
+            return True
+        return self.unsubscribe(meters[1])
+
+    def unsubscribe(self, callback: Callable[[str, list], None]) -> bool:
+        """Remove ``callback`` and cancel the patterns no other callback uses"""
+        with self._subscribers_lock:
+            dropped = {pattern for pattern, subscriber in self._subscribers if subscriber == callback}
+            self._subscribers = [entry for entry in self._subscribers if entry[1] != callback]
+            dropped -= {pattern for pattern, _ in self._subscribers}
+            if not self._subscribers and self._renewal is not None:
+                self._renewal.cancel()
+                self._renewal = None
+        if not dropped:
+            return True
+        return self.send_message("/live/unsubscribe", sorted(dropped))
+
+    def _add_subscriber(self, patterns: Union[str, Sequence[str]],
+                        callback: Callable[[str, list], None]) -> List[str]:
+        patterns = [patterns] if isinstance(patterns, str) else list(patterns)
+        with self._subscribers_lock:
+            self._subscribers.extend((pattern, callback) for pattern in patterns)
+        return patterns
+
+    def _schedule_renewal(self, lease: float):
+        """Subscribe again before OrbitRemote's lease runs out"""
+        with self._subscribers_lock:
+            if self._renewal is not None:
+                self._renewal.cancel()
+            if not self._subscribers or not self.running:
+                self._renewal = None
+                return
+            # A third of the lease leaves room for one lost renewal
+            self._renewal = threading.Timer(lease / 3, self._renew, (lease,))
+            self._renewal.daemon = True
+            self._renewal.start()
+
+    def _renew(self, lease: float):
+        # Runs on the renewal timer, so waiting for the replies blocks nobody.
+        # OrbitRemote only sends values for patterns it doesn't know yet, e.g.
+        # after a restart.
+        with self._subscribers_lock:
+            patterns = sorted({pattern for pattern, _ in self._subscribers})
+        if patterns:
+            response = self.send_and_wait_for_response("/live/subscribe", patterns, timeout=lease / 3)
+            if response is not None:
+                lease = float(response[1])
+        meters = self._meters
+        if meters is not None:
+            # Starts the stream again if OrbitRemote was restarted
+            self.send_and_wait_for_response(METERS_PATH, meters[0], timeout=lease / 3)
+        self._schedule_renewal(lease)
+
+    def _end_subscriptions(self):
+        subscribers_lock = getattr(self, '_subscribers_lock', None)
+        if subscribers_lock is None:
+            return
+        with subscribers_lock:
+            if self._renewal is not None:
+                self._renewal.cancel()
+                self._renewal = None
+            subscribed, self._subscribers = bool(self._subscribers), []
+            self._meters = None
+        if subscribed and getattr(self, 'socket', None) is not None:
+            self.send_message("/live/unsubscribe")
+
+    def _notify(self, path: str, args: list):
+        """Pass a pushed change to every callback subscribed to ``path``"""
+        with self._subscribers_lock:
+            callbacks = []
+            for pattern, callback in self._subscribers:
+                if callback not in callbacks and matches(pattern, path):
+                    callbacks.append(callback)
+        for callback in callbacks:
+            try:
+                callback(path, args)
+            except Exception as e:
+                print(f"Subscription callback for {path} failed: {e}")
 
     # Transport controls
     def play(self) -> bool:
@@ -230,12 +610,345 @@ class AbletonOSCClient:
         """Launch a scene"""
         return self.send_message("/live/scene/launch", [scene_id])
 
+    def ramp(self, target: str, value: float, duration: float, curve: str = "linear",
+             timeout: float = 5.0) -> Optional[List[str]]:
+        """Have OrbitRemote move ``target`` to ``value`` over ``duration`` seconds.
+
+        ``target`` is ``/live/tempo`` or ``/live/track/<index>/volume`` and may
+        be a pattern such as ``/live/track/*/volume``. ``curve`` is
+        ``linear``, ``ease-in``, ``ease-out`` or ``ease-in-out``. The value is
+        updated on every Live tick until done, or until something else
+        writes it. Returns the paths being ramped::
+
+            client.ramp("/live/track/2/volume", 0.0, 4.0, "ease-in")
+        """
+        response = self.send_and_wait_for_response("/live/ramp", [target, float(value), float(duration), curve],
+                                                    timeout=timeout)
+        return response[1:] if response else None
+
+    def cancel_ramps(self, target: Optional[str] = None) -> bool:
+        """Stop the ramps matching ``target``, or every running ramp without one"""
+        return self.send_message("/live/ramp/cancel", [] if target is None else [target])
+
+    def get_stats(self, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+        """Counters and per-endpoint stage latencies recorded by OrbitRemote
+        since it started or since ``reset_stats()``"""
+        response = self.send_and_wait_for_response("/live/stats", timeout=timeout)
+        if not response:
+            return None
+        try:
+            return json.loads(response[0])
+        except (TypeError, ValueError) as e:
+            print(f"Failed to parse stats: {e}")
+            return None
+
+    def reset_stats(self) -> bool:
+        """Clear OrbitRemote's statistics"""
+        return self.send_message("/live/stats/reset")
+
+    def batch(self, operations: Sequence[Sequence[Union[int, float, str, bool]]], timeout: float = 5.0,
+              transport: Optional[str] = None) -> Optional[list]:
+        """Apply several operations in one request and one Live tick.
+
+        Each operation is its name followed by its arguments: ``("volume",
+        track, value)``, ``("mute"|"solo"|"arm", track, on)``, ``("tempo",
+        bpm)`` or ``("launch", track, clip_slot)``. OrbitRemote validates all
+        of them before applying any, so either every operation is applied and
+        their resulting values are returned, or none is and ``None`` is
+        returned::
+
+            client.batch([("volume", i, 0.7) for i in range(40)])
+        """
+        args: List[Union[int, float, str]] = []
+        for operation in operations:
+            args.append(operation[0])
+            args.extend(int(value) if isinstance(value, bool) else value for value in operation[1:])
+        response = self.send_and_wait_for_response("/live/batch", args, timeout=timeout, transport=transport)
+        if not response:
+            return None
+        if response[0] != "success":
+            failures = response[2:]
+            for index, reason in zip(failures[::2], failures[1::2]):
+                print(f"Batch operation {index} {tuple(operations[index])} failed: {reason}")
+            return None
+        return response[2:]
+
     # Info retrieval
     def get_live_set_info(self) -> Optional[Dict[str, Any]]:
         """Get current Live set information"""
-        response = self.send_and_wait_for_response("/live/get")
+        return self._parse_live_set_info(self.send_and_wait_for_response("/live/get", ["format", "binary"]))
+
+    def get_track_names(self, transport: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Get list of all tracks with their names and properties.
+
+        After the first call only the tracks changed since the previous one
+        are transferred and merged into a local copy.
+        """
+        print("DEBUG: Sending /live/tracks message")
+        return self._merge_tracks(
+            self.send_and_wait_for_response("/live/tracks", self._tracks_query(), transport=transport))
+
+    def get_tracks(self, fields: Optional[Sequence[str]] = None, start: int = 0, count: Optional[int] = None,
+                   transport: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Get tracks ``start`` to ``start + count`` with only ``fields`` (``index`` is always included).
+
+        ::
+
+            names = client.get_tracks(fields=["name"])
+        """
+        return self._parse_page(self.send_and_wait_for_response(
+            "/live/tracks", self._track_page_query(fields, start, count), transport=transport), "tracks")
+
+    def get_track_table(self, start: int = 0, count: Optional[int] = None,
+                        transport: Optional[str] = None) -> Optional[TrackTable]:
+        """Get tracks ``start`` to ``start + count`` as a binary snapshot.
+
+        The snapshot is several times smaller than the JSON reply and rows
+        are only unpacked when read::
+
+            table = client.get_track_table()
+            muted = [i for i, mute in zip(table.column("index"), table.column("mute")) if mute]
+        """
+        return self._parse_track_table(self.send_and_wait_for_response(
+            "/live/tracks", self._track_table_query(start, count), transport=transport))
+
+    def get_devices(self, track_id: int, fields: Optional[Sequence[str]] = None, start: int = 0,
+                    count: Optional[int] = None, transport: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Get devices ``start`` to ``start + count`` of a track with only ``fields``
+        (``name``, ``class_name``, ``type``, ``is_active``, ``parameter_count``)"""
+        return self._parse_page(self.send_and_wait_for_response(
+            "/live/track/devices", [track_id] + self._track_page_query(fields, start, count), transport=transport),
+            "devices")
+
+    def get_parameters(self, track_id: int, device: Union[int, str], fields: Optional[Sequence[str]] = None,
+                       start: int = 0, count: Optional[int] = None,
+                       transport: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Get parameters ``start`` to ``start + count`` of a device with only ``fields``
+        (``name``, ``value``, ``min``, ``max``, ``is_quantized``, ``is_enabled``, ``value_items``).
+
+        ``device`` is the device index, or ``"mixer"`` for the track's
+        volume, panning and sends.
+        """
+        return self._parse_page(self.send_and_wait_for_response(
+            "/live/device/parameters", [track_id, device] + self._track_page_query(fields, start, count),
+            transport=transport), "parameters")
+
+    def iter_parameters(self, track_id: int, device: Union[int, str], fields: Optional[Sequence[str]] = None,
+                        page_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Iterate over every parameter of a device, fetching one page at a time.
+
+        Stops early (after logging) if a page can't be fetched::
+
+            names = {p["name"]: p["index"] for p in client.iter_parameters(0, 1, fields=["name"])}
+        """
+        start = 0
+        while True:
+            page = self.get_parameters(track_id, device, fields, start, page_size)
+            if not page:
+                return
+            yield from page
+            start += len(page)
+            if len(page) < page_size:
+                return
+
+    def set_parameters(self, track_id: int, device: Union[int, str],
+                       values: Union[Dict[Union[int, str], float], Sequence[Tuple[Union[int, str], float]]],
+                       timeout: float = 5.0, transport: Optional[str] = None) -> Optional[List[float]]:
+        """Set many parameters of a device in one message.
+
+        ``values`` maps parameter indices or names to values. OrbitRemote
+        clamps each value to its parameter's range and writes either all of
+        them or none; the resulting values are returned, or ``None``::
+
+            client.set_parameters(2, 0, {"Frequency": 0.4, "Gain": 0.6})
+        """
+        pairs = list(values.items()) if isinstance(values, dict) else list(values)
+        args: List[Union[int, float, str]] = [track_id, device]
+        for key, value in pairs:
+            args += [key, float(value)]
+        response = self.send_and_wait_for_response("/live/device/parameters/set", args, timeout=timeout,
+                                                    transport=transport)
+        if not response:
+            return None
+        if response[0] != "success":
+            failures = response[2:]
+            for index, reason in zip(failures[::2], failures[1::2]):
+                print(f"Parameter {pairs[index][0]!r} failed: {reason}")
+            return None
+        return response[2:]
+
+    def get_notes(self, track_id: int, clip_slot: int, chunk_size: int = 256,
+                  transport: Optional[str] = None) -> Optional[List[Note]]:
+        """Get every note of a MIDI clip as ``(pitch, start, duration, velocity, mute)``,
+        ordered by start and pitch.
+
+        Notes are fetched ``chunk_size`` at a time. If the clip's notes
+        change while they are read, reading starts over.
+        """
+        for _ in range(3):
+            notes: List[Note] = []
+            version = None
+            while True:
+                chunk = self._parse_note_chunk(self.send_and_wait_for_response(
+                    "/live/clip/notes", [track_id, clip_slot, "start", len(notes), "count", chunk_size],
+                    transport=transport))
+                if chunk is None:
+                    return None
+                chunk_version, total, _, chunk_notes = chunk
+                if version is not None and chunk_version != version:
+                    break
+                version = chunk_version
+                notes.extend(chunk_notes)
+                if len(notes) >= total or not chunk_notes:
+                    return notes
+        print(f"Notes of track {track_id} slot {clip_slot} kept changing while being read")
+        return None
+
+    @staticmethod
+    def _parse_note_chunk(response: Optional[list]) -> Optional[Tuple[int, int, int, List[Note]]]:
+        if not response:
+            return None
+        try:
+            return decode_notes(response[0])
+        except (SnapshotError, TypeError) as e:
+            print(f"Failed to parse note chunk: {e}")
+            return None
+
+    def set_notes(self, track_id: int, clip_slot: int, notes: Sequence[Note], chunk_size: Optional[int] = None,
+                  transport: Optional[str] = None) -> bool:
+        """Replace every note of a MIDI clip with ``notes``.
+
+        Notes are sent in chunks that fit a datagram (all at once over TCP);
+        OrbitRemote collects them and replaces the clip's notes in one step
+        once the last chunk arrived.
+        """
+        notes = list(notes)
+        if chunk_size is None:
+            if (transport or self.transport) == "tcp":
+                chunk_size = max(1, len(notes))
+            else:
+                # Room for the address, track, slot and chunk header
+                chunk_size = (min(self.max_packet_size, RECEIVE_BUFFER_SIZE) - 96) // NOTE_RECORD.size
+        start = 0
+        while True:
+            chunk = notes[start:start + chunk_size]
+            response = self.send_and_wait_for_response(
+                "/live/clip/notes/set", [track_id, clip_slot, encode_notes(0, len(notes), start, chunk)],
+                transport=transport)
+            if not response:
+                return False
+            start += len(chunk)
+            if start >= len(notes):
+                return response[0] == "success"
+
+    def get_session_matrix(self, names: bool = False,
+                           transport: Optional[str] = None) -> Optional[ClipMatrix]:
+        """Get the state of every clip slot in one reply.
+
+        The matrix answers which slots hold clips and which are playing,
+        triggered or recording, indexed by ``(track, scene)``; with ``names``
+        it also holds the clip names::
+
+            matrix = client.get_session_matrix()
+            for track, scene in matrix.clips():
+                ...
+        """
+        return self._parse_session_matrix(self.send_and_wait_for_response(
+            "/live/session/matrix", ["names", int(names)], transport=transport))
+
+    @staticmethod
+    def _parse_session_matrix(response: Optional[list]) -> Optional[ClipMatrix]:
+        if not response:
+            return None
+        try:
+            return decode_matrix(response[0])
+        except (SnapshotError, TypeError) as e:
+            print(f"Failed to parse session matrix: {e}")
+            return None
+
+    @staticmethod
+    def _track_table_query(start: int, count: Optional[int]) -> list:
+        args: List[Union[int, float, str]] = ["format", "binary", "start", start]
+        if count is not None:
+            args += ["count", count]
+        return args
+
+    @staticmethod
+    def _parse_track_table(response: Optional[list]) -> Optional[TrackTable]:
+        if not response:
+            return None
+        try:
+            return decode_tracks(response[0])
+        except (SnapshotError, TypeError) as e:
+            print(f"Failed to parse track snapshot: {e}")
+            return None
+
+    @staticmethod
+    def _track_page_query(fields: Optional[Sequence[str]], start: int, count: Optional[int]) -> list:
+        args: List[Union[int, float, str]] = ["start", start]
+        if fields is not None:
+            args += ["fields", ",".join(fields)]
+        if count is not None:
+            args += ["count", count]
+        return args
+
+    @staticmethod
+    def _parse_page(response: Optional[list], key: str) -> Optional[List[Dict[str, Any]]]:
+        if not response:
+            return None
+        try:
+            return json.loads(response[0])[key]
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Failed to parse {key} page: {e}")
+            return None
+
+    def _tracks_query(self) -> list:
+        """``/live/tracks`` arguments asking for the changes since the local copy"""
+        with self._tracks_lock:
+            if self._tracks is None:
+                return []
+            epoch, version, _ = self._tracks
+            return [version, epoch]
+
+    def _merge_tracks(self, response: Optional[list]) -> Optional[List[Dict[str, Any]]]:
+        """Apply a full or delta ``/live/tracks`` reply to the local copy and return a copy of it"""
+        if response and isinstance(response[0], str) and response[0].startswith('{'):
+            try:
+                delta = json.loads(response[0])
+            except ValueError as e:
+                print(f"Failed to parse track delta: {e}")
+                return None
+            with self._tracks_lock:
+                if delta["full"] or self._tracks is None:
+                    tracks = delta["tracks"]
+                else:
+                    # Deleted tracks are always at the end, past the new count
+                    tracks = self._tracks[2][:delta["count"]]
+                    for info in delta["tracks"]:
+                        if info["index"] < len(tracks):
+                            tracks[info["index"]] = info
+                        else:
+                            tracks.append(info)
+                self._tracks = (delta["epoch"], delta["version"], tracks)
+            return [dict(info) for info in tracks]
+
+        tracks = self._parse_track_names(response)
+        if tracks is not None and len(response) >= 3:
+            with self._tracks_lock:
+                self._tracks = (response[2], response[1], tracks)
+            return [dict(info) for info in tracks]
+        return tracks
+
+    @staticmethod
+    def _parse_live_set_info(response: Optional[list]) -> Optional[Dict[str, Any]]:
+        if response and isinstance(response[0], bytes):
+            try:
+                return decode_set_info(response[0])
+            except SnapshotError as e:
+                print(f"Failed to parse Live set info: {e}")
+                return None
         if response and len(response) > 0:
-            # Parse the response - it comes as a string representation of a dict
+            # Scripts without binary snapshots reply with a string representation of a dict
             try:
                 info_str = response[0]
                 # Use ast.literal_eval for safe parsing of the dict string
@@ -247,10 +960,8 @@ class AbletonOSCClient:
                 return None
         return None
 
-    def get_track_names(self) -> Optional[List[Dict[str, Any]]]:
-        """Get list of all tracks with their names and properties"""
-        print("DEBUG: Sending /live/tracks message")
-        response = self.send_and_wait_for_response("/live/tracks")
+    @staticmethod
+    def _parse_track_names(response: Optional[list]) -> Optional[List[Dict[str, Any]]]:
         print(f"DEBUG: Got response: {response}")
         if response and len(response) > 0:
             try:
@@ -272,13 +983,173 @@ class AbletonOSCClient:
         return None
 
 
+class _ResponseProtocol(asyncio.DatagramProtocol):
+    """Feeds datagrams received on the event loop into a client's pending requests"""
+
+    def __init__(self, client: 'AsyncAbletonOSCClient'):
+        self._client = client
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]):
+        try:
+            self._client._handle_datagram(data, None, addr)
+        except OSCDecodeError as e:
+            print(f"OSC parse error: {e}")
+
+    def error_received(self, exc: Exception):
+        print(f"OSC response listener error: {exc}")
+
+
 class AsyncAbletonOSCClient(AbletonOSCClient):
-    """Async version of the Ableton OSC client"""
+    """Async version of the Ableton OSC client.
+
+    Until ``connect()`` (awaited implicitly by the async methods) a listener
+    thread receives replies like the synchronous client's. ``connect()``
+    hands the socket to a datagram endpoint on the event loop, so
+    ``await client.query(...)`` resolves without any thread hops. The
+    synchronous API keeps working from other threads, but raises
+    ``RuntimeError`` on the loop thread, whose replies it would block.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11000, response_port: int = 0,
+                 receive_buffer_size: int = 65536, chunk_timeout: float = 2.0):
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connecting: Optional[asyncio.Future] = None
+        super().__init__(host, port, response_port, receive_buffer_size, chunk_timeout)
+
+    async def connect(self):
+        """Move receiving from the listener thread to the running event loop"""
+        if self._transport is not None:
+            return
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._attach())
+        await asyncio.shield(self._connecting)
+
+    async def _attach(self):
+        loop = asyncio.get_running_loop()
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+            # Stopping wakes the thread at once; datagrams arriving meanwhile
+            # wait in the socket for the endpoint
+            await loop.run_in_executor(None, self.listener_thread.join, 0.5)
+        transport, _ = await loop.create_datagram_endpoint(lambda: _ResponseProtocol(self), sock=self.socket)
+        self._transport = transport
+        self._loop = loop
+
+    def send_and_wait_for_response(self, *args, **kwargs) -> Optional[Any]:
+        if self._loop is not None:
+            try:
+                on_loop = asyncio.get_running_loop() is self._loop
+            except RuntimeError:
+                on_loop = False
+            if on_loop:
+                raise RuntimeError("Synchronous requests would block the event loop that receives their "
+                                   "replies; await the *_async methods or query() instead")
+        return super().send_and_wait_for_response(*args, **kwargs)
+
+    def close(self):
+        """Close the response endpoint"""
+        self._end_subscriptions()
+        transport = getattr(self, '_transport', None)
+        if transport is not None and self._loop is not None and not self._loop.is_closed():
+            self._transport = None
+            # The transport owns the socket now and closes it on the loop
+            self.socket = self.response_socket = None
+            self._loop.call_soon_threadsafe(transport.close)
+        super().close()
 
     async def send_message_async(self, address: str, args: Optional[List[Union[int, float, str]]] = None) -> bool:
         """Send an OSC message asynchronously"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.send_message, address, args)
+        await self.connect()
+        try:
+            self._transport.sendto(thread_encoder().encode(address, args or []), (self.host, self.port))
+            return True
+        except Exception as e:
+            print(f"Failed to send OSC message {address}: {e}")
+            return False
+
+    async def query(self, address: str, args: Optional[List[Union[int, float, str]]] = None,
+                    response_address: str = None, timeout: float = 5.0) -> Optional[Any]:
+        """Send an OSC message and await its response, ``None`` on timeout or error.
+
+        Retransmits like ``send_and_wait_for_response``.
+        """
+        if response_address is None:
+            response_address = address + "/response"
+
+        await self.connect()
+        estimator = self.round_trip(address)
+        future = self._loop.create_future()
+        request_id = self._register_request(future, response_address)
+        try:
+            for attempt, wait in enumerate(self._attempt_timeouts(timeout, estimator, "udp")):
+                sent = time.monotonic()
+                if not await self.send_message_async(request_address(request_id, address), args):
+                    return None
+                try:
+                    reply = await asyncio.wait_for(asyncio.shield(future), wait)
+                except asyncio.TimeoutError:
+                    continue
+                if attempt == 0:
+                    estimator.sample(time.monotonic() - sent)
+                return self._reply_args(address, reply)
+
+            print(f"Timeout waiting for response to {address}")
+            return None
+
+        finally:
+            self._release_request(request_id, response_address)
+
+    async def notifications(self, patterns: Union[str, Sequence[str]]) -> AsyncIterator[Tuple[str, list]]:
+        """Subscribe to ``patterns`` and yield ``(path, args)`` for every pushed change.
+
+        ::
+
+            async for path, args in client.notifications("/live/track/*/volume"):
+                ...
+
+        The subscription ends when the iteration stops.
+        """
+        await self.connect()
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def deliver(path: str, args: list):
+            loop.call_soon_threadsafe(queue.put_nowait, (path, args))
+
+        patterns = self._add_subscriber(patterns, deliver)
+        try:
+            response = await self.query("/live/subscribe", patterns)
+            if response is None:
+                return
+            self._schedule_renewal(float(response[1]))
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe(deliver)
+
+    async def get_live_set_info_async(self) -> Optional[Dict[str, Any]]:
+        """Get current Live set information (async)"""
+        return self._parse_live_set_info(await self.query("/live/get", ["format", "binary"]))
+
+    async def get_track_names_async(self) -> Optional[List[Dict[str, Any]]]:
+        """Get list of all tracks with their names and properties (async)"""
+        return self._merge_tracks(await self.query("/live/tracks", self._tracks_query()))
+
+    async def get_tracks_async(self, fields: Optional[Sequence[str]] = None, start: int = 0,
+                               count: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """Get a page of tracks with only ``fields`` (async)"""
+        return self._parse_page(await self.query("/live/tracks", self._track_page_query(fields, start, count)),
+                                "tracks")
+
+    async def get_track_table_async(self, start: int = 0, count: Optional[int] = None) -> Optional[TrackTable]:
+        """Get tracks as a binary snapshot (async)"""
+        return self._parse_track_table(await self.query("/live/tracks", self._track_table_query(start, count)))
+
+    async def get_session_matrix_async(self, names: bool = False) -> Optional[ClipMatrix]:
+        """Get the state of every clip slot (async)"""
+        return self._parse_session_matrix(await self.query("/live/session/matrix", ["names", int(names)]))
 
     async def play_async(self) -> bool:
         """Start playback in Ableton Live (async)"""
@@ -327,12 +1198,7 @@ def get_ableton_client() -> AbletonOSCClient:
     global _global_client
     with _client_lock:
         if _global_client is None:
-            try:
-                _global_client = AbletonOSCClient()
-            except OSError as e:
-                if "Address already in use" in str(e):
-                    # Try with a different port if 11001 is taken
-                    _global_client = AbletonOSCClient(response_port=11002)
+            _global_client = AbletonOSCClient()
         elif isinstance(_global_client, AsyncAbletonOSCClient):
             # Return the async client since it inherits from sync client
             return _global_client
@@ -340,25 +1206,17 @@ def get_ableton_client() -> AbletonOSCClient:
 
 
 def get_async_ableton_client() -> AsyncAbletonOSCClient:
-    """Get or create the global async Ableton OSC client"""
+    """Get or create the global async Ableton OSC client.
+
+    The client attaches its socket to the event loop the first time it is
+    awaited (or explicitly via ``await client.connect()``).
+    """
     global _global_client
     with _client_lock:
         if _global_client is None:
-            try:
-                _global_client = AsyncAbletonOSCClient()
-            except OSError as e:
-                if "Address already in use" in str(e):
-                    # Try with a different port if 11001 is taken
-                    _global_client = AsyncAbletonOSCClient(response_port=11002)
+            _global_client = AsyncAbletonOSCClient()
         elif not isinstance(_global_client, AsyncAbletonOSCClient):
             # Replace sync client with async client
-            old_client = _global_client
-            try:
-                _global_client = AsyncAbletonOSCClient()
-            except OSError as e:
-                if "Address already in use" in str(e):
-                    _global_client = AsyncAbletonOSCClient(response_port=11002)
-            # Clean up old client
-            if hasattr(old_client, '__del__'):
-                old_client.__del__()
+            _global_client.close()
+            _global_client = AsyncAbletonOSCClient()
         return _global_client
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 """Unit tests for the Ableton OSC client"""
 
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
 import threading
 import socket
 import time
 from unittest.mock import patch, MagicMock
-from ableton_client import AbletonOSCClient
+from ableton_client import AbletonOSCClient, AsyncAbletonOSCClient, RttEstimator
+from OrbitRemote.osc_codec import SlipDecoder, decode_message, decode_packet, encode_bundle, encode_message, slip_encode
+from OrbitRemote.protocol import chunk_packet, split_request
+from OrbitRemote.snapshot import HAS_CLIP, decode_notes, encode_matrix, encode_meters, encode_notes, encode_set_info, encode_tracks
 
 
 class TestAbletonOSCClient(unittest.TestCase):
@@ -14,18 +24,39 @@ class TestAbletonOSCClient(unittest.TestCase):
 
     def setUp(self):
         """Set up test client"""
-        self.client = AbletonOSCClient(response_port=11002)  # Use different port for testing
+        self.client = AbletonOSCClient()
 
     def tearDown(self):
         """Clean up"""
-        self.client.running = False
-        time.sleep(0.2)  # Let listener thread stop
+        self.client.close()
 
     def test_response_listener_thread_starts(self):
         """Test that the response listener thread is running"""
         self.assertTrue(self.client.listener_thread.is_alive())
         self.assertTrue(self.client.running)
 
+    def test_close_stops_listener_immediately(self):
+        """Test that shutdown wakes the listener instead of waiting for a poll tick"""
+        started = time.monotonic()
+        self.client.close()
+
+        self.assertFalse(self.client.listener_thread.is_alive())
+        self.assertLess(time.monotonic() - started, 0.05)
+
+    def test_listener_drains_queued_datagrams(self):
+        """Test that several datagrams queued before a wakeup are all handled"""
+        received = []
+        with patch.object(self.client, '_resolve_response', side_effect=lambda address, args: received.append(args)):
+            sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            for value in range(20):
+                sender.sendto(encode_message("/live/test/response", [value]), self.client.socket.getsockname())
+            sender.close()
+            deadline = time.monotonic() + 1.0
+            while len(received) < 20 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        self.assertEqual(received, [[value] for value in range(20)])
+
     def test_send_and_wait_for_response(self):
         """Test sending a message and waiting for response"""
         # Simulate sending a response to the client
@@ -34,7 +65,7 @@ class TestAbletonOSCClient(unittest.TestCase):
             # Send a fake response
             message = self.client._encode_osc_message("/live/get/response", ["{'tempo': 120}"])
             mock_sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            mock_sender.sendto(message, ('127.0.0.1', 11002))
+            mock_sender.sendto(message, self.client.socket.getsockname())
             mock_sender.close()
 
         # Start mock response in background
@@ -51,6 +82,171 @@ class TestAbletonOSCClient(unittest.TestCase):
 
         response_thread.join()
 
+    def _start_fake_server(self, expected, reply):
+        """Answer ``expected`` requests, in reverse order, with ``reply(address, args)``"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(2.0)
+        self.client.port = server.getsockname()[1]
+
+        def serve():
+            requests = [server.recvfrom(4096) for _ in range(expected)]
+            for data, sender in reversed(requests):
+                replies = reply(*decode_message(data))
+                for reply_address, reply_args in replies if isinstance(replies, list) else [replies]:
+                    server.sendto(encode_message(reply_address, reply_args), sender)
+            server.close()
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        return thread
+
+    def test_concurrent_requests_to_same_address(self):
+        """Test that replies are matched to requests by correlation ID"""
+        def echo(address, args):
+            request_id, _ = split_request(address)
+            self.assertIsNotNone(request_id)
+            return f"/req/{request_id}/live/echo/response", args
+
+        server_thread = self._start_fake_server(2, echo)
+        results = {}
+
+        def request(value):
+            results[value] = self.client.send_and_wait_for_response("/live/echo", [value], timeout=2.0)
+
+        threads = [threading.Thread(target=request, args=(value,)) for value in (1, 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server_thread.join()
+
+        self.assertEqual(results, {1: [1], 2: [2]})
+
+    def test_error_reply_fails_fast(self):
+        """Test that an /error reply ends the request without waiting for the timeout"""
+        def fail(address, args):
+            request_id, _ = split_request(address)
+            return f"/req/{request_id}/error", ["boom"]
+
+        server_thread = self._start_fake_server(1, fail)
+        started = time.monotonic()
+        response = self.client.send_and_wait_for_response("/live/tracks", timeout=5.0)
+        server_thread.join()
+
+        self.assertIsNone(response)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_chunked_response_is_reassembled(self):
+        """Test that a response split into /chunk messages resolves the request"""
+        tracks = json.dumps([{"index": i, "name": f"Track {i}"} for i in range(200)])
+
+        def chunked(address, args):
+            request_id, _ = split_request(address)
+            packet = encode_message(f"/req/{request_id}/live/tracks/response", [tracks])
+            return list(chunk_packet(packet, 1, 1024))
+
+        server_thread = self._start_fake_server(1, chunked)
+        response = self.client.send_and_wait_for_response("/live/tracks", timeout=2.0)
+        server_thread.join()
+
+        self.assertEqual(response, [tracks])
+
+    def test_track_deltas_are_merged(self):
+        """Test that repeated get_track_names calls ask for and apply deltas"""
+        tracks = [{"index": i, "name": f"Track {i}"} for i in range(3)]
+        requests = []
+
+        def full(address, args):
+            requests.append(args)
+            return address + "/response", [json.dumps(tracks), 5, 77]
+
+        def delta(address, args):
+            requests.append(args)
+            changes = {"epoch": 77, "version": 6, "full": False, "count": 2,
+                       "tracks": [{"index": 1, "name": "Bass"}], "removed": [2]}
+            return address + "/response", [json.dumps(changes)]
+
+        for reply in (full, delta):
+            server_thread = self._start_fake_server(1, reply)
+            result = self.client.get_track_names()
+            server_thread.join()
+
+        self.assertEqual(requests, [[], [5, 77]])
+        self.assertEqual(result, [{"index": 0, "name": "Track 0"}, {"index": 1, "name": "Bass"}])
+
+    def test_get_tracks_requests_fields_and_range(self):
+        """Test that get_tracks sends its projection and returns the page"""
+        requests = []
+
+        def page(address, args):
+            requests.append(args)
+            reply = {"epoch": 1, "version": 1, "full": True, "count": 10, "start": 4, "removed": [],
+                     "tracks": [{"index": 4, "name": "Drums"}]}
+            return address + "/response", [json.dumps(reply)]
+
+        server_thread = self._start_fake_server(1, page)
+        result = self.client.get_tracks(fields=["name"], start=4, count=1)
+        server_thread.join()
+
+        self.assertEqual(requests, [["start", 4, "fields", "name", "count", 1]])
+        self.assertEqual(result, [{"index": 4, "name": "Drums"}])
+
+    def test_batch_flattens_operations(self):
+        """Test that batch sends one flat request and returns the result vector or None"""
+        requests = []
+
+        def apply(address, args):
+            requests.append(args)
+            return address + "/response", ["success", 2, 0.5, 1]
+
+        def reject(address, args):
+            requests.append(args)
+            return address + "/response", ["error", 1, 0, "Track 9 out of range"]
+
+        server_thread = self._start_fake_server(1, apply)
+        applied = self.client.batch([("volume", 0, 0.5), ("mute", 3, True)])
+        server_thread.join()
+        server_thread = self._start_fake_server(1, reject)
+        failed = self.client.batch([("solo", 9, False)])
+        server_thread.join()
+
+        self.assertEqual(requests, [["volume", 0, 0.5, "mute", 3, 1], ["solo", 9, 0]])
+        self.assertEqual(applied, [0.5, 1])
+        self.assertIsNone(failed)
+
+    def test_tcp_transport_sends_slip_frames(self):
+        """Test a per-call TCP request: SLIP-framed both ways and never chunked"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+        server.settimeout(2.0)
+        self.client.tcp_port = server.getsockname()[1]
+        tracks = [{"name": f"Track {i}"} for i in range(500)]
+
+        def serve():
+            conn, _ = server.accept()
+            decoder = SlipDecoder()
+            packets = []
+            while not packets:
+                packets = decoder.feed(conn.recv(4096))
+            address, _ = decode_message(packets[0])
+            request_id, _ = split_request(address)
+            reply = encode_message(f"/req/{request_id}/live/tracks/response", [json.dumps(tracks)])
+            # Deliver the frame in pieces to exercise reassembly
+            framed = slip_encode(reply)
+            for start in range(0, len(framed), 1000):
+                conn.sendall(framed[start:start + 1000])
+            conn.close()
+            server.close()
+
+        server_thread = threading.Thread(target=serve)
+        server_thread.start()
+        result = self.client.get_track_names(transport="tcp")
+        server_thread.join()
+
+        self.assertEqual(result, tracks)
+
     def test_get_live_set_info_parses_response(self):
         """Test that get_live_set_info properly parses the response"""
         # Mock the send_and_wait_for_response to return a test response
@@ -65,6 +261,128 @@ class TestAbletonOSCClient(unittest.TestCase):
             self.assertEqual(info['track_count'], 8)
             self.assertEqual(info['scene_count'], 10)
 
+    def test_ramp_returns_ramped_paths(self):
+        """Test that ramp sends one request and returns the paths OrbitRemote ramps"""
+        requests = []
+
+        def ramp(address, args):
+            requests.append(args)
+            return address + "/response", ["success", "/live/track/0/volume", "/live/track/1/volume"]
+
+        server_thread = self._start_fake_server(1, ramp)
+        paths = self.client.ramp("/live/track/*/volume", 0.0, 4.0, "ease-in")
+        server_thread.join()
+
+        self.assertEqual(requests, [["/live/track/*/volume", 0.0, 4.0, "ease-in"]])
+        self.assertEqual(paths, ["/live/track/0/volume", "/live/track/1/volume"])
+
+    def test_set_parameters_sends_pairs(self):
+        """Test that set_parameters sends one message and returns the written values or None"""
+        requests = []
+
+        def apply(address, args):
+            requests.append(args)
+            return address + "/response", ["success", 2, 0.25, 1.0]
+
+        def reject(address, args):
+            requests.append(args)
+            return address + "/response", ["error", 1, 0, "No parameter named 'Drive'"]
+
+        server_thread = self._start_fake_server(1, apply)
+        written = self.client.set_parameters(1, 0, {3: 0.25, "Mode": 1})
+        server_thread.join()
+        server_thread = self._start_fake_server(1, reject)
+        failed = self.client.set_parameters(1, "mixer", [("Drive", 0.5)])
+        server_thread.join()
+
+        self.assertEqual(requests, [[1, 0, 3, 0.25, "Mode", 1.0], [1, "mixer", "Drive", 0.5]])
+        self.assertEqual(written, [0.25, 1.0])
+        self.assertIsNone(failed)
+
+    def test_iter_parameters_fetches_pages(self):
+        """Test that iter_parameters requests pages until a short one"""
+        parameters = [{"index": i} for i in range(5)]
+        with patch.object(self.client, "get_parameters",
+                          side_effect=lambda track, device, fields, start, count: parameters[start:start + count]) \
+                as get_parameters:
+            self.assertEqual(list(self.client.iter_parameters(0, 1, page_size=2)), parameters)
+
+        self.assertEqual([call.args[3] for call in get_parameters.call_args_list], [0, 2, 4])
+
+    def test_notes_are_read_and_written_in_chunks(self):
+        """Test that get_notes joins chunks, restarting on a new version, and set_notes splits them"""
+        notes = [(36 + i % 4, i * 0.25, 0.25, 100.0, False) for i in range(10)]
+        versions = iter([1, 2, 2, 2, 2])
+        uploads = []
+
+        def respond(address, args, transport=None):
+            if address == "/live/clip/notes":
+                start, count = args[3], args[5]
+                return [encode_notes(next(versions), len(notes), start, notes[start:start + count])]
+            _, total, start, chunk = decode_notes(args[2])
+            uploads.append((start, len(chunk)))
+            return ["success", total] if start + len(chunk) == total else ["pending", start + len(chunk), total]
+
+        with patch.object(self.client, "send_and_wait_for_response", side_effect=respond):
+            self.assertEqual(self.client.get_notes(0, 1, chunk_size=4), notes)
+            self.assertTrue(self.client.set_notes(0, 1, notes, chunk_size=4))
+
+        self.assertEqual(uploads, [(0, 4), (4, 4), (8, 2)])
+
+    def test_get_session_matrix(self):
+        """Test that the session matrix is requested with names and decoded"""
+        requests = []
+
+        def matrix(address, args):
+            requests.append(args)
+            return address + "/response", [encode_matrix(3, 2, 2, [HAS_CLIP, 0, 0, HAS_CLIP], ["A", None, None, "B"])]
+
+        server_thread = self._start_fake_server(1, matrix)
+        result = self.client.get_session_matrix(names=True)
+        server_thread.join()
+
+        self.assertEqual(requests, [["names", 1]])
+        self.assertEqual(list(result.clips()), [(0, 0), (1, 1)])
+        self.assertEqual(result.name(1, 1), "B")
+
+    def test_get_stats_decodes_json(self):
+        """Test that get_stats returns OrbitRemote's statistics as a dict"""
+        def stats(address, args):
+            return address + "/response", ['{"counters":{"packets":3},"endpoints":{}}']
+
+        server_thread = self._start_fake_server(1, stats)
+        result = self.client.get_stats()
+        server_thread.join()
+
+        self.assertEqual(result, {"counters": {"packets": 3}, "endpoints": {}})
+
+    def test_binary_snapshots_are_requested_and_decoded(self):
+        """Test that set info and track tables are fetched as snapshot blobs"""
+        requests = []
+        track = {"index": 3, "name": "Keys", "color": 5, "is_foldable": False, "mute": True, "solo": False,
+                 "arm": False, "volume": 0.5}
+
+        def snapshot(address, args):
+            requests.append(args)
+            if address.endswith("/live/get"):
+                blob = encode_set_info({"tempo": 90.0, "is_playing": False, "track_count": 4, "scene_count": 2})
+            else:
+                blob = encode_tracks({"epoch": 1, "version": 9, "full": True, "count": 4, "start": 3,
+                                      "tracks": [track], "removed": []})
+            return address + "/response", [blob]
+
+        server_thread = self._start_fake_server(1, snapshot)
+        info = self.client.get_live_set_info()
+        server_thread.join()
+        server_thread = self._start_fake_server(1, snapshot)
+        table = self.client.get_track_table(start=3, count=1)
+        server_thread.join()
+
+        self.assertEqual(requests, [["format", "binary"], ["format", "binary", "start", 3, "count", 1]])
+        self.assertEqual(info, {"tempo": 90.0, "is_playing": False, "track_count": 4, "scene_count": 2})
+        self.assertEqual(list(table), [track])
+        self.assertEqual(table.count, 4)
+
     def test_timeout_returns_none(self):
         """Test that timeout properly returns None"""
         with patch.object(self.client, 'send_message', return_value=True):
@@ -72,6 +390,150 @@ class TestAbletonOSCClient(unittest.TestCase):
             response = self.client.send_and_wait_for_response("/live/test", timeout=0.1)
             self.assertIsNone(response)
 
+    def test_lost_request_is_retransmitted(self):
+        """Test that a dropped request is sent again with the same ID well before the timeout"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(2.0)
+        self.client.port = server.getsockname()[1]
+        received = []
+
+        def serve():
+            # Drop the first transmission, answer the retry
+            received.append(decode_message(server.recvfrom(4096)[0])[0])
+            data, sender = server.recvfrom(4096)
+            address, _ = decode_message(data)
+            received.append(address)
+            server.sendto(encode_message(address + "/response", ["ok"]), sender)
+            server.close()
+
+        server_thread = threading.Thread(target=serve)
+        server_thread.start()
+        started = time.monotonic()
+        response = self.client.send_and_wait_for_response("/live/get", timeout=5.0)
+        server_thread.join()
+
+        self.assertEqual(response, ["ok"])
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(received[0], received[1])
+        # Only unambiguous round trips are measured
+        self.assertIsNone(self.client.round_trip("/live/get").srtt)
+
+    def test_round_trip_estimate(self):
+        """Test that timeouts follow the measured round-trip time"""
+        estimator = RttEstimator(initial_timeout=0.25, min_timeout=0.02, max_timeout=2.0)
+        self.assertEqual(estimator.timeout, 0.25)
+
+        for _ in range(20):
+            estimator.sample(0.001)
+        self.assertEqual(estimator.timeout, 0.02)
+
+        for _ in range(20):
+            estimator.sample(0.1)
+        self.assertGreater(estimator.timeout, 0.1)
+        self.assertEqual(estimator.backoff_timeout(1), min(2.0, estimator.timeout * 2))
+        self.assertEqual(estimator.backoff_timeout(10), 2.0)
+
+    def test_subscription_delivers_pushed_changes(self):
+        """Test that pushed /notify messages reach the matching callback only"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(2.0)
+        self.client.port = server.getsockname()[1]
+        requests = []
+
+        def serve():
+            data, sender = server.recvfrom(4096)
+            address, args = decode_message(data)
+            requests.append((split_request(address)[1], args))
+            server.sendto(encode_message(address + "/response", ["success", 60.0] + args), sender)
+            server.sendto(encode_bundle([("/notify/live/track/1/volume", [0.5]),
+                                         ("/notify/live/track/1/mute", [1])]), sender)
+            requests.append(decode_message(server.recvfrom(4096)[0]))
+            server.close()
+
+        server_thread = threading.Thread(target=serve)
+        server_thread.start()
+        received = []
+        done = threading.Event()
+
+        def on_change(path, args):
+            received.append((path, args))
+            done.set()
+
+        self.assertTrue(self.client.subscribe("/live/track/*/volume", on_change))
+        self.assertTrue(done.wait(2.0))
+        self.client.unsubscribe(on_change)
+        server_thread.join()
+
+        self.assertEqual(received, [("/live/track/1/volume", [0.5])])
+        self.assertEqual(requests, [("/live/subscribe", ["/live/track/*/volume"]),
+                                    ("/live/unsubscribe", ["/live/track/*/volume"])])
+        self.assertIsNone(self.client._renewal)
+
+    def test_renewal_waits_for_its_reply(self):
+        """Test that a lease renewal is a correlated request and adopts the new lease"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(2.0)
+        self.client.port = server.getsockname()[1]
+        requests = []
+
+        def serve():
+            data, sender = server.recvfrom(4096)
+            address, args = decode_message(data)
+            requests.append((address, args))
+            server.sendto(encode_message(address + "/response", ["success", 30.0] + args), sender)
+            server.close()
+
+        server_thread = threading.Thread(target=serve)
+        server_thread.start()
+        self.client._add_subscriber("/live/tempo", lambda path, args: None)
+        with patch.object(self.client, '_schedule_renewal') as schedule:
+            self.client._renew(60.0)
+        server_thread.join()
+
+        self.assertEqual([(split_request(address)[1], args) for address, args in requests],
+                         [("/live/subscribe", ["/live/tempo"])])
+        self.assertIsNotNone(split_request(requests[0][0])[0])
+        schedule.assert_called_once_with(30.0)
+
+    def test_meter_stream_decodes_frames(self):
+        """Test that stream_meters configures the stream and decodes pushed frames"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(2.0)
+        self.client.port = server.getsockname()[1]
+        requests = []
+
+        def serve():
+            data, sender = server.recvfrom(4096)
+            address, args = decode_message(data)
+            requests.append((split_request(address)[1], args))
+            server.sendto(encode_message(address + "/response", ["success", 60.0, 20.0]), sender)
+            server.sendto(encode_bundle([("/notify/live/meters", [encode_meters(7, [(1, 0.2, 0.4, 0.4)])])]),
+                          sender)
+            requests.append(decode_message(server.recvfrom(4096)[0]))
+            server.close()
+
+        server_thread = threading.Thread(target=serve)
+        server_thread.start()
+        frames = []
+        done = threading.Event()
+
+        def on_frame(sequence, levels):
+            frames.append((sequence, levels))
+            done.set()
+
+        self.assertTrue(self.client.stream_meters(on_frame, tracks=[1, 4], rate=20))
+        self.assertTrue(done.wait(2.0))
+        self.client.stop_meters()
+        server_thread.join()
+
+        self.assertEqual(frames, [(7, [(1, 0.2, 0.4, 0.4)])])
+        self.assertEqual(requests, [("/live/meters", ["rate", 20.0, "hold", 1.5, "tracks", "1,4"]),
+                                    ("/live/unsubscribe", ["/live/meters"])])
+
     def test_parse_osc_message(self):
         """Test OSC message parsing"""
         # Create a test OSC message
@@ -85,17 +547,202 @@ class TestAbletonOSCClient(unittest.TestCase):
         self.assertAlmostEqual(values[1], 3.14, places=5)
         self.assertEqual(values[2], "hello")
 
+    def test_bundle_collects_messages_into_one_datagram(self):
+        """Test that messages sent inside bundle() are flushed as one bundle"""
+        with patch.object(self.client, 'socket') as sock:
+            sendto = sock.sendto
+            with self.client.bundle() as bundle:
+                for track_id in range(8):
+                    self.client.set_track_volume(track_id, 0.5)
+                self.client.mute_track(3)
+                self.assertEqual(len(bundle), 9)
+                sendto.assert_not_called()
+
+        self.assertEqual(sendto.call_count, 1)
+        timetag, messages = decode_packet(sendto.call_args[0][0])
+        self.assertEqual(len(messages), 9)
+        self.assertEqual(messages[0], ("/live/track/volume", [0, 0.5]))
+        self.assertEqual(messages[-1], ("/live/track/mute", [3, 1]))
+
+    def test_requests_inside_a_bundle_are_sent_right_away(self):
+        """Test that a request waiting for its reply is not held back by bundle()"""
+        def reply(packet, addr):
+            address, args = decode_message(packet)
+            self.client._resolve_response(address + "/response", [120.0])
+
+        with patch.object(self.client, 'socket') as sock:
+            sock.sendto.side_effect = reply
+            with self.client.bundle() as bundle:
+                self.client.mute_track(3)
+                self.assertEqual(self.client.send_and_wait_for_response("/live/tempo", timeout=0.5), [120.0])
+                self.assertEqual(len(bundle), 1)
+
+        self.assertEqual(sock.sendto.call_count, 2)
+
+    def test_bundle_splits_at_max_packet_size(self):
+        """Test that large bundles are split into datagrams the server can read"""
+        self.client.max_packet_size = 256
+        with patch.object(self.client, 'socket') as sock:
+            sendto = sock.sendto
+            with self.client.bundle():
+                for track_id in range(64):
+                    self.client.set_track_volume(track_id, 0.5)
+
+        self.assertGreater(sendto.call_count, 1)
+        sent = [decode_packet(call[0][0])[1] for call in sendto.call_args_list]
+        self.assertTrue(all(len(call[0][0]) <= 256 for call in sendto.call_args_list))
+        self.assertEqual(sum(len(messages) for messages in sent), 64)
+
+    def test_request_ids_start_at_random(self):
+        """Test that a new client does not reuse the IDs an earlier client started with"""
+        other = AbletonOSCClient()
+        self.addCleanup(other.close)
+        self.assertNotEqual(next(self.client._request_ids), next(other._request_ids))
+
     def test_response_socket_binding(self):
-        """Test that response socket is properly bound"""
-        # Socket should be bound to response_port
-        self.assertEqual(self.client.response_port, 11002)
+        """Test that each client binds its own ephemeral port and sends from it"""
+        self.assertNotEqual(self.client.response_port, 0)
+        self.assertEqual(self.client.socket.getsockname()[1], self.client.response_port)
+
+        other = AbletonOSCClient()
+        self.addCleanup(other.close)
+        self.assertNotEqual(other.response_port, self.client.response_port)
 
         # Test we can't bind another socket to same port (proves it's bound)
         test_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         with self.assertRaises(OSError):
-            test_socket.bind(('127.0.0.1', 11002))
+            test_socket.bind(('127.0.0.1', self.client.response_port))
         test_socket.close()
 
 
+class TestReleaseLayout(unittest.TestCase):
+    """Test loading the client from the layout the app ships"""
+
+    def test_client_loads_the_modules_next_to_it(self):
+        here = os.path.dirname(os.path.abspath(__file__))
+        scripts = os.path.join(here, "..", "..", "scripts", "OrbitRemote")
+        with tempfile.TemporaryDirectory() as release:
+            os.mkdir(os.path.join(release, "OrbitRemote"))
+            shutil.copy(os.path.join(here, "ableton_client.py"), release)
+            for name in ("osc_codec", "osc_listener", "protocol", "routing", "snapshot"):
+                shutil.copy(os.path.join(scripts, f"{name}.py"), os.path.join(release, "OrbitRemote"))
+
+            result = subprocess.run(
+                [sys.executable, "-c", "import sys, ableton_client; "
+                 "print(sys.modules['OrbitRemote'].__path__[0]); print('protocol' in sys.modules)"],
+                cwd=release, capture_output=True, text=True, timeout=30)
+
+            self.assertEqual(result.returncode, 0, result.stderr)
+            package_path, shadowed = result.stdout.split()
+            self.assertEqual(os.path.realpath(package_path), os.path.realpath(os.path.join(release, "OrbitRemote")))
+            self.assertEqual(shadowed, "False")
+
+
+class TestAsyncClientBeforeConnect(unittest.TestCase):
+    """Test the async client's synchronous API before it joins an event loop"""
+
+    def test_sync_request_is_answered(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(2.0)
+        self.addCleanup(server.close)
+        client = AsyncAbletonOSCClient(port=server.getsockname()[1])
+        self.addCleanup(client.close)
+
+        def serve():
+            data, sender = server.recvfrom(4096)
+            address, _ = decode_message(data)
+            server.sendto(encode_message(address + "/response", [120.0]), sender)
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        response = client.send_and_wait_for_response("/live/tempo", timeout=2.0)
+        thread.join()
+
+        self.assertEqual(response, [120.0])
+
+
+class TestAsyncAbletonOSCClient(unittest.IsolatedAsyncioTestCase):
+    """Test the asyncio datagram transport"""
+
+    async def asyncSetUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.settimeout(2.0)
+        self.client = AsyncAbletonOSCClient(port=self.server.getsockname()[1])
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def _answer_one(self, reply_args):
+        """Reply to the next request on the fake server with ``reply_args``"""
+        def serve():
+            data, sender = self.server.recvfrom(4096)
+            address, _ = decode_message(data)
+            request_id, request = split_request(address)
+            response = encode_message(f"/req/{request_id}{request}/response", reply_args)
+            self.server.sendto(response, sender)
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        return thread
+
+    async def test_connect_stops_the_listener_thread(self):
+        """Test that responses are received on the event loop once connected"""
+        self.assertIsNone(self.client._listener)
+        self.assertFalse(self.client.listener_thread.is_alive())
+
+    async def test_sync_request_on_the_loop_thread_raises(self):
+        """Test that a synchronous request fails instead of blocking the loop"""
+        with self.assertRaises(RuntimeError):
+            self.client.get_live_set_info()
+
+    async def test_query_resolves_on_reply(self):
+        """Test that query() awaits the correlated reply"""
+        thread = self._answer_one(["[]"])
+        response = await self.client.query("/live/tracks", timeout=2.0)
+        thread.join()
+
+        self.assertEqual(response, ["[]"])
+
+    async def test_sync_request_from_worker_thread(self):
+        """Test that the synchronous API is served by the loop's endpoint"""
+        thread = self._answer_one(["{'tempo': 120.0}"])
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(None, self.client.get_live_set_info)
+        thread.join()
+
+        self.assertEqual(info, {'tempo': 120.0})
+
+    async def test_query_timeout_returns_none(self):
+        """Test that an unanswered query returns None"""
+        self.assertIsNone(await self.client.query("/live/test", timeout=0.1))
+
+    async def test_notifications_iterator(self):
+        """Test consuming pushed changes with async for"""
+        def serve():
+            data, sender = self.server.recvfrom(4096)
+            address, args = decode_message(data)
+            self.server.sendto(encode_message(address + "/response", ["success", 60.0] + args), sender)
+            for tempo in (120.0, 121.0):
+                self.server.sendto(encode_message("/notify/live/tempo", [tempo]), sender)
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        received = []
+        notifications = self.client.notifications("/live/tempo")
+        async for path, args in notifications:
+            received.append((path, args))
+            if len(received) == 2:
+                break
+        await notifications.aclose()
+        thread.join()
+
+        self.assertEqual(received, [("/live/tempo", [120.0]), ("/live/tempo", [121.0])])
+        self.assertEqual(self.client._subscribers, [])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
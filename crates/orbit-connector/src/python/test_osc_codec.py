@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Unit tests for the shared OSC codec"""
+
+import json
+import random
+import struct
+import time
+import unittest
+
+import ableton_client  # noqa: F401  (makes the OrbitRemote modules importable)
+from OrbitRemote.osc_codec import (Double, Int64, OSCDecodeError, OSCEncoder, SlipDecoder, decode_message,
+                                   encode_message, slip_encode)
+from OrbitRemote.protocol import ChunkAssembler, chunk_packet
+from OrbitRemote.snapshot import (HAS_CLIP, NOTE_RECORD, PLAYING, RECORDING, TRIGGERED, SnapshotError,
+                                  decode_matrix, decode_notes, decode_set_info, decode_tracks, encode_matrix,
+                                  encode_notes, encode_set_info, encode_tracks)
+
+
+class TestOSCCodec(unittest.TestCase):
+    """Test encoding and decoding of OSC messages"""
+
+    def test_round_trip(self):
+        """Test that all supported argument types survive a round trip"""
+        message = encode_message("/test/address", [42, -7, 3.5, "hello", "", True])
+        address, values = decode_message(message)
+
+        self.assertEqual(address, "/test/address")
+        self.assertEqual(values, [42, -7, 3.5, "hello", "", True])
+        self.assertIs(values[-1], True)
+
+    def test_wire_format_padding(self):
+        """Test that strings and type tags are null-terminated and 4-byte aligned"""
+        message = encode_message("/abc", ["abcd", 1])
+
+        self.assertEqual(message, b"/abc\x00\x00\x00\x00,si\x00abcd\x00\x00\x00\x00" + struct.pack(">i", 1))
+        self.assertEqual(len(message) % 4, 0)
+
+    def test_encoded_messages_stay_valid(self):
+        """Test that each encoded message is independent of later encodes"""
+        encoder = OSCEncoder()
+        small = encoder.encode("/a", [1])
+        large = encoder.encode("/live/tracks/response", ["x" * 100])
+
+        self.assertEqual(decode_message(large), ("/live/tracks/response", ["x" * 100]))
+        self.assertEqual(small, encode_message("/a", [1]))
+
+    def test_decode_from_receive_buffer(self):
+        """Test decoding a message that only fills part of a bytearray"""
+        buffer = bytearray(256)
+        message = encode_message("/live/tempo", [120.0])
+        buffer[:len(message)] = message
+
+        self.assertEqual(decode_message(buffer, 0, len(message)), ("/live/tempo", [120.0]))
+
+    def test_blob_round_trip(self):
+        """Test that blobs are length-prefixed and padded to 4 bytes"""
+        message = encode_message("/blob", [b"\x00\x01\x02\x03\x04", bytearray(b""), 7])
+
+        self.assertEqual(len(message) % 4, 0)
+        self.assertEqual(decode_message(message), ("/blob", [b"\x00\x01\x02\x03\x04", b"", 7]))
+
+    def test_extended_types_round_trip(self):
+        """Test doubles, int64s, booleans, nil and nested arrays"""
+        args = [Double(0.1), Int64(5), 1 << 40, True, False, None, [1, "two", [3.5, None]], (), b"\x01"]
+        message = encode_message("/ext", args)
+        address, values = decode_message(message)
+
+        self.assertEqual(message[8:24], b",dhhTFN[is[fN]][")
+        self.assertEqual(values, [0.1, 5, 1 << 40, True, False, None, [1, "two", [3.5, None]], [], b"\x01"])
+        self.assertIs(values[4], False)
+
+    def test_bools_are_tagged_by_value(self):
+        """Test that True and False share a signature but not a tag"""
+        self.assertEqual(decode_message(encode_message("/b", [True, 2])), ("/b", [True, 2]))
+        self.assertEqual(decode_message(encode_message("/b", [False, 2])), ("/b", [False, 2]))
+
+    def test_large_int_in_cached_signature(self):
+        """Test that an int beyond 32 bits falls back to int64 after the signature was cached"""
+        encoder = OSCEncoder()
+        self.assertEqual(decode_message(encoder.encode("/n", [1, "x"])), ("/n", [1, "x"]))
+        self.assertEqual(decode_message(encoder.encode("/n", [-(1 << 33), "x"])),
+                         ("/n", [-(1 << 33), "x"]))
+        self.assertEqual(decode_message(encoder.encode("/n", [1 << 31])), ("/n", [1 << 31]))
+
+    def test_numeric_runs_around_strings(self):
+        """Test that runs of numbers between strings decode in place"""
+        floats = [float(i) for i in range(64)]
+        message = encode_message("/meters", ["left"] + floats + ["right", None] + floats)
+
+        self.assertEqual(decode_message(message)[1], ["left"] + floats + ["right", None] + floats)
+
+    def test_message_without_type_tags(self):
+        """Test that a bare address decodes with no arguments"""
+        self.assertEqual(decode_message(b"/live/play\x00\x00"), ("/live/play", []))
+
+    def test_unsupported_argument_type(self):
+        """Test that unsupported arguments are rejected instead of dropped"""
+        with self.assertRaises(TypeError):
+            encode_message("/test", [object()])
+
+    def test_malformed_messages_raise(self):
+        """Test that truncated or unknown payloads raise OSCDecodeError"""
+        message = encode_message("/test", [1, 2])
+
+        with self.assertRaises(OSCDecodeError):
+            decode_message(message[:-2])
+        with self.assertRaises(OSCDecodeError):
+            decode_message(b"/test")
+        with self.assertRaises(OSCDecodeError):
+            decode_message(b"/test\x00\x00\x00,q\x00\x00")
+        with self.assertRaises(OSCDecodeError):
+            decode_message(b"/test\x00\x00\x00,[i\x00" + struct.pack(">i", 1))
+
+
+class TestSlipFraming(unittest.TestCase):
+    """Test OSC 1.1 SLIP framing for stream transports"""
+
+    def test_special_bytes_are_escaped(self):
+        self.assertEqual(slip_encode(b"a\xc0b\xdbc"), b"\xc0a\xdb\xdcb\xdb\xddc\xc0")
+
+    def test_stream_splits_back_into_packets(self):
+        rng = random.Random(8)
+        packets = [bytes(rng.choice(b"\x00\xc0\xdb\xdc\xddab") for _ in range(rng.randrange(1, 64)))
+                   for _ in range(50)]
+        stream = b"".join(slip_encode(packet) for packet in packets)
+
+        decoder = SlipDecoder()
+        received = []
+        for start in range(0, len(stream), 7):
+            received.extend(decoder.feed(stream[start:start + 7]))
+        self.assertEqual(received, packets)
+
+
+class TestChunking(unittest.TestCase):
+    """Test splitting large packets into chunks and reassembling them"""
+
+    def test_chunks_fit_and_reassemble_out_of_order(self):
+        packet = encode_message("/live/tracks/response", ["x" * 10000])
+        chunks = [encode_message(address, args) for address, args in chunk_packet(packet, 1, 1024)]
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 1024 for chunk in chunks))
+
+        assembler = ChunkAssembler()
+        results = [assembler.add("server", *decode_message(chunk)[1]) for chunk in reversed(chunks)]
+        self.assertEqual(results[:-1], [None] * (len(chunks) - 1))
+        self.assertEqual(results[-1], packet)
+        self.assertEqual(len(assembler), 0)
+
+    def test_incomplete_transfers_expire(self):
+        assembler = ChunkAssembler(timeout=0.01)
+        assembler.add("server", 1, 0, 2, b"abcd")
+        self.assertEqual(len(assembler), 1)
+
+        time.sleep(0.02)
+        assembler.add("server", 2, 0, 2, b"efgh")
+        self.assertEqual(len(assembler), 1)
+
+    def test_stray_chunks_are_dropped(self):
+        assembler = ChunkAssembler()
+        self.assertIsNone(assembler.add("server", 1, 2, 2, b"abcd"))
+        self.assertIsNone(assembler.add("server", 1, -1, 2, b"abcd"))
+        self.assertEqual(len(assembler), 0)
+
+        self.assertIsNone(assembler.add("server", 1, 0, 2, b"abcd"))
+        # A chunk claiming a different count belongs to another transfer
+        self.assertIsNone(assembler.add("server", 1, 1, 3, b"xxxx"))
+        self.assertIsNone(assembler.add("server", 1, 2, 3, b"yyyy"))
+        self.assertEqual(assembler.add("server", 1, 1, 2, b"efgh"), b"abcdefgh")
+
+
+
+class TestSnapshots(unittest.TestCase):
+    """Test the binary set info and track snapshots"""
+
+    def query(self, tracks, removed=()):
+        return {"epoch": 7, "version": 42, "full": not removed, "count": 10, "start": 0,
+                "tracks": tracks, "removed": list(removed)}
+
+    def test_set_info_round_trip(self):
+        info = {"tempo": 123.5, "is_playing": True, "track_count": 12, "scene_count": 8}
+        self.assertEqual(decode_set_info(encode_set_info(info)), info)
+
+    def test_tracks_round_trip(self):
+        tracks = [{"index": i, "name": "Audio" if i % 2 else f"Drums {i}", "color": None if i == 3 else i,
+                   "is_foldable": i == 0, "mute": i == 1, "solo": i == 2, "arm": i == 4,
+                   "volume": None if i == 3 else 0.5} for i in range(6)]
+        data = encode_tracks(self.query(tracks, removed=[10, 11]))
+        table = decode_tracks(data)
+
+        self.assertEqual(list(table), tracks)
+        self.assertEqual(table[-1], tracks[-1])
+        self.assertEqual(table.column("name"), [track["name"] for track in tracks])
+        self.assertEqual(table.column("mute"), [track["mute"] for track in tracks])
+        self.assertEqual((table.epoch, table.version, table.count, table.removed), (7, 42, 10, [10, 11]))
+        # "Audio" is stored once
+        self.assertEqual(table.names.count("Audio"), 1)
+        self.assertLess(len(data), len(json.dumps(tracks)) / 3)
+
+    def test_truncated_or_foreign_blobs_are_rejected(self):
+        data = encode_tracks(self.query([{"index": 0, "name": "Bass", "color": 1, "is_foldable": False,
+                                          "mute": False, "solo": False, "arm": False, "volume": 1.0}]))
+        for blob in (data[:-2], b"JSON" + data[4:], encode_set_info({"tempo": 1, "is_playing": False,
+                                                                     "track_count": 0, "scene_count": 0})):
+            with self.assertRaises(SnapshotError):
+                decode_tracks(blob)
+
+    def test_matrix_round_trip(self):
+        # 3 tracks x 5 scenes, an odd number of slots
+        flags = [0] * 15
+        flags[0] = HAS_CLIP | PLAYING
+        flags[4] = HAS_CLIP | TRIGGERED
+        flags[7] = TRIGGERED
+        flags[14] = HAS_CLIP | RECORDING
+        names = [None] * 15
+        names[0], names[4], names[14] = "Verse", "Chorus", "Verse"
+        plain = decode_matrix(encode_matrix(9, 3, 5, flags))
+        named = decode_matrix(encode_matrix(9, 3, 5, flags, names))
+
+        for matrix in (plain, named):
+            self.assertEqual([matrix.flags(cell // 5, cell % 5) for cell in range(15)], flags)
+            self.assertEqual(list(matrix.clips()), [(0, 0), (0, 4), (2, 4)])
+        self.assertEqual(plain[0, 0], {"has_clip": True, "playing": True, "triggered": False, "recording": False})
+        self.assertEqual(named[2, 4]["name"], "Verse")
+        self.assertIsNone(named.name(1, 2))
+        self.assertIsNone(plain.name(0, 0))
+        self.assertEqual(named.version, 9)
+        with self.assertRaises(IndexError):
+            plain.flags(3, 0)
+
+    def test_notes_round_trip(self):
+        notes = [(36, 0.0, 0.25, 127.0, False), (38, 0.5, 0.125, 64.0, True), (42, 1.75, 0.25, 90.0, False)]
+        data = encode_notes(5, 300, 100, notes + [(44, 2.0, 0.5, 200.0, False)])
+
+        version, total, start, decoded = decode_notes(data)
+        self.assertEqual((version, total, start), (5, 300, 100))
+        self.assertEqual(decoded[:3], notes)
+        # Velocities are clamped to MIDI's range
+        self.assertEqual(decoded[3][3], 127.0)
+        self.assertEqual(NOTE_RECORD.size, 11)
+        with self.assertRaises(SnapshotError):
+            decode_notes(data[:-1])
+
+    def test_matrix_of_a_large_session_is_small(self):
+        flags = [HAS_CLIP] * 10000
+        self.assertEqual(len(encode_matrix(1, 100, 100, flags)), 13 + 5000)
+        with self.assertRaises(SnapshotError):
+            decode_matrix(encode_matrix(1, 100, 100, flags, ["Clip"] * 10000)[:-2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,1315 @@
+#!/usr/bin/env python3
+"""Unit tests for the OrbitRemote OSC server against a fake Live set"""
+
+import ast
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+import types
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Load the OrbitRemote package without running its __init__, which needs Live
+_orbit_remote_path = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts", "OrbitRemote")
+)
+if 'OrbitRemote' not in sys.modules:
+    _package = types.ModuleType('OrbitRemote')
+    _package.__path__ = [_orbit_remote_path]
+    sys.modules['OrbitRemote'] = _package
+
+from OrbitRemote.OSCServer import OSCServer  # noqa: E402
+from OrbitRemote.osc_codec import (SlipDecoder, decode_message, encode_bundle, encode_message, slip_encode,  # noqa: E402
+                                   time_to_timetag)
+from OrbitRemote.osc_listener import StreamPeer  # noqa: E402
+from OrbitRemote.remote_log import DEBUG, INFO, WARNING, RemoteLog  # noqa: E402
+from OrbitRemote.protocol import ChunkAssembler, request_address  # noqa: E402
+from OrbitRemote.routing import Router, compile_segment  # noqa: E402
+from OrbitRemote.meters import MeterStream  # noqa: E402
+from OrbitRemote.ramps import RampTable  # noqa: E402
+from OrbitRemote.stats import BUCKET_BOUNDS_US, MAX_ENDPOINTS, OTHER, ServerStats, endpoint_key  # noqa: E402
+from OrbitRemote.session import SessionMatrix  # noqa: E402
+from OrbitRemote.snapshot import (HAS_CLIP, PLAYING, TRIGGERED, decode_matrix, decode_meters,  # noqa: E402
+                                  decode_notes, decode_set_info, decode_tracks, encode_notes)
+
+
+class Listenable:
+    """Live's ``add_<prop>_listener``/``remove_<prop>_listener`` API; setting a
+    property calls its listeners"""
+
+    def __getattr__(self, name):
+        for action in ("add_", "remove_"):
+            if name.startswith(action) and name.endswith("_listener"):
+                prop = name[len(action):-len("_listener")]
+                listeners = self.__dict__.setdefault("_listeners", {}).setdefault(prop, [])
+                return listeners.append if action == "add_" else listeners.remove
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        for callback in list(self.__dict__.get("_listeners", {}).get(name, ())):
+            callback()
+
+    def listener_count(self):
+        return sum(len(listeners) for listeners in self.__dict__.get("_listeners", {}).values())
+
+
+class FakeParameter(Listenable):
+    def __init__(self, value=0.85):
+        self.value = value
+
+
+class FakeMixer:
+    def __init__(self):
+        self.volume = FakeDeviceParameter("Track Volume", 0.85)
+        self.panning = FakeDeviceParameter("Pan", 0.0, -1.0, 1.0)
+        self.sends = [FakeDeviceParameter("Send A", 0.0)]
+
+
+class FakeDeviceParameter(FakeParameter):
+    def __init__(self, name, value=0.0, min=0.0, max=1.0, is_quantized=False):
+        super().__init__(value)
+        self.name = name
+        self.min = min
+        self.max = max
+        self.is_quantized = is_quantized
+        self.is_enabled = True
+        self.value_items = ()
+
+
+class FakeDevice:
+    def __init__(self, name, parameter_count):
+        self.name = name
+        self.class_name = "PluginDevice"
+        self.type = 1
+        self.is_active = True
+        self.parameters = [FakeDeviceParameter(f"Param {i}") for i in range(parameter_count)]
+
+
+class FakeClip(Listenable):
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeMidiClip(Listenable):
+    def __init__(self, notes):
+        self.name = "Beat"
+        self.is_midi_clip = True
+        self.notes = list(notes)
+        self.reads = 0
+        self.replaced = 0
+        self.selected = False
+
+    def get_notes(self, from_time, from_pitch, time_span, pitch_span):
+        self.reads += 1
+        return tuple(note for note in self.notes if from_time <= note[1] < from_time + time_span
+                     and from_pitch <= note[0] < from_pitch + pitch_span)
+
+    def select_all_notes(self):
+        self.selected = True
+
+    def deselect_all_notes(self):
+        self.selected = False
+
+    def replace_selected_notes(self, notes):
+        assert self.selected
+        self.replaced += 1
+        self.notes = list(notes)
+
+
+class FakeClipSlot(Listenable):
+    def __init__(self, clip=None):
+        self.clip = clip
+        self.has_clip = clip is not None
+        self.is_playing = False
+        self.is_triggered = False
+        self.is_recording = False
+        self.playing_status = 0
+
+
+class FakeTrack(Listenable):
+    def __init__(self, name):
+        self.name = name
+        self.color_index = 0
+        self.is_foldable = False
+        self.mute = False
+        self.solo = False
+        self.arm = False
+        self.can_be_armed = True
+        self.mixer_device = FakeMixer()
+        self.clip_slots = []
+        self.devices = []
+        self.output_meter_left = 0.0
+        self.output_meter_right = 0.0
+
+
+class FakeSong(Listenable):
+    def __init__(self, track_count=4):
+        self.tempo = 120.0
+        self.is_playing = False
+        self.tracks = [FakeTrack(f"Track {i}") for i in range(track_count)]
+        self.scenes = []
+
+    def start_playing(self):
+        self.is_playing = True
+
+    def stop_playing(self):
+        self.is_playing = False
+
+
+class FakeControlSurface:
+    def __init__(self, song):
+        self._song = song
+        self.logs = []
+
+    def song(self):
+        return self._song
+
+    def log_message(self, message):
+        self.logs.append(message)
+
+
+class FakeRemote:
+    def __init__(self, song):
+        self._c_instance = FakeControlSurface(song)
+        self.log_message = self._c_instance.log_message
+
+
+def tick_in_background(test, server, interval=0.005):
+    """Call process_messages() periodically, as Live's update_display does"""
+    stop = threading.Event()
+
+    def tick():
+        while not stop.is_set():
+            server.process_messages()
+            stop.wait(interval)
+
+    thread = threading.Thread(target=tick, daemon=True)
+    thread.start()
+    test.addCleanup(thread.join)
+    test.addCleanup(stop.set)
+
+
+class OSCServerTestCase(unittest.TestCase):
+    """Base class running an OSCServer on an ephemeral port with responses captured"""
+
+    track_count = 4
+
+    def setUp(self):
+        self.song = FakeSong(self.track_count)
+        self.server = OSCServer(FakeRemote(self.song), port=0)
+        self.responses = []
+        self.notifications = []
+        for method, capture in (('_send_response', self._capture_response),
+                                ('_send_notifications', self._capture_notifications)):
+            patcher = patch.object(self.server, method, side_effect=capture)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.server.shutdown)
+
+    def _capture_response(self, addr, address, args, request_id=None):
+        if request_id is not None:
+            address = request_address(request_id, address)
+        self.responses.append((address, args))
+
+    def _capture_notifications(self, peer, messages):
+        self.notifications.append(dict((address, args) for address, args in messages))
+
+    def handle(self, packet):
+        self.server._handle_message(packet, ('127.0.0.1', 50000))
+        self.server.process_messages()
+
+
+class TestOSCServerDispatch(OSCServerTestCase):
+    """Test single messages against the fake Live set"""
+
+    def test_set_tempo(self):
+        self.handle(encode_message("/live/tempo", [128.0]))
+
+        self.assertEqual(self.song.tempo, 128.0)
+        self.assertEqual(self.responses, [("/live/tempo/response", ["success", 128.0])])
+
+    def test_errors_are_reported(self):
+        self.handle(encode_message("/live/tempo", ["fast"]))
+
+        self.assertEqual(self.responses[0][0], "/error")
+
+    def test_receives_datagrams_over_udp(self):
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for tempo in (90.0, 100.0, 110.0):
+            sender.sendto(encode_message("/live/tempo", [tempo]), self.server.socket.getsockname())
+        sender.close()
+        time.sleep(0.05)
+        # The socket thread only queues; Live is touched on the next tick
+        self.assertEqual(self.song.tempo, 120.0)
+
+        self.server.process_messages()
+        self.assertEqual(self.song.tempo, 110.0)
+        self.assertEqual(len(self.responses), 3)
+
+    def test_tick_budget_leaves_the_rest_for_later(self):
+        self.server.tick_budget = 0.0
+        for tempo in (90.0, 100.0, 110.0):
+            self.server._handle_message(encode_message("/live/tempo", [tempo]), ('127.0.0.1', 50000))
+
+        self.server.process_messages()
+        self.assertEqual(self.song.tempo, 90.0)
+        self.server.process_messages()
+        self.server.process_messages()
+        self.assertEqual(self.song.tempo, 110.0)
+
+    def test_shutdown_is_immediate(self):
+        started = time.monotonic()
+        self.server.shutdown()
+
+        self.assertFalse(self.server.thread.is_alive())
+        self.assertLess(time.monotonic() - started, 0.05)
+
+    def test_request_id_is_echoed(self):
+        self.handle(encode_message("/req/7/live/tempo", [100.0]))
+
+        self.assertEqual(self.responses, [("/req/7/live/tempo/response", ["success", 100.0])])
+
+    def test_retransmission_of_queued_request_is_dropped(self):
+        for _ in range(3):
+            self.server._handle_message(encode_message("/req/4/live/tempo", [100.0]), ('127.0.0.1', 50000))
+        self.server.process_messages()
+
+        self.assertEqual(self.responses, [("/req/4/live/tempo/response", ["success", 100.0])])
+
+    def test_retransmitted_request_is_applied_once(self):
+        self.handle(encode_message("/req/9/live/tempo", [100.0]))
+        self.song.tempo = 90.0
+        self.handle(encode_message("/req/9/live/tempo", [100.0]))
+
+        self.assertEqual(self.song.tempo, 90.0)
+        self.assertEqual(self.responses, [("/req/9/live/tempo/response", ["success", 100.0])] * 2)
+
+    def test_large_replies_are_not_cached(self):
+        addr = ('127.0.0.1', 50000)
+        self.server._remember_reply(addr, 1, ("/live/tracks/response", [b"\x00" * 65536]))
+        self.server._remember_reply(addr, 2, ("/live/tempo/response", ["success", 100.0]))
+
+        self.assertEqual(list(self.server._replies), [(addr, 1), (addr, 2)])
+        self.assertEqual(self.server._reply_bytes, len("/live/tempo/response") + len("success") + 8)
+        # The request is still known to have run, so a retransmission is not applied again
+        seen, reply = self.server._claim_request(addr, 1)
+        self.assertTrue(seen)
+        self.assertEqual(reply[0], "/error")
+
+    def test_request_without_response_fails(self):
+        self.handle(encode_message("/req/8/live/track/volume", [99, 0.5]))
+
+        self.assertEqual(self.responses[0][0], "/req/8/error")
+
+
+class TestMeterStream(unittest.TestCase):
+    """Test reducing per-tick meter readings to frames"""
+
+    def test_frames_keep_the_loudest_reading(self):
+        stream = MeterStream(rate=5.0, hold=10.0)
+        stream.add(0, 0.2, 0.4)
+        self.assertEqual(decode_meters(stream.frame(100.0)), (1, [(0, 0.2, 0.4, 0.4)]))
+
+        # Two ticks before the next frame is due at 100.2
+        stream.add(0, 0.9, 0.3)
+        self.assertIsNone(stream.frame(100.1))
+        stream.add(0, 0.1, 0.5)
+        sequence, [(_, left, right, peak)] = decode_meters(stream.frame(100.2))
+
+        self.assertEqual(sequence, 2)
+        self.assertAlmostEqual(left, 0.9, places=2)
+        self.assertAlmostEqual(right, 0.5, places=2)
+        self.assertAlmostEqual(peak, 0.9, places=2)
+
+    def test_peak_is_held_then_released(self):
+        stream = MeterStream(rate=100.0, hold=1.0)
+        peaks = []
+        for now, level in ((0.0, 0.8), (0.5, 0.2), (1.1, 0.2)):
+            stream.add(3, level, level)
+            peaks.append(round(decode_meters(stream.frame(now))[1][0][3], 2))
+
+        self.assertEqual(peaks, [0.8, 0.8, 0.2])
+
+
+class TestOSCServerMeters(OSCServerTestCase):
+    """Test streaming packed meter frames to /live/meters subscribers"""
+
+    def stream(self, *options):
+        self.handle(encode_message("/live/meters", list(options)))
+        return self.responses.pop()
+
+    def frames(self):
+        return [decode_meters(notification["/notify/live/meters"][0]) for notification in self.notifications
+                if "/notify/live/meters" in notification]
+
+    def test_selected_tracks_are_streamed(self):
+        self.song.tracks[2].output_meter_left = 0.6
+        self.song.tracks[2].output_meter_right = 0.4
+
+        self.assertEqual(self.stream("rate", 1000.0, "tracks", "2,0"),
+                         ("/live/meters/response", ["success", 60.0, 1000.0]))
+        time.sleep(0.002)
+        self.server.process_messages()
+
+        frames = self.frames()
+        self.assertEqual(len(frames), 2)
+        self.assertEqual([record[0] for record in frames[-1][1]], [0, 2])
+        self.assertAlmostEqual(frames[-1][1][1][1], 0.6, places=2)
+
+    def test_renewal_keeps_the_stream(self):
+        self.stream("rate", 0.5)
+        self.stream("rate", 0.5)
+        self.server.process_messages()
+
+        # One frame per 2 seconds, and the sequence was not restarted
+        self.assertEqual([sequence for sequence, _ in self.frames()], [1])
+
+    def test_unsubscribe_or_zero_rate_stops(self):
+        self.stream("rate", 1000.0)
+        self.handle(encode_message("/live/unsubscribe", ["/live/meters"]))
+        self.stream("rate", 1000.0, "tracks", "1")
+        self.assertEqual(self.stream("rate", 0), ("/live/meters/response", ["success", 0.0, 0.0]))
+        self.notifications.clear()
+        time.sleep(0.002)
+        self.server.process_messages()
+
+        self.assertEqual(self.frames(), [])
+        self.assertEqual(self.server._meters, {})
+
+
+class TestRampTable(unittest.TestCase):
+    """Test interpolating ramps at explicit times"""
+
+    def setUp(self):
+        self.ramps = RampTable()
+        self.values = []
+
+    def test_curves_and_completion(self):
+        self.ramps.start("/a", self.values.append, 0.0, 1.0, 2.0, now=10.0)
+        self.ramps.start("/b", self.values.append, 0.0, 1.0, 2.0, now=10.0, curve="ease-in")
+        self.ramps.advance(11.0)
+        self.assertEqual(self.values, [0.5, 0.25])
+
+        self.ramps.advance(12.5)
+        self.assertEqual(self.values[2:], [1.0, 1.0])
+        self.assertEqual(len(self.ramps), 0)
+
+    def test_foreign_writes_cancel(self):
+        self.ramps.start("/a", self.values.append, 0.0, 1.0, 2.0, now=0.0)
+        self.ramps.advance(1.0)
+        self.ramps.written("/a", 0.5)
+        self.assertEqual(len(self.ramps), 1)
+
+        self.ramps.written("/a", 0.8)
+        self.assertEqual(len(self.ramps), 0)
+
+    def test_failing_target_is_dropped(self):
+        def deleted(value):
+            raise RuntimeError("track deleted")
+
+        self.ramps.start("/a", deleted, 0.0, 1.0, 2.0, now=0.0)
+        self.assertEqual([path for path, _ in self.ramps.advance(1.0)], ["/a"])
+        self.assertEqual(len(self.ramps), 0)
+
+    def test_invalid_ramps(self):
+        with self.assertRaises(ValueError):
+            self.ramps.start("/a", self.values.append, 0.0, 1.0, 2.0, now=0.0, curve="bounce")
+        with self.assertRaises(ValueError):
+            self.ramps.start("/a", self.values.append, 0.0, 1.0, -1.0, now=0.0)
+
+
+class TestOSCServerRamps(OSCServerTestCase):
+    """Test /live/ramp moving values on each tick"""
+
+    def volumes(self):
+        return [track.mixer_device.volume.value for track in self.song.tracks]
+
+    def test_ramp_runs_on_ticks(self):
+        self.handle(encode_message("/live/ramp", ["/live/track/[12]/volume", 0.0, 60.0, "ease-out"]))
+        self.assertEqual(self.responses.pop(), ("/live/ramp/response",
+                                                ["success", "/live/track/1/volume", "/live/track/2/volume"]))
+        time.sleep(0.01)
+        self.server.process_messages()
+
+        volumes = self.volumes()
+        self.assertEqual((volumes[0], volumes[3]), (0.85, 0.85))
+        self.assertTrue(0.0 < volumes[1] < 0.85)
+
+    def test_zero_duration_jumps_and_clamps(self):
+        self.handle(encode_message("/live/ramp", ["/live/tempo", 5000.0, 0.0]))
+
+        self.assertEqual(self.song.tempo, 999.0)
+        self.assertEqual(len(self.server._ramps), 0)
+
+    def test_later_write_cancels(self):
+        self.handle(encode_message("/live/ramp", ["/live/track/*/volume", 0.0, 60.0]))
+        self.handle(encode_message("/live/track/volume", [2, 0.5]))
+        self.server.process_messages()
+
+        self.assertEqual(sorted(self.server._ramps.paths()),
+                         ["/live/track/0/volume", "/live/track/1/volume", "/live/track/3/volume"])
+        self.assertEqual(self.song.tracks[2].mixer_device.volume.value, 0.5)
+
+        self.handle(encode_message("/live/ramp/cancel", ["/live/track/[01]/volume"]))
+        self.assertEqual(self.responses.pop(), ("/live/ramp/cancel/response",
+                                                ["success", "/live/track/0/volume", "/live/track/1/volume"]))
+        self.assertEqual(self.server._ramps.paths(), ["/live/track/3/volume"])
+
+    def test_unknown_target_is_an_error(self):
+        self.handle(encode_message("/req/1/live/ramp", ["/live/track/0/mute", 1.0, 1.0]))
+        self.assertEqual(self.responses.pop()[0], "/req/1/error")
+
+
+class TestOSCServerBatch(OSCServerTestCase):
+    """Test that /live/batch validates every operation before applying any"""
+
+    def batch(self, *args):
+        self.handle(encode_message("/live/batch", list(args)))
+        address, result = self.responses[-1]
+        self.assertEqual(address, "/live/batch/response")
+        return result
+
+    def test_applies_every_operation(self):
+        result = self.batch("volume", 0, 0.5, "mute", 1, 1, "solo", 2, 1, "arm", 3, 1, "tempo", 2000.0)
+
+        self.assertEqual(result, ["success", 5, 0.5, True, True, True, 999.0])
+        self.assertEqual(self.song.tracks[0].mixer_device.volume.value, 0.5)
+        self.assertTrue(self.song.tracks[1].mute)
+        self.assertEqual(self.song.tempo, 999.0)
+
+    def test_invalid_operation_applies_nothing(self):
+        self.song.tracks[3].can_be_armed = False
+        result = self.batch("mute", 0, 1, "arm", 3, 1, "volume", 9, 0.5, "launch", 0, 0)
+
+        self.assertEqual(result[:2], ["error", 4])
+        self.assertEqual(result[2::2], [1, 2, 3])
+        self.assertFalse(self.song.tracks[0].mute)
+
+    def test_unknown_or_short_operation(self):
+        self.assertEqual(self.batch("mute", 0, 1, "pan", 0, 0.5)[:3], ["error", 2, 1])
+        self.assertEqual(self.batch("volume", 0)[:3], ["error", 1, 0])
+        self.assertFalse(self.song.tracks[0].mute)
+
+    def test_failure_while_applying_reverts(self):
+        clip = MagicMock()
+        clip.fire.side_effect = RuntimeError("clip was deleted")
+        self.song.tracks[0].clip_slots = [MagicMock(clip=clip)]
+        result = self.batch("mute", 0, 1, "tempo", 90.0, "launch", 0, 0)
+
+        self.assertEqual(result, ["error", 3, 2, "clip was deleted"])
+        self.assertFalse(self.song.tracks[0].mute)
+        self.assertEqual(self.song.tempo, 120.0)
+
+    def test_one_undo_step(self):
+        self.song.begin_undo_step = MagicMock()
+        self.song.end_undo_step = MagicMock()
+        self.batch("mute", 0, 1, "solo", 0, 1)
+
+        self.song.begin_undo_step.assert_called_once_with()
+        self.song.end_undo_step.assert_called_once_with()
+
+
+class TestOSCServerDevices(OSCServerTestCase):
+    """Test device and parameter pages and bulk parameter writes"""
+
+    def setUp(self):
+        super().setUp()
+        self.device = FakeDevice("Big Synth", 300)
+        self.device.parameters[5] = FakeDeviceParameter("Mode", 1.0, 0.0, 3.0, is_quantized=True)
+        self.song.tracks[1].devices = [FakeDevice("EQ Eight", 4), self.device]
+
+    def query(self, address, *args):
+        self.handle(encode_message(address, list(args)))
+        reply_address, reply = self.responses[-1]
+        self.assertEqual(reply_address, address + "/response")
+        return json.loads(reply[0]) if reply_address != "/live/device/parameters/set/response" else reply
+
+    def test_device_list(self):
+        reply = self.query("/live/track/devices", 1)
+        self.assertEqual(reply["count"], 2)
+        self.assertEqual(reply["devices"][1], {"index": 1, "name": "Big Synth", "class_name": "PluginDevice",
+                                               "type": 1, "is_active": True, "parameter_count": 300})
+
+        self.handle(encode_message("/live/track/1/devices", ["fields", "name", "start", 1]))
+        self.assertEqual(json.loads(self.responses[-1][1][0])["devices"], [{"index": 1, "name": "Big Synth"}])
+
+    def test_parameter_pages_read_only_the_page(self):
+        # Reading a parameter outside the page would fail
+        for parameter in self.device.parameters[:100] + self.device.parameters[110:]:
+            del parameter.value
+
+        reply = self.query("/live/device/parameters", 1, 1, "start", 100, "count", 10, "fields", "value,name")
+        self.assertEqual(reply["count"], 300)
+        self.assertEqual(len(reply["parameters"]), 10)
+        self.assertEqual(reply["parameters"][0], {"index": 100, "value": 0.0, "name": "Param 100"})
+
+    def test_mixer_parameters(self):
+        reply = self.query("/live/device/parameters", 0, "mixer", "fields", "name")
+        self.assertEqual([row["name"] for row in reply["parameters"]][1:], ["Pan", "Send A"])
+
+    def test_bulk_set(self):
+        result = self.query("/live/device/parameters/set", 1, 1, 0, 0.5, "Mode", 2.4, 299, 7.0)
+
+        self.assertEqual(result, ["success", 3, 0.5, 2.0, 1.0])
+        self.assertEqual(self.device.parameters[5].value, 2.0)
+        self.assertEqual(self.device.parameters[299].value, 1.0)
+
+    def test_bulk_set_validates_first(self):
+        result = self.query("/live/device/parameters/set", 1, 1, 0, 0.5, 300, 0.5, "Missing", 0.5)
+
+        self.assertEqual(result[:2], ["error", 3])
+        self.assertEqual(result[2::2], [1, 2])
+        self.assertEqual(self.device.parameters[0].value, 0.0)
+
+    def test_parameter_batch_operation(self):
+        self.handle(encode_message("/live/batch", ["parameter", 1, 0, 2, 0.5, "parameter", 0, "mixer", 1, -0.5]))
+
+        self.assertEqual(self.responses[-1], ("/live/batch/response", ["success", 2, 0.5, -0.5]))
+        self.assertEqual(self.song.tracks[0].mixer_device.panning.value, -0.5)
+
+    def test_bad_device_or_options(self):
+        for request_id, args in enumerate(([1, 2], [1, 0, "fields", "colour"], [1, 0, "page", 2]), 1):
+            self.handle(encode_message(f"/req/{request_id}/live/device/parameters", args))
+            self.assertEqual(self.responses[-1][0], f"/req/{request_id}/error")
+
+
+class TestOSCServerSessionMatrix(OSCServerTestCase):
+    """Test the clip slot matrix and its listener-driven cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.song.scenes = [object()] * 3
+        for index, track in enumerate(self.song.tracks):
+            track.clip_slots = [FakeClipSlot(FakeClip(f"Clip {index}") if scene == index % 3 else None)
+                                for scene in range(3)]
+
+    def matrix(self, *args):
+        self.handle(encode_message("/live/session/matrix", list(args)))
+        address, reply = self.responses[-1]
+        self.assertEqual(address, "/live/session/matrix/response")
+        return reply[0]
+
+    def test_matrix(self):
+        matrix = decode_matrix(self.matrix("names", 1))
+
+        self.assertEqual((matrix.track_count, matrix.scene_count), (4, 3))
+        self.assertEqual(list(matrix.clips()), [(0, 0), (1, 1), (2, 2), (3, 0)])
+        self.assertEqual(matrix.name(3, 0), "Clip 3")
+        self.assertIsNone(decode_matrix(self.matrix()).name(3, 0))
+
+    def test_listeners_invalidate_the_cache(self):
+        first = self.matrix()
+        self.assertIs(self.matrix(), first)
+
+        slot = self.song.tracks[1].clip_slots[1]
+        slot.is_playing = True
+        slot.playing_status = 1
+        empty = self.song.tracks[0].clip_slots[2]
+        empty.clip = FakeClip("New")
+        empty.has_clip = True
+        self.song.tracks[2].clip_slots[2].clip.name = "Renamed"
+
+        matrix = decode_matrix(self.matrix("names", 1))
+        self.assertEqual(matrix.flags(1, 1), HAS_CLIP | PLAYING)
+        self.assertEqual(matrix.name(0, 2), "New")
+        self.assertEqual(matrix.name(2, 2), "Renamed")
+        self.assertGreater(matrix.version, decode_matrix(first).version)
+
+        slot.is_triggered = True
+        self.assertEqual(decode_matrix(self.matrix()).flags(1, 1), HAS_CLIP | PLAYING | TRIGGERED)
+
+    def test_new_scenes_are_read(self):
+        self.matrix()
+        for track in self.song.tracks:
+            track.clip_slots.append(FakeClipSlot(FakeClip("Outro")))
+        self.song.scenes = [object()] * 4
+
+        matrix = decode_matrix(self.matrix())
+        self.assertEqual(matrix.scene_count, 4)
+        self.assertTrue(all(matrix.has_clip(track, 3) for track in range(4)))
+
+    def test_grid_is_read_once_per_access(self):
+        self.matrix()
+        with patch.object(SessionMatrix, "_read", autospec=True, side_effect=SessionMatrix._read) as read:
+            for track in self.song.tracks:
+                track.clip_slots = track.clip_slots + [FakeClipSlot()]
+            self.song.scenes = [object()] * 4
+            self.assertEqual(read.call_count, 0)
+
+            self.assertEqual(decode_matrix(self.matrix()).scene_count, 4)
+            self.matrix()
+        self.assertEqual(read.call_count, 1)
+
+    def test_shutdown_removes_slot_listeners(self):
+        self.matrix()
+        slot = self.song.tracks[0].clip_slots[0]
+        self.assertGreater(slot.listener_count(), 0)
+        self.server.shutdown()
+
+        self.assertEqual(slot.listener_count(), 0)
+        self.assertEqual(slot.clip.listener_count(), 0)
+
+
+class TestOSCServerNotes(OSCServerTestCase):
+    """Test chunked note reads and writes of MIDI clips"""
+
+    def setUp(self):
+        super().setUp()
+        # A dense drum clip: 1000 notes, out of order
+        notes = [(36 + i % 4, (i // 4) * 0.25, 0.25, 100.0, i % 7 == 0) for i in range(1000)]
+        random.Random(4).shuffle(notes)
+        self.clip = FakeMidiClip(notes)
+        self.song.tracks[2].clip_slots = [FakeClipSlot(), FakeClipSlot(self.clip)]
+        self.song.scenes = [object()] * 2
+
+    def chunk(self, start=0, count=256, address="/live/clip/notes", prefix=(2, 1)):
+        self.handle(encode_message(address, list(prefix) + ["start", start, "count", count]))
+        reply_address, reply = self.responses[-1]
+        self.assertEqual(reply_address, "/live/clip/notes/response")
+        return decode_notes(reply[0])
+
+    def upload(self, notes, start, total):
+        self.handle(encode_message("/live/clip/notes/set", [2, 1, encode_notes(0, total, start, notes)]))
+        return self.responses[-1]
+
+    def test_chunked_read(self):
+        chunks = [self.chunk(start) for start in range(0, 1000, 256)]
+
+        self.assertEqual({(version, total) for version, total, _, _ in chunks}, {(chunks[0][0], 1000)})
+        notes = [note for _, _, _, chunk in chunks for note in chunk]
+        self.assertEqual(notes, sorted(self.clip.notes, key=lambda note: (note[1], note[0])))
+        self.assertEqual([len(chunk) for _, _, _, chunk in chunks], [256, 256, 256, 232])
+        # Live was asked once; the other chunks came from the cache
+        self.assertEqual(self.clip.reads, 1)
+
+        self.assertEqual(self.chunk(0, 4, "/live/track/2/clip/1/notes", ())[3], notes[:4])
+
+    def test_changed_notes_get_a_new_version(self):
+        first = self.chunk()
+        self.clip.notes = self.clip.notes[:10]
+        second = self.chunk()
+
+        self.assertNotEqual(first[0], second[0])
+        self.assertEqual(second[1], 10)
+
+    def test_chunked_write_replaces_notes_once(self):
+        self.song.begin_undo_step = MagicMock()
+        self.song.end_undo_step = MagicMock()
+        notes = [(60 + i % 12, i * 0.5, 0.5, 90.0, False) for i in range(600)]
+
+        self.assertEqual(self.upload(notes[:300], 0, 600),
+                         ("/live/clip/notes/set/response", ["pending", 300, 600]))
+        self.assertEqual(self.clip.replaced, 0)
+        self.assertEqual(self.upload(notes[300:], 300, 600), ("/live/clip/notes/set/response", ["success", 600]))
+
+        self.assertEqual(self.clip.replaced, 1)
+        self.assertEqual(self.clip.notes, notes)
+        self.assertFalse(self.clip.selected)
+        self.song.begin_undo_step.assert_called_once_with()
+        self.assertEqual(self.chunk(0, 600)[3], notes)
+
+    def test_invalid_requests(self):
+        audio = FakeMidiClip([])
+        audio.is_midi_clip = False
+        self.song.tracks[3].clip_slots = [FakeClipSlot(audio)]
+        requests = [("/live/clip/notes", [3, 0]), ("/live/clip/notes", [2, 0]), ("/live/clip/notes", [2, 1, "end", 4]),
+                    ("/live/clip/notes/set", [2, 1, encode_notes(0, 10, 5, [(60, 0.0, 1.0, 100.0, False)])]),
+                    ("/live/clip/notes/set", [2, 1, encode_notes(0, 1, 0, [(60, 0.0, 0.0, 100.0, False)])]),
+                    ("/live/clip/notes/set", [2, 1, b"JSON"])]
+        for request_id, (address, args) in enumerate(requests, 1):
+            self.handle(encode_message(f"/req/{request_id}{address}", args))
+            self.assertEqual(self.responses[-1][0], f"/req/{request_id}/error", address)
+        self.assertEqual(self.clip.replaced, 0)
+
+
+class TestOSCServerPeers(unittest.TestCase):
+    """Test that replies go back to the sender when several clients share a server"""
+
+    def test_each_client_gets_its_own_reply(self):
+        server = OSCServer(FakeRemote(FakeSong()), port=0)
+        self.addCleanup(server.shutdown)
+        tick_in_background(self, server)
+        clients = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(3)]
+        for client in clients:
+            self.addCleanup(client.close)
+            client.bind(('127.0.0.1', 0))
+            client.settimeout(2.0)
+
+        for tempo, client in zip((100.0, 110.0, 120.0), clients):
+            client.sendto(encode_message("/live/tempo", [tempo]), server.socket.getsockname())
+        replies = [decode_message(client.recv(4096)) for client in clients]
+
+        self.assertEqual([args[1] for _, args in replies], [100.0, 110.0, 120.0])
+
+        clients[0].sendto(encode_message("/live/peers", []), server.socket.getsockname())
+        address, peers = decode_message(clients[0].recv(4096))
+        self.assertEqual(address, "/live/peers/response")
+        self.assertEqual(peers[0], "udp:127.0.0.1:%d" % clients[0].getsockname()[1])
+        self.assertEqual(sorted(peers), sorted("udp:127.0.0.1:%d" % c.getsockname()[1] for c in clients))
+
+    def test_idle_peers_expire(self):
+        server = OSCServer(FakeRemote(FakeSong()), port=0, peer_timeout=0.01)
+        self.addCleanup(server.shutdown)
+        server._handle_message(encode_message("/live/unknown", []), ('127.0.0.1', 50000))
+        self.assertEqual(server.active_peers(), [('127.0.0.1', 50000)])
+
+        time.sleep(0.02)
+        self.assertEqual(server.active_peers(), [])
+
+    def test_idle_peers_are_pruned_as_senders_arrive(self):
+        server = OSCServer(FakeRemote(FakeSong()), port=0, peer_timeout=0.01)
+        self.addCleanup(server.shutdown)
+        for port in range(50000, 50100):
+            server._handle_message(encode_message("/live/unknown", []), ('127.0.0.1', port))
+
+        time.sleep(0.02)
+        server._handle_message(encode_message("/live/unknown", []), ('127.0.0.1', 60000))
+        self.assertEqual(list(server._peers), [('127.0.0.1', 60000)])
+
+
+class TestOSCServerStateCache(OSCServerTestCase):
+    """Test that session queries are served from the listener-maintained model"""
+
+    def tracks(self):
+        self.responses.clear()
+        self.handle(encode_message("/live/tracks", []))
+        return json.loads(self.responses[-1][1][0])
+
+    def test_track_changes_reach_the_cache(self):
+        track = self.song.tracks[1]
+        track.name = "Bass"
+        track.mute = True
+        track.mixer_device.volume.value = 0.5
+
+        self.assertEqual(self.tracks()[1], {"index": 1, "name": "Bass", "color": 0, "is_foldable": False,
+                                            "mute": True, "solo": False, "arm": False, "volume": 0.5})
+
+    def test_queries_do_not_read_tracks(self):
+        # Bypasses the listeners; any walk of song.tracks would now fail
+        self.song.__dict__['tracks'] = None
+
+        self.assertEqual(len(self.tracks()), 4)
+        self.handle(encode_message("/live/get", []))
+        self.assertEqual(self.responses[-1][0], "/live/get/response")
+
+    def test_track_list_changes_rebuild_listeners(self):
+        removed = self.song.tracks[0]
+        self.song.tracks = self.song.tracks[1:] + [FakeTrack("New")]
+
+        self.assertEqual([track["name"] for track in self.tracks()], ["Track 1", "Track 2", "Track 3", "New"])
+        self.assertEqual(removed.listener_count(), 0)
+
+    def test_live_set_info_follows_song(self):
+        self.song.tempo = 98.0
+        self.song.start_playing()
+        self.handle(encode_message("/live/get", []))
+
+        info = ast.literal_eval(self.responses[-1][1][0])
+        self.assertEqual((info["tempo"], info["is_playing"], info["track_count"]), (98.0, True, 4))
+
+    def test_binary_snapshots(self):
+        self.song.tracks[2].solo = True
+        self.handle(encode_message("/live/tracks", ["format", "binary", "start", 1, "count", 2]))
+        table = decode_tracks(self.responses[-1][1][0])
+        self.handle(encode_message("/live/get", ["format", "binary"]))
+        info = decode_set_info(self.responses[-1][1][0])
+
+        # Volumes are single precision, like OSC floats
+        expected = self.tracks()[1:3]
+        for row, track in zip(table, expected):
+            self.assertAlmostEqual(row.pop("volume"), track.pop("volume"), places=6)
+        self.assertEqual([{k: v for k, v in row.items() if k != "volume"} for row in table], expected)
+        self.assertEqual(table.count, 4)
+        self.assertEqual(info, {"tempo": 120.0, "is_playing": False, "track_count": 4, "scene_count": 0})
+
+        self.handle(encode_message("/req/1/live/tracks", ["format", "binary", "fields", "name"]))
+        self.assertEqual(self.responses[-1][0], "/req/1/error")
+
+    def delta(self, since, epoch=None):
+        self.handle(encode_message("/live/tracks", [since, self.server._state.epoch if epoch is None else epoch]))
+        return json.loads(self.responses[-1][1][0])
+
+    def test_full_reply_carries_version(self):
+        self.song.tracks[0].solo = True
+        self.handle(encode_message("/live/tracks", []))
+
+        _, version, epoch = self.responses[-1][1]
+        self.assertEqual((version, epoch), (self.server._state.version, self.server._state.epoch))
+        self.assertGreater(version, 0)
+
+    def test_delta_contains_only_changed_tracks(self):
+        version = self.delta(0)["version"]
+        self.song.tracks[2].name = "Keys"
+        self.song.tracks[2].arm = True
+
+        delta = self.delta(version)
+        self.assertEqual([info["name"] for info in delta["tracks"]], ["Keys"])
+        self.assertEqual((delta["full"], delta["count"], delta["removed"]), (False, 4, []))
+        self.assertEqual(self.delta(delta["version"])["tracks"], [])
+
+    def test_deleted_tracks_leave_tombstones(self):
+        version = self.delta(0)["version"]
+        self.song.tracks = self.song.tracks[:2]
+
+        delta = self.delta(version)
+        self.assertEqual((delta["tracks"], delta["count"], delta["removed"]), ([], 2, [2, 3]))
+
+        self.song.tracks = self.song.tracks + [FakeTrack("Track 2")]
+        delta = self.delta(version)
+        self.assertEqual((delta["count"], delta["removed"]), (3, [3]))
+
+    def test_fields_and_range(self):
+        self.handle(encode_message("/live/tracks", ["fields", "name", "start", 1, "count", 2]))
+        reply = json.loads(self.responses[-1][1][0])
+
+        self.assertEqual(reply["tracks"], [{"index": 1, "name": "Track 1"}, {"index": 2, "name": "Track 2"}])
+        self.assertEqual((reply["count"], reply["start"]), (4, 1))
+
+    def test_paging_combines_with_deltas(self):
+        version = self.delta(0)["version"]
+        self.song.tracks[0].mute = True
+        self.song.tracks[3].mute = True
+        self.handle(encode_message("/live/tracks", ["since", version, "epoch", self.server._state.epoch,
+                                                    "start", 2, "fields", "mute"]))
+
+        self.assertEqual(json.loads(self.responses[-1][1][0])["tracks"], [{"index": 3, "mute": True}])
+
+    def test_unknown_field_is_an_error(self):
+        self.handle(encode_message("/req/3/live/tracks", ["fields", "name,colour"]))
+
+        self.assertEqual(self.responses[-1][0], "/req/3/error")
+
+    def test_unknown_epoch_gets_everything(self):
+        delta = self.delta(0, epoch=self.server._state.epoch + 1)
+
+        self.assertTrue(delta["full"])
+        self.assertEqual(len(delta["tracks"]), 4)
+
+    def test_shutdown_removes_listeners(self):
+        self.server.shutdown()
+
+        self.assertEqual(self.song.listener_count(), 0)
+        self.assertTrue(all(track.listener_count() == 0 for track in self.song.tracks))
+
+
+class TestOSCServerEmptySet(OSCServerTestCase):
+    """Test track deltas of a set that starts without tracks"""
+
+    track_count = 0
+
+    def test_first_track_gets_a_new_version(self):
+        self.song.tempo = 100.0
+        self.handle(encode_message("/live/tracks", []))
+        _, version, epoch = self.responses[-1][1]
+
+        self.song.tracks = [FakeTrack("Bass")]
+        self.handle(encode_message("/live/tracks", [version, epoch]))
+        delta = json.loads(self.responses[-1][1][0])
+
+        self.assertGreater(delta["version"], version)
+        self.assertEqual(([info["name"] for info in delta["tracks"]], delta["count"]), (["Bass"], 1))
+
+
+class TestOSCServerSubscriptions(OSCServerTestCase):
+    """Test pushing subscribed changes once per tick"""
+
+    def subscribe(self, *patterns):
+        self.handle(encode_message("/live/subscribe", list(patterns)))
+        return self.responses.pop()
+
+    def test_subscribe_sends_current_values(self):
+        response = self.subscribe("/live/tempo", "/live/track/*/volume")
+
+        self.assertEqual(response, ("/live/subscribe/response",
+                                    ["success", 60.0, "/live/tempo", "/live/track/*/volume"]))
+        self.assertEqual(self.notifications, [{
+            "/notify/live/tempo": [120.0],
+            "/notify/live/track/0/volume": [0.85], "/notify/live/track/1/volume": [0.85],
+            "/notify/live/track/2/volume": [0.85], "/notify/live/track/3/volume": [0.85],
+        }])
+
+    def test_changes_are_coalesced_per_tick(self):
+        self.subscribe("/live/tempo", "/live/track/*/volume")
+        self.notifications.clear()
+
+        self.song.tempo = 100.0
+        self.song.tempo = 101.0
+        self.song.tracks[2].mixer_device.volume.value = 0.5
+        self.song.tracks[2].mute = True
+        self.server.process_messages()
+
+        self.assertEqual(self.notifications, [{"/notify/live/tempo": [101.0],
+                                               "/notify/live/track/2/volume": [0.5]}])
+        self.server.process_messages()
+        self.assertEqual(len(self.notifications), 1)
+
+    def test_renewal_sends_only_new_patterns(self):
+        self.subscribe("/live/tempo")
+        self.notifications.clear()
+
+        response = self.subscribe("/live/tempo", "/live/transport")
+        self.assertEqual(response, ("/live/subscribe/response",
+                                    ["success", 60.0, "/live/tempo", "/live/transport"]))
+        self.assertEqual(self.notifications, [{"/notify/live/transport": [0]}])
+
+        self.subscribe("/live/tempo", "/live/transport")
+        self.assertEqual(len(self.notifications), 1)
+
+    def test_unsubscribe(self):
+        self.subscribe("/live/tempo", "/live/transport")
+        self.handle(encode_message("/live/unsubscribe", ["/live/tempo"]))
+        self.assertEqual(self.responses.pop(), ("/live/unsubscribe/response", ["success", "/live/transport"]))
+        self.notifications.clear()
+
+        self.song.tempo = 100.0
+        self.song.start_playing()
+        self.server.process_messages()
+        self.assertEqual(self.notifications, [{"/notify/live/transport": [1]}])
+
+        self.handle(encode_message("/live/unsubscribe", []))
+        self.song.stop_playing()
+        self.server.process_messages()
+        self.assertEqual(len(self.notifications), 1)
+
+    def test_malformed_pattern_is_rejected(self):
+        self.assertEqual(self.subscribe("/live/tempo", "/live/track/[0/mute")[0], "/error")
+        self.assertEqual(self.server._subscriptions, {})
+
+    def test_broken_subscription_does_not_stop_the_tick(self):
+        self.subscribe("/live/track/*/mute")
+        self.server._subscriptions[("127.0.0.1", 50001)] = (time.monotonic() + 60, ["/live/track/[0/mute"])
+        self.notifications.clear()
+
+        self.song.tracks[1].mute = True
+        self.server.process_messages()
+
+        self.assertEqual(self.notifications, [{"/notify/live/track/1/mute": [True]}])
+        self.assertNotIn(("127.0.0.1", 50001), self.server._subscriptions)
+
+    def test_lease_expires(self):
+        self.server.subscription_lease = 0.01
+        self.subscribe("/live/tempo")
+        self.notifications.clear()
+
+        time.sleep(0.02)
+        self.song.tempo = 100.0
+        self.server.process_messages()
+        self.assertEqual(self.notifications, [])
+
+
+class TestOSCServerBundles(OSCServerTestCase):
+    """Test bundle unpacking and aggregated responses"""
+
+    def test_bundle_dispatches_all_messages_with_one_response(self):
+        messages = [("/live/track/volume", [i, 0.5]) for i in range(4)] + [("/live/track/mute", [2, 1])]
+        self.handle(encode_bundle(messages))
+
+        self.assertEqual([track.mixer_device.volume.value for track in self.song.tracks], [0.5] * 4)
+        self.assertTrue(self.song.tracks[2].mute)
+        self.assertEqual(self.responses, [("/bundle/response", ["success", 5])])
+
+    def test_future_bundle_waits_for_its_timetag(self):
+        self.server._handle_message(encode_bundle([("/live/play", [])], time_to_timetag(time.time() + 0.05)),
+                                    ('127.0.0.1', 50000))
+        self.server.process_messages()
+        self.assertFalse(self.song.is_playing)
+
+        time.sleep(0.06)
+        self.server.process_messages()
+        self.assertTrue(self.song.is_playing)
+
+    def test_bundle_reports_failed_elements(self):
+        self.handle(encode_bundle([("/live/play", []), ("/live/tempo", ["fast"])]))
+
+        self.assertTrue(self.song.is_playing)
+        status, count, index, _ = self.responses[0][1]
+        self.assertEqual((status, count, index), ("error", 2, 1))
+
+
+class TestOSCServerChunking(unittest.TestCase):
+    """Test that responses over max_datagram_size are sent as chunks"""
+
+    def test_large_response_is_chunked(self):
+        server = OSCServer(FakeRemote(FakeSong()), port=0, max_datagram_size=512)
+        self.addCleanup(server.shutdown)
+        payload = "x" * 5000
+
+        with patch.object(server, 'socket') as sock:
+            server._send_response(('127.0.0.1', 50000), "/live/tracks/response", [payload], request_id=3)
+
+        datagrams = [call[0][0] for call in sock.sendto.call_args_list]
+        self.assertGreater(len(datagrams), 1)
+        self.assertTrue(all(len(datagram) <= 512 for datagram in datagrams))
+
+        assembler = ChunkAssembler()
+        packets = [assembler.add("server", *decode_message(datagram)[1]) for datagram in datagrams]
+        self.assertEqual(decode_message(packets[-1]), ("/req/3/live/tracks/response", [payload]))
+
+
+class TestOSCServerStream(unittest.TestCase):
+    """Test the SLIP-framed TCP transport"""
+
+    def test_tcp_request_is_answered_on_the_connection(self):
+        song = FakeSong(track_count=200)
+        server = OSCServer(FakeRemote(song), port=0, tcp_port=0, max_datagram_size=512)
+        self.addCleanup(server.shutdown)
+        tick_in_background(self, server)
+
+        conn = socket.create_connection(server.tcp_socket.getsockname(), timeout=2.0)
+        self.addCleanup(conn.close)
+        conn.sendall(slip_encode(encode_message("/req/5/live/tempo", [140.0]))
+                     + slip_encode(encode_message("/req/6/live/tracks", [])))
+
+        decoder = SlipDecoder()
+        packets = []
+        while len(packets) < 2:
+            packets.extend(decoder.feed(conn.recv(65536)))
+
+        self.assertEqual(song.tempo, 140.0)
+        self.assertEqual(decode_message(packets[0]), ("/req/5/live/tempo/response", ["success", 140.0]))
+        # Larger than max_datagram_size but sent whole, not as /chunk messages
+        address, args = decode_message(packets[1])
+        self.assertEqual(address, "/req/6/live/tracks/response")
+        self.assertGreater(len(packets[1]), 512)
+
+    def test_peer_that_stops_reading_never_blocks_the_main_thread(self):
+        server = OSCServer(FakeRemote(FakeSong(track_count=300)), port=0, tcp_port=0)
+        self.addCleanup(server.shutdown)
+        conn = socket.create_connection(server.tcp_socket.getsockname(), timeout=2.0)
+        self.addCleanup(conn.close)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+
+        with patch.object(StreamPeer, "max_queued", 256 * 1024):
+            conn.sendall(b"".join(slip_encode(encode_message(f"/req/{i}/live/tracks", [])) for i in range(400)))
+            deadline = time.monotonic() + 5.0
+            while server._commands or server._stream_listener._peers:
+                self.assertLess(time.monotonic(), deadline, "the peer was not disconnected")
+                started = time.monotonic()
+                server.process_messages()
+                self.assertLess(time.monotonic() - started, 0.5)
+                time.sleep(0.005)
+
+    def test_shutdown_closes_tcp_listener(self):
+        server = OSCServer(FakeRemote(FakeSong()), port=0, tcp_port=0)
+        server.shutdown()
+
+        self.assertFalse(server.tcp_thread.is_alive())
+        self.assertIsNone(server.tcp_socket)
+
+
+class TestRemoteLog(unittest.TestCase):
+    """Test levels, the ring buffer and sampling"""
+
+    def setUp(self):
+        self.written = []
+        self.log = RemoteLog(self.written.append, level=INFO, buffer_size=3)
+
+    def test_level_filters_writes_but_not_the_buffer(self):
+        self.log.debug("hidden %d", 1)
+        self.log.info("shown %s", "here")
+
+        self.assertEqual(self.written, ["INFO: shown here"])
+        self.assertTrue(self.log.recent()[0].endswith("DEBUG hidden 1"))
+
+        self.log.level = DEBUG
+        self.log.debug("now shown")
+        self.assertEqual(self.written[-1], "DEBUG: now shown")
+
+    def test_ring_buffer_keeps_the_latest_events(self):
+        for i in range(5):
+            self.log.debug("event %d", i)
+
+        self.assertEqual([line.split(" ", 1)[1] for line in self.log.recent()],
+                         ["DEBUG event 2", "DEBUG event 3", "DEBUG event 4"])
+        self.assertEqual(len(self.log.recent(1)), 1)
+
+    def test_sampling_suppresses_bursts(self):
+        self.log.sample_interval = 0.05
+        for _ in range(10):
+            self.log.sampled("receive", WARNING, "receive error")
+        time.sleep(0.06)
+        self.log.sampled("receive", WARNING, "receive error")
+
+        self.assertEqual(self.written, ["WARNING: receive error", "WARNING: receive error (9 similar suppressed)"])
+
+
+class TestOSCServerLogging(OSCServerTestCase):
+    """Test that packets are not logged to Live by default and the level is runtime-configurable"""
+
+    def test_messages_are_not_written_at_info_level(self):
+        logs = self.server.parent._c_instance.logs
+        del logs[:]
+        for tempo in (90.0, 100.0):
+            self.handle(encode_message("/live/tempo", [tempo]))
+
+        self.assertEqual(logs, [])
+
+    def test_level_and_recent_events_over_osc(self):
+        self.handle(encode_message("/live/log/level", ["debug"]))
+        self.assertEqual(self.responses[-1], ("/live/log/level/response", ["success", "debug"]))
+
+        self.handle(encode_message("/live/tempo", [90.0]))
+        self.handle(encode_message("/live/log/recent", [2]))
+        address, lines = self.responses[-1]
+        self.assertEqual(address, "/live/log/recent/response")
+        self.assertEqual(len(lines), 2)
+        self.assertIn("/live/tempo", lines[0])
+
+        self.handle(encode_message("/req/1/live/log/level", ["verbose"]))
+        self.assertEqual(self.responses[-1][0], "/req/1/error")
+
+
+class TestServerStats(unittest.TestCase):
+    """Test endpoint keys, histogram buckets and the endpoint cap"""
+
+    def setUp(self):
+        self.stats = ServerStats()
+
+    def test_endpoint_keys_fold_indices(self):
+        self.assertEqual(endpoint_key("/live/track/3/volume"), "/live/track/<n>/volume")
+        self.assertEqual(endpoint_key("/live/tempo"), "/live/tempo")
+
+    def test_histograms_and_counters(self):
+        self.stats.record("/live/track/0/volume", "live", 0.00004)
+        self.stats.record("/live/track/7/volume", "live", 0.003)
+        self.stats.call("/live/track/7/volume", failed=True)
+        self.stats.count("packets", 2)
+        self.stats.queued(5)
+        self.stats.queued(2)
+        self.stats.tick(0.001, exhausted=True)
+
+        snapshot = self.stats.snapshot(queue_depth=1)
+        endpoint = snapshot["endpoints"]["/live/track/<n>/volume"]
+        self.assertEqual((endpoint["calls"], endpoint["errors"]), (1, 1))
+        self.assertEqual(endpoint["live"]["count"], 2)
+        self.assertEqual(endpoint["live"]["max_ms"], 3.0)
+        self.assertEqual(endpoint["live"]["buckets"][0], 1)
+        self.assertEqual(endpoint["live"]["buckets"][BUCKET_BOUNDS_US.index(5000)], 1)
+        self.assertNotIn("send", endpoint)
+        self.assertEqual(snapshot["counters"], {"packets": 2, "budget_exhausted": 1})
+        self.assertEqual(snapshot["queue"], {"depth": 1, "scheduled": 0, "max_depth": 5})
+        json.dumps(snapshot)
+
+        self.stats.reset()
+        self.assertEqual(self.stats.snapshot()["endpoints"], {})
+
+    def test_endpoints_are_capped(self):
+        for i in range(MAX_ENDPOINTS + 10):
+            self.stats.call(f"/custom/path{i}")
+
+        endpoints = self.stats.snapshot()["endpoints"]
+        self.assertEqual(len(endpoints), MAX_ENDPOINTS + 1)
+        self.assertEqual(endpoints[OTHER]["calls"], 10)
+
+
+class TestOSCServerStats(OSCServerTestCase):
+    """Test that packets are counted and timed per endpoint and served over OSC"""
+
+    def stats(self):
+        self.handle(encode_message("/live/stats", []))
+        address, args = self.responses[-1]
+        self.assertEqual(address, "/live/stats/response")
+        return json.loads(args[0])
+
+    def test_stages_and_counters(self):
+        self.handle(encode_message("/live/track/1/volume", [0.5]))
+        self.handle(encode_message("/live/track/2/volume", [0.25]))
+        self.handle(encode_message("/live/nothing/here", []))
+        self.server._handle_message(b"/live/tempo\x00,f\x00\x00", ('127.0.0.1', 50000))
+
+        stats = self.stats()
+        endpoint = stats["endpoints"]["/live/track/<n>/volume"]
+        self.assertEqual(endpoint["calls"], 2)
+        for stage in ("parse", "queue", "dispatch", "live"):
+            self.assertEqual(endpoint[stage]["count"], 2, stage)
+        self.assertEqual(stats["counters"]["parse_errors"], 1)
+        self.assertEqual(stats["counters"]["unknown_addresses"], 1)
+        self.assertGreaterEqual(stats["counters"]["packets"], 5)
+        self.assertGreaterEqual(stats["ticks"]["count"], 3)
+
+    def test_reset(self):
+        self.handle(encode_message("/live/tempo", [120.0]))
+        self.handle(encode_message("/live/stats/reset", []))
+        self.assertEqual(self.responses[-1], ("/live/stats/reset/response", ["success"]))
+
+        self.assertNotIn("/live/tempo", self.stats()["endpoints"])
+
+
+class TestRouter(unittest.TestCase):
+    """Test address templates and OSC 1.0 pattern matching"""
+
+    def setUp(self):
+        self.router = Router()
+        self.router.collection("track", lambda: 12)
+        self.router.collection("scene", lambda: 4)
+        self.router.add("/live/play", "play")
+        self.router.add("/live/track/<track>/mute", "mute", patterns=True)
+        self.router.add("/live/track/<track>/clip/<scene>/launch", "launch")
+
+    def resolve(self, address):
+        return self.router.resolve(address)
+
+    def test_segment_patterns(self):
+        self.assertTrue(compile_segment("tr?ck").match("track"))
+        self.assertTrue(compile_segment("*").match("anything"))
+        self.assertTrue(compile_segment("[a-c]x").match("bx"))
+        self.assertFalse(compile_segment("[!a-c]x").match("bx"))
+        self.assertTrue(compile_segment("{mute,solo}").match("solo"))
+        self.assertFalse(compile_segment("{mute,solo}").match("arm"))
+
+    def test_literal_and_indexed_addresses(self):
+        self.assertEqual(self.resolve("/live/play"), [("play", [])])
+        self.assertEqual(self.resolve("/live/track/3/mute"), [("mute", [3])])
+        self.assertEqual(self.resolve("/live/track/12/mute"), [])
+        self.assertEqual(self.resolve("/live/unknown"), [])
+
+    def test_patterns_fan_out(self):
+        self.assertEqual(self.resolve("/live/track/{0,3,7}/mute"), [("mute", [0]), ("mute", [3]), ("mute", [7])])
+        self.assertEqual(len(self.resolve("/live/track/*/mute")), 12)
+        self.assertEqual(self.resolve("/live/track/1?/mute"), [("mute", [10]), ("mute", [11])])
+
+    def test_patterns_skip_routes_not_marked_for_them(self):
+        self.assertEqual(self.resolve("/live/{play,stop}"), [])
+        self.assertEqual(self.resolve("/live/*"), [])
+        self.assertEqual(self.resolve("/live/track/*/clip/0/launch"), [])
+        self.assertEqual(self.resolve("/live/track/2/clip/0/launch"), [("launch", [2, 0])])
+
+
+class TestOSCServerPatterns(OSCServerTestCase):
+    """Test that one pattern message fans out across tracks"""
+
+    track_count = 8
+
+    def test_indexed_address_uses_plain_response(self):
+        self.handle(encode_message("/live/track/2/volume", [0.25]))
+
+        self.assertEqual(self.song.tracks[2].mixer_device.volume.value, 0.25)
+        self.assertEqual(self.responses, [("/live/track/volume/response", ["success", 2, 0.25])])
+
+    def test_wildcard_fans_out_with_one_response(self):
+        self.handle(encode_message("/live/track/*/mute", [1]))
+
+        self.assertTrue(all(track.mute for track in self.song.tracks))
+        self.assertEqual(self.responses, [("/live/track/*/mute/response", ["success", 8])])
+
+    def test_alternatives_select_tracks(self):
+        self.handle(encode_message("/live/track/{0,3,7}/solo", [1]))
+
+        self.assertEqual([i for i, track in enumerate(self.song.tracks) if track.solo], [0, 3, 7])
+
+    def test_wildcard_does_not_reach_actions(self):
+        self.handle(encode_message("/live/*", [1]))
+        self.handle(encode_message("/live/{play,tempo}", [90.0]))
+
+        self.assertFalse(self.song.is_playing)
+        self.assertEqual(self.song.tempo, 120.0)
+        self.assertEqual(self.responses, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
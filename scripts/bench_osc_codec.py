@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the shared OSC codec against the previous copy-pasted implementation"""
+
+import json
+import os
+import struct
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "crates", "orbit-connector", "scripts", "OrbitRemote"))
+
+from osc_codec import Double, Int64, OSCEncoder, decode_message
+
+
+def legacy_encode(address: str, args: list) -> bytes:
+    """Encoder as it was duplicated in the client, server and test_osc.py"""
+    address_bytes = address.encode('utf-8') + b'\x00'
+    while len(address_bytes) % 4 != 0:
+        address_bytes += b'\x00'
+
+    type_tags = ','
+    arg_bytes = b''
+
+    for arg in args:
+        if isinstance(arg, int):
+            type_tags += 'i'
+            arg_bytes += struct.pack('>i', arg)
+        elif isinstance(arg, float):
+            type_tags += 'f'
+            arg_bytes += struct.pack('>f', arg)
+        elif isinstance(arg, str):
+            type_tags += 's'
+            s_bytes = arg.encode('utf-8') + b'\x00'
+            while len(s_bytes) % 4 != 0:
+                s_bytes += b'\x00'
+            arg_bytes += s_bytes
+
+    type_tag_bytes = type_tags.encode('utf-8') + b'\x00'
+    while len(type_tag_bytes) % 4 != 0:
+        type_tag_bytes += b'\x00'
+
+    return address_bytes + type_tag_bytes + arg_bytes
+
+
+def legacy_decode(data: bytes) -> tuple:
+    """Decoder as it was duplicated in the client, server and test_osc.py"""
+    idx = data.index(b',')
+    address = data[:idx].decode('utf-8').rstrip('\x00')
+
+    type_tag_start = idx
+    idx = data.index(b'\x00', type_tag_start) + 1
+    if idx % 4 != 0:
+        idx += 4 - (idx % 4)
+
+    type_tags_str = data[type_tag_start:idx].decode('utf-8').rstrip('\x00')
+
+    values = []
+    for tag in type_tags_str[1:]:
+        if tag == 'i':
+            values.append(struct.unpack('>i', data[idx:idx + 4])[0])
+            idx += 4
+        elif tag == 'f':
+            values.append(struct.unpack('>f', data[idx:idx + 4])[0])
+            idx += 4
+        elif tag == 's':
+            end = data.index(b'\x00', idx)
+            values.append(data[idx:end].decode('utf-8'))
+            idx = end + 1
+            if idx % 4 != 0:
+                idx += 4 - (idx % 4)
+
+    return address, values
+
+
+CASES = {
+    "volume": ("/live/track/volume", [12, 0.85]),
+    "response": ("/live/track/mute/response", ["success", 3, 1]),
+    "mixed": ("/live/test/address", [1, 2, 3, 0.25, 0.5, "drums", "bass", "keys"]),
+    "mixer64": ("/live/mixer", [value for track in range(64) for value in (track, 0.75)]),
+    "tracks": ("/live/tracks/response", [json.dumps([
+        {"index": i, "name": f"Track {i}", "color": i % 70, "is_foldable": False,
+         "mute": False, "solo": False, "arm": False, "volume": 0.85}
+        for i in range(150)])]),
+    "meters": ("/live/meters", ["left"] + [i / 64 for i in range(64)]),
+}
+
+# Messages using type tags the old code could not encode; timed on their own
+NEW_TAG_CASES = {
+    "flags": ("/live/track/state", [3, True, False, None, 0.5]),
+    "wide": ("/live/song/time", [Double(12.25), Int64(1 << 40), "beats"]),
+    "arrays": ("/live/track/levels", [[0, 0.5], [1, 0.25], [2, 0.75]]),
+}
+
+
+def messages_per_second(before, after, number: int, repeat: int = 9) -> tuple:
+    """Best rates of ``before`` and ``after``, timed in alternation so that
+    drift in machine load affects both alike"""
+    best_before = best_after = float('inf')
+    for _ in range(repeat):
+        best_before = min(best_before, timeit.timeit(before, number=number))
+        best_after = min(best_after, timeit.timeit(after, number=number))
+    return number / best_before, number / best_after
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    encoder = OSCEncoder()
+
+    print(f"{'case':<10} {'op':<7} {'before msg/s':>14} {'after msg/s':>14} {'speedup':>8}")
+    for name, (address, args) in CASES.items():
+        packet = legacy_encode(address, args)
+        assert decode_message(packet) == legacy_decode(packet)
+
+        rows = (
+            ("encode",
+             lambda: legacy_encode(address, args),
+             lambda: encoder.encode(address, args)),
+            ("decode",
+             lambda: legacy_decode(packet),
+             lambda: decode_message(packet)),
+        )
+        for op, before, after in rows:
+            before_rate, after_rate = messages_per_second(before, after, number)
+            print(f"{name:<10} {op:<7} {before_rate:>14,.0f} {after_rate:>14,.0f} "
+                  f"{after_rate / before_rate:>7.2f}x")
+
+    for name, (address, args) in NEW_TAG_CASES.items():
+        packet = encoder.encode(address, args)
+        for op, func in (("encode", lambda: encoder.encode(address, args)),
+                         ("decode", lambda: decode_message(packet))):
+            rate = number / min(timeit.repeat(func, number=number, repeat=5))
+            print(f"{name:<10} {op:<7} {'-':>14} {rate:>14,.0f} {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()